@@ -1,11 +1,18 @@
 #app.py (flask app with API key authentication)
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_httpauth import HTTPTokenAuth
 import os
 from werkzeug.utils import secure_filename
-from rag.pipeline import extract_fields_from_pdf
-from rag.employee_recommender import get_employee_recommendations
+# rag.pipeline and rag.employee_recommender (chromadb, pandas, the embedding model) are imported inside the
+# handlers that need them, so the server starts and answers /health before they finish loading
+from rag.warmup import start_background_warmup, warmup_status
+from rag.employee_filters import parse_filters, parse_mode
+from rag.llm_cache import get_cache_stats
+from rag.result_cache import get_result_cache
+from rag.extraction_jobs import get_job_queue
+from utils.pdf_utils import save_stream_with_hash
+from utils.response_utils import clean_recommendations_response, recommendations_error_response, sse_event, SSE_HEADERS
 from flask_cors import CORS
 import uuid
 
@@ -22,6 +29,9 @@ auth = HTTPTokenAuth(scheme='Bearer')
 UPLOAD_FOLDER = "data/uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 N_RECOMMENDATIONS = int(os.getenv("N_RECOMMENDATIONS", 5))
+# A long-poll holds one of waitress's fixed worker threads, so ?wait= is kept short here;
+# asgi_app.py waits on the event loop and allows up to EXTRACTION_JOB_MAX_WAIT
+FLASK_JOB_MAX_WAIT = float(os.getenv("FLASK_JOB_MAX_WAIT", 2))
 
 # Load single API key from environment
 API_KEY = os.getenv('API_KEY')
@@ -58,14 +68,73 @@ def extract_sow():
     file = request.files["file"]
     filename = f"{uuid.uuid4()}_{secure_filename(file.filename)}"
     filepath = os.path.join(UPLOAD_FOLDER, filename)
-    file.save(filepath)
+    # Hash while streaming to disk so repeat uploads can be answered from the result cache
+    content_hash = save_stream_with_hash(file.stream, filepath)
 
     try:
-        result = extract_fields_from_pdf(filepath)
+        from rag.pipeline import extract_fields_from_pdf
+        result = extract_fields_from_pdf(filepath, content_hash=content_hash)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/extract_sow/stream", methods=["POST"])
+@auth.login_required
+def extract_sow_stream():
+    """Same extraction as /extract_sow, streamed as Server-Sent Events: one "field" event per field
+    as soon as it is final, then "complete" with the full dict (or "error")"""
+    if 'file' not in request.files:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    file = request.files["file"]
+    filename = f"{uuid.uuid4()}_{secure_filename(file.filename)}"
+    filepath = os.path.join(UPLOAD_FOLDER, filename)
+    content_hash = save_stream_with_hash(file.stream, filepath)
+
+    def generate():
+        try:
+            from rag.pipeline import stream_fields_from_pdf
+            for event, data in stream_fields_from_pdf(filepath, content_hash=content_hash):
+                yield sse_event(event, data)
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=SSE_HEADERS)
+
+@app.route("/extract_sow/jobs", methods=["POST"])
+@auth.login_required
+def submit_extraction_job():
+    """Queue the extraction on the background worker pool and return a job id straight away"""
+    if 'file' not in request.files:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    file = request.files["file"]
+    filename = f"{uuid.uuid4()}_{secure_filename(file.filename)}"
+    filepath = os.path.join(UPLOAD_FOLDER, filename)
+    content_hash = save_stream_with_hash(file.stream, filepath)
+
+    # Re-submitting a document that is still in flight returns the existing job
+    job, _ = get_job_queue().submit(filepath, content_hash)
+    return jsonify(job), 202, {"Location": f"/extract_sow/jobs/{job['job_id']}"}
+
+@app.route("/extract_sow/jobs/<job_id>", methods=["GET"])
+@auth.login_required
+def extraction_job_status(job_id):
+    """Job status and, once done, its result. ?wait=<seconds> long-polls until the job finishes (capped at FLASK_JOB_MAX_WAIT)."""
+    job = get_job_queue().wait(job_id, min(request.args.get("wait", 0, type=float), FLASK_JOB_MAX_WAIT))
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route("/extract_sow/cache", methods=["DELETE"])
+@app.route("/extract_sow/cache/<content_hash>", methods=["DELETE"])
+@auth.login_required
+def invalidate_extraction_cache(content_hash=None):
+    """Drop cached extraction results for one document (by SHA-256 of the PDF) or for all documents"""
+    result_cache = get_result_cache()
+    invalidated = result_cache.invalidate(content_hash) if result_cache else 0
+    return jsonify({"invalidated": invalidated, "content_hash": content_hash})
+
 @app.route("/recommend_employees_clean", methods=["POST"])
 @auth.login_required
 def recommend_employees_clean():
@@ -80,84 +149,40 @@ def recommend_employees_clean():
         if not sow_data:
             return jsonify({"error": "No SOW data provided"}), 400
 
+        # Optional search constraints and ranking mode travel with the SOW fields,
+        # e.g. {"filters": {"min_experience_months": 24}, "mode": "fast"}
+        filters = sow_data.pop("filters", None)
+        try:
+            parse_filters(filters)
+            mode = parse_mode(sow_data.pop("mode", None))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         # Get full employee recommendations
-        full_recommendations = get_employee_recommendations(sow_data)
-
-        # Clean up the response - recommendations only
-        clean_response = {
-            "recommendations": [],
-            "summary": {
-                "initial_shortlisted_candidates": full_recommendations.get("candidates_found", 0),
-                "status": "success"
-            },
-            # Add SOW data to the response
-            "sow_data": sow_data
-        }
-
-        # Extract clean recommendations from the AI response
-        ai_recommendations = full_recommendations.get("recommendations", {})
-
-        if isinstance(ai_recommendations, dict) and "recommendations" in ai_recommendations:
-            # If AI returned proper JSON structure
-            for rec in ai_recommendations["recommendations"][:N_RECOMMENDATIONS]:  
-                clean_rec = {
-                    "rank": rec.get("rank", 0),
-                    "name": rec.get("name", "Unknown"),
-                    "designation": rec.get("designation", "Unknown"),
-                    "match_score": round(rec.get("match_score", 0), 2),
-                    "recommendation_level": rec.get("recommendation", "Consider"),
-                    "key_strengths": rec.get("reasons", [])[:3],  # Top 3 reasons only
-                    "concerns": rec.get("concerns", [])[:2],      # Top 2 concerns only
-                    "why_pick": rec.get("why_pick", "No justification provided."),
-                    "allocation_suggestion": rec.get("allocation_suggestion", 0),
-                    "recommended_skills": rec.get("recommended_skills", []),  # Now using consistent field name
-                    "recommended_experience": rec.get("recommended_experience", 0)  # Added new field
-                }
-                clean_response["recommendations"].append(clean_rec)
-        else:
-            # Fallback: extract from raw candidates if AI parsing failed
-            raw_candidates = full_recommendations.get("raw_candidates", [])[:5]
-            for i, candidate in enumerate(raw_candidates, 1):
-                meta = candidate.get("metadata", {})
-                clean_rec = {
-                    "rank": i,
-                    "name": meta.get("resource_name", "Unknown"),
-                    "designation": meta.get("designation", "Unknown"),
-                    "match_score": round(candidate.get("similarity_score", 0), 2),
-                    "recommendation_level": "Consider",
-                    "key_strengths": [
-                        f"Skills: {meta.get('skills', 'Not specified')}",
-                        f"Experience: {meta.get('experience_months', '0')} months",
-                        f"Capacity: {meta.get('capacity', '0')} hours"
-                    ],
-                    "concerns": ["Check availability"],
-                    "why_pick": "Fallback recommendation based on vector similarity.",
-                    "allocation_suggestion": int(meta.get('hours_available_weekly', 0)),
-                    "recommended_skills": [],
-                    "recommended_experience": 0  # Added fallback for new field
-                }
-                clean_response["recommendations"].append(clean_rec)
-
-        return jsonify(clean_response)
+        from rag.employee_recommender import get_employee_recommendations
+        full_recommendations = get_employee_recommendations(sow_data, filters, mode)
+
+        return jsonify(clean_recommendations_response(full_recommendations, sow_data, N_RECOMMENDATIONS))
 
     except Exception as e:
-        return jsonify({
-            "error": str(e),
-            "status": "failed",
-            "recommendations": [],
-            "summary": {
-                "total_candidates_analyzed": 0,
-                "status": "error"
-            },
-            "sow_data": {}  # Include empty SOW data even in error case
-        }), 500
+        return jsonify(recommendations_error_response(e)), 500
     
+@app.route("/llm_cache/stats", methods=["GET"])
+@auth.login_required
+def llm_cache_stats():
+    """Hit/miss counters and estimated latency saved by the LLM completion cache"""
+    return jsonify(get_cache_stats())
+
 # Health check endpoint - no auth required for monitoring
 @app.route("/health", methods=["GET"])
 def health_check():
     """Simple health check endpoint"""
-    return jsonify({"status": "healthy", "message": "Employee recommendation API is running!"})
+    return jsonify({"status": "healthy", "message": "Employee recommendation API is running!", "warmup": warmup_status()})
 
 if __name__ == "__main__":
     from waitress import serve
+    # Pick up extraction jobs interrupted by the last shutdown
+    get_job_queue()
+    # Load the models and employee vectors in the background so the server accepts connections straight away
+    start_background_warmup()
     serve(app, host="0.0.0.0", port=8080)
\ No newline at end of file
@@ -0,0 +1,226 @@
+#asgi_app.py (async starlette app with the same routes, API key auth and JSON contract as app.py)
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, FileResponse, StreamingResponse
+from starlette.routing import Route
+from werkzeug.utils import secure_filename
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import wraps
+import asyncio
+import importlib
+import os
+import uuid
+from rag.warmup import start_background_warmup, warmup_status
+from rag.employee_filters import parse_filters, parse_mode
+from rag.llm_cache import get_cache_stats
+from rag.result_cache import get_result_cache
+from rag.extraction_jobs import get_job_queue, EXTRACTION_JOB_MAX_WAIT, FINISHED_STATUSES
+from utils.pdf_utils import save_stream_with_hash
+from utils.response_utils import clean_recommendations_response, recommendations_error_response, sse_event, SSE_HEADERS
+
+load_dotenv()
+
+# Point the app to the frontend build
+FRONTEND_DIST = os.path.join(os.path.dirname(__file__), "../frontend/dist/")
+
+UPLOAD_FOLDER = "data/uploads"
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+N_RECOMMENDATIONS = int(os.getenv("N_RECOMMENDATIONS", 5))
+
+# Threads for PDF parsing, embedding and cache I/O; LLM calls never occupy one
+ASYNC_CPU_WORKERS = int(os.getenv("ASYNC_CPU_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+# Long-polls re-check job state on this interval instead of parking an executor thread
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 0.5))
+
+# Load single API key from environment
+API_KEY = os.getenv('API_KEY')
+if not API_KEY:
+    raise ValueError("API_KEY not found in environment variables. Please check your .env file.")
+
+def login_required(endpoint):
+    """Bearer token check matching the Flask app's HTTPTokenAuth setup"""
+    @wraps(endpoint)
+    async def wrapper(request: Request):
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token or token.strip() != API_KEY:
+            return JSONResponse({'error': 'Invalid or missing API key'}, status_code=401)
+        return await endpoint(request)
+    return wrapper
+
+async def import_heavy(module_name: str):
+    """Import rag.pipeline / rag.employee_recommender off the event loop; they load chromadb, pandas and the
+    embedding model, and may still be importing on the warm-up thread"""
+    return await asyncio.to_thread(importlib.import_module, module_name)
+
+@asynccontextmanager
+async def lifespan(app):
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=ASYNC_CPU_WORKERS, thread_name_prefix="asgi-cpu")
+    loop.set_default_executor(executor)
+    # Pick up extraction jobs interrupted by the last shutdown
+    await asyncio.to_thread(get_job_queue)
+    # Warm in the background so the server accepts connections straight away
+    start_background_warmup()
+    yield
+    executor.shutdown(wait=False, cancel_futures=True)
+
+# Serve frontend static files (catch-all route)
+async def serve_frontend(request: Request):
+    path = request.path_params.get("path", "")
+    root = os.path.realpath(FRONTEND_DIST)
+    full_path = os.path.realpath(os.path.join(root, path))
+    if path != "" and full_path.startswith(root + os.sep) and os.path.isfile(full_path):
+        return FileResponse(full_path)
+    # fallback to index.html for SPA routing
+    return FileResponse(os.path.join(root, "index.html"))
+
+@login_required
+async def extract_sow(request: Request):
+    form = await request.form()
+    upload = form.get("file")
+    if upload is None or isinstance(upload, str):
+        return JSONResponse({"error": "No file uploaded"}, status_code=400)
+
+    filename = f"{uuid.uuid4()}_{secure_filename(upload.filename or '')}"
+    filepath = os.path.join(UPLOAD_FOLDER, filename)
+    # Hash while streaming to disk so repeat uploads can be answered from the result cache
+    content_hash = await asyncio.to_thread(save_stream_with_hash, upload.file, filepath)
+
+    try:
+        pipeline = await import_heavy("rag.pipeline")
+        result = await pipeline.aextract_fields_from_pdf(filepath, content_hash=content_hash)
+        return JSONResponse(result)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+@login_required
+async def extract_sow_stream(request: Request):
+    """Server-Sent Events twin of extract_sow: "field" events as fields finish, then "complete" (or "error")"""
+    form = await request.form()
+    upload = form.get("file")
+    if upload is None or isinstance(upload, str):
+        return JSONResponse({"error": "No file uploaded"}, status_code=400)
+
+    filename = f"{uuid.uuid4()}_{secure_filename(upload.filename or '')}"
+    filepath = os.path.join(UPLOAD_FOLDER, filename)
+    content_hash = await asyncio.to_thread(save_stream_with_hash, upload.file, filepath)
+
+    async def generate():
+        try:
+            pipeline = await import_heavy("rag.pipeline")
+            async for event, data in pipeline.astream_fields_from_pdf(filepath, content_hash=content_hash):
+                yield sse_event(event, data)
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@login_required
+async def submit_extraction_job(request: Request):
+    """Queue the extraction on the background worker pool and return a job id straight away"""
+    form = await request.form()
+    upload = form.get("file")
+    if upload is None or isinstance(upload, str):
+        return JSONResponse({"error": "No file uploaded"}, status_code=400)
+
+    filename = f"{uuid.uuid4()}_{secure_filename(upload.filename or '')}"
+    filepath = os.path.join(UPLOAD_FOLDER, filename)
+    content_hash = await asyncio.to_thread(save_stream_with_hash, upload.file, filepath)
+
+    # Re-submitting a document that is still in flight returns the existing job
+    job, _ = await asyncio.to_thread(get_job_queue().submit, filepath, content_hash)
+    return JSONResponse(job, status_code=202, headers={"Location": f"/extract_sow/jobs/{job['job_id']}"})
+
+@login_required
+async def extraction_job_status(request: Request):
+    """Job status and, once done, its result. ?wait=<seconds> long-polls until the job finishes (capped server-side)."""
+    job_id = request.path_params["job_id"]
+    try:
+        wait = min(max(float(request.query_params.get("wait", 0)), 0), EXTRACTION_JOB_MAX_WAIT)
+    except ValueError:
+        wait = 0
+
+    deadline = asyncio.get_running_loop().time() + wait
+    job = await asyncio.to_thread(get_job_queue().get, job_id)
+    while job is not None and job["status"] not in FINISHED_STATUSES and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+        job = await asyncio.to_thread(get_job_queue().get, job_id)
+
+    if job is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+    return JSONResponse(job)
+
+@login_required
+async def invalidate_extraction_cache(request: Request):
+    """Drop cached extraction results for one document (by SHA-256 of the PDF) or for all documents"""
+    content_hash = request.path_params.get("content_hash")
+    result_cache = get_result_cache()
+    invalidated = await asyncio.to_thread(result_cache.invalidate, content_hash) if result_cache else 0
+    return JSONResponse({"invalidated": invalidated, "content_hash": content_hash})
+
+@login_required
+async def recommend_employees_clean(request: Request):
+    """Clean employee recommendations endpoint for UI consumption (async twin of the Flask route)"""
+    try:
+        try:
+            sow_data = await request.json()
+        except ValueError:
+            sow_data = None
+
+        if not sow_data:
+            return JSONResponse({"error": "No SOW data provided"}, status_code=400)
+
+        # Optional search constraints and ranking mode travel with the SOW fields,
+        # e.g. {"filters": {"min_experience_months": 24}, "mode": "fast"}
+        filters = sow_data.pop("filters", None)
+        try:
+            parse_filters(filters)
+            mode = parse_mode(sow_data.pop("mode", None))
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+
+        recommender = await import_heavy("rag.employee_recommender")
+        full_recommendations = await recommender.aget_employee_recommendations(sow_data, filters, mode)
+
+        return JSONResponse(clean_recommendations_response(full_recommendations, sow_data, N_RECOMMENDATIONS))
+
+    except Exception as e:
+        return JSONResponse(recommendations_error_response(e), status_code=500)
+
+@login_required
+async def llm_cache_stats(request: Request):
+    """Hit/miss counters and estimated latency saved by the LLM completion cache"""
+    return JSONResponse(await asyncio.to_thread(get_cache_stats))
+
+# Health check endpoint - no auth required for monitoring
+async def health_check(request: Request):
+    """Simple health check endpoint"""
+    return JSONResponse({"status": "healthy", "message": "Employee recommendation API is running!", "warmup": warmup_status()})
+
+routes = [
+    Route("/extract_sow", extract_sow, methods=["POST"]),
+    Route("/extract_sow/stream", extract_sow_stream, methods=["POST"]),
+    Route("/extract_sow/jobs", submit_extraction_job, methods=["POST"]),
+    Route("/extract_sow/jobs/{job_id}", extraction_job_status, methods=["GET"]),
+    Route("/extract_sow/cache", invalidate_extraction_cache, methods=["DELETE"]),
+    Route("/extract_sow/cache/{content_hash}", invalidate_extraction_cache, methods=["DELETE"]),
+    Route("/recommend_employees_clean", recommend_employees_clean, methods=["POST"]),
+    Route("/llm_cache/stats", llm_cache_stats, methods=["GET"]),
+    Route("/health", health_check, methods=["GET"]),
+    Route("/", serve_frontend),
+    Route("/{path:path}", serve_frontend),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])],
+    lifespan=lifespan
+)
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8080)
@@ -0,0 +1,107 @@
+#benchmarks/embedding_backends.py (torch vs ONNX Runtime vs int8 ONNX embeddings: throughput and agreement)
+"""
+Usage (from backend/):
+    uv run python -m benchmarks.embedding_backends --rows 5000
+    uv run python -m benchmarks.embedding_backends --backends torch onnx_int8 --threads 4 --batch-size 64
+
+Embeds the same corpus (synthetic roster summaries plus the chunks of a SOW PDF) with every backend,
+then compares each ONNX backend against torch: docs/sec, cosine similarity of the document vectors and
+recall@k of the top-k neighbours for the real retrieval queries. The first ONNX run exports the model.
+
+A backend passes when its min cosine is >= 0.99 (onnx) or >= 0.97 (onnx_int8) and recall@k is >= 0.9;
+these are the bars for switching EMBEDDING_BACKEND, not measured results.
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from rag.embedder import EMBEDDING_MODEL, create_embedding_function, OnnxEmbeddingFunction
+from rag.employee_recommender import EmployeeRecommender, build_role_vectors
+from rag.prompts import generate_employee_search_query
+from benchmarks.roster_vectors import synthetic_roster, SKILLS, DEPARTMENTS
+
+MIN_COSINE = {"onnx": 0.99, "onnx_int8": 0.97}
+MIN_RECALL = 0.9
+
+def roster_corpus(n_rows: int, tmp_csv: str):
+    synthetic_roster(n_rows).to_csv(tmp_csv, index=False)
+    documents, _, _ = build_role_vectors(EmployeeRecommender.preprocess_csv(tmp_csv, "developer"), "developer")
+    queries = [
+        generate_employee_search_query({"technology": SKILLS[i:i + 3], "practice": department, "category": "Fixed Bid"})
+        for i, department in zip(range(0, len(SKILLS), 3), DEPARTMENTS * 2)
+    ]
+    return documents, queries
+
+def sow_corpus(pdf_path: str):
+    from utils.pdf_utils import parse_pdf
+    from utils.validator import load_db_values
+    from rag.pipeline import build_retrieval_queries
+    return parse_pdf(pdf_path).chunks(), list(build_retrieval_queries(load_db_values()).values())
+
+def embed_timed(embedding_function, texts: list):
+    embedding_function(texts[:8])  # warm up (session init, thread pools)
+    start = time.perf_counter()
+    vectors = np.asarray(embedding_function(texts), dtype=np.float32)
+    return vectors, len(texts) / (time.perf_counter() - start)
+
+def normalized(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+def top_k(doc_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> np.ndarray:
+    scores = normalized(query_vectors) @ normalized(doc_vectors).T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+def recall_at_k(reference: np.ndarray, candidate: np.ndarray) -> float:
+    return float(np.mean([len(set(ref) & set(cand)) / len(ref) for ref, cand in zip(reference, candidate)]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000, help="synthetic roster size")
+    parser.add_argument("--pdf", default="Data/Tesla_Optimus_AI_SOW_2026.pdf")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx_int8"])
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime intra-op threads (0 = all cores)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpora = {"roster": roster_corpus(args.rows, os.path.join(tmp, "DeveloperDetails.csv"))}
+    if os.path.exists(args.pdf):
+        corpora["sow"] = sow_corpus(args.pdf)
+
+    results = {}
+    for backend in args.backends:
+        print(f"🧪 Embedding with {backend}...")
+        if backend == "torch":
+            embedding_function = create_embedding_function("torch")
+        else:
+            embedding_function = OnnxEmbeddingFunction(EMBEDDING_MODEL, quantized=backend == "onnx_int8",
+                                                       threads=args.threads, batch_size=args.batch_size)
+        for corpus, (documents, queries) in corpora.items():
+            doc_vectors, docs_per_second = embed_timed(embedding_function, documents)
+            query_vectors = np.asarray(embedding_function(queries), dtype=np.float32)
+            results[backend, corpus] = (doc_vectors, query_vectors, docs_per_second)
+
+    failed = False
+    print(f"\n{'corpus':8} {'backend':10} {'docs/s':>9} {'speedup':>8} {'min cos':>8} {'mean cos':>9} {f'recall@{args.k}':>10}")
+    for corpus, (documents, _) in corpora.items():
+        k = min(args.k, len(documents))
+        reference = results.get(("torch", corpus))
+        for backend in args.backends:
+            doc_vectors, query_vectors, docs_per_second = results[backend, corpus]
+            if reference is None or backend == "torch":
+                print(f"{corpus:8} {backend:10} {docs_per_second:9.1f}")
+                continue
+
+            cosines = np.sum(normalized(doc_vectors) * normalized(reference[0]), axis=1)
+            recall = recall_at_k(top_k(reference[0], reference[1], k), top_k(doc_vectors, query_vectors, k))
+            ok = cosines.min() >= MIN_COSINE[backend] and recall >= MIN_RECALL
+            failed |= not ok
+            print(f"{corpus:8} {backend:10} {docs_per_second:9.1f} {docs_per_second / reference[2]:7.1f}x "
+                  f"{cosines.min():8.4f} {cosines.mean():9.4f} {recall:10.3f} {'✅' if ok else '❌ outside tolerance'}")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
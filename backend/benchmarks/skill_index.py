@@ -0,0 +1,38 @@
+#benchmarks/skill_index.py (skill index build and coverage scoring on a synthetic roster)
+"""
+Usage (from backend/):
+    uv run python -m benchmarks.skill_index --rows 100000
+
+Times building the SkillIndex for one employee type and scoring a SOW technology list against it.
+Both run at roster load and per request respectively, ahead of the Chroma query.
+"""
+import argparse
+import time
+from rag.skill_index import SkillIndex
+from benchmarks.roster_vectors import synthetic_roster
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--top", type=int, default=100)
+    parser.add_argument("--technology", nargs="+", default=["Python", "PyTorch", "Docker", "Selenium"])
+    args = parser.parse_args()
+
+    df = synthetic_roster(args.rows)
+
+    start = time.perf_counter()
+    index = SkillIndex.from_dataframe(df, "developer")
+    build_seconds = time.perf_counter() - start
+
+    repeats = 20
+    start = time.perf_counter()
+    for _ in range(repeats):
+        top = index.top_candidates(args.technology, args.top)
+    query_ms = (time.perf_counter() - start) / repeats * 1000
+
+    print(f"build:  {build_seconds:8.2f}s for {args.rows} employees, {len(index.vocabulary)} skills, {index.matrix.nnz} postings")
+    print(f"query:  {query_ms:8.2f}ms for top {args.top} of {args.technology}")
+    print(f"best:   {top[0][0]} coverage {top[0][1]:.2f}" if top else "best:   no matching employees")
+
+if __name__ == "__main__":
+    main()
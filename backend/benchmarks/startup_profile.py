@@ -0,0 +1,66 @@
+#benchmarks/startup_profile.py (per-module import cost of the server entry points)
+"""
+Usage (from backend/):
+    uv run python -m benchmarks.startup_profile
+    uv run python -m benchmarks.startup_profile asgi_app --top 40
+
+Imports the module in a fresh interpreter under `python -X importtime`, then prints the wall time, the
+slowest modules by cumulative time and the self time summed per top-level package. Anything heavy
+(chromadb, pandas, torch, openai...) showing up for `app` means an import escaped the lazy paths;
+test_startup_time.py fails on that too.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def profile_imports(module: str):
+    """Run `import module` cold; returns (wall seconds, [(name, self_us, cumulative_us, depth)])"""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    env.setdefault("API_KEY", "startup-profile")  # app.py refuses to import without one
+
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    wall_seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(f"❌ import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return wall_seconds, rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("module", nargs="?", default="app")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    wall_seconds, rows = profile_imports(args.module)
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+    print(f"⏱️ import {args.module}: {wall_seconds:.2f}s wall (interpreter start included), "
+          f"{total_us / 1e6:.2f}s in {len(rows)} module imports\n")
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {'  ' * depth}{name}")
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print(f"\n{'self ms':>9}  package")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{self_us / 1000:9.1f}  {package}")
+
+if __name__ == "__main__":
+    main()
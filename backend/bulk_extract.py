@@ -0,0 +1,204 @@
+#bulk_extract.py (offline batch extraction of archived SOW PDFs into JSONL)
+"""
+Usage:
+    uv run bulk_extract.py data/archive/ -o data/bulk_extract.jsonl
+    uv run bulk_extract.py "data/archive/**/*.pdf" --processes 4 --llm-concurrency 8
+
+PDF hashing, parsing and chunk embedding run in a process pool. Chroma ingestion and the LLM
+prompts run in this process, with at most --llm-concurrency requests in flight. Every finished
+document is appended to the output file straight away; re-running with the same output skips the
+documents that already succeeded, so an interrupted backfill picks up where it stopped.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, List
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def find_pdfs(sources: List[str]) -> List[str]:
+    """Expand directories (recursively) and glob patterns into a sorted, de-duplicated list of PDFs"""
+    paths = set()
+    for source in sources:
+        if os.path.isdir(source):
+            matches = glob.glob(os.path.join(source, "**", "*.pdf"), recursive=True)
+            matches += glob.glob(os.path.join(source, "**", "*.PDF"), recursive=True)
+        else:
+            matches = glob.glob(source, recursive=True)
+        paths.update(os.path.abspath(path) for path in matches if os.path.isfile(path))
+    return sorted(paths)
+
+def load_checkpoint(output_path: str) -> set:
+    """Files that already have a successful record in the output JSONL"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interrupted run
+            if record.get("status") == "ok":
+                done.add(record["file"])
+    return done
+
+def _init_worker(torch_threads: int):
+    # Each worker gets a slice of the CPU instead of every process spawning one thread per core
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+def parse_and_embed(file_path: str) -> Dict:
+    """Process-pool stage: hash, parse and chunk the PDF, and embed its chunks unless already ingested"""
+    from utils.pdf_utils import parse_pdf, file_content_hash
+    from rag.doc_index import get_document_index
+
+    timings = {}
+    start = time.perf_counter()
+    content_hash = file_content_hash(file_path)
+    timings["hash_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    document = parse_pdf(file_path)
+    chunks = document.chunks()
+    timings["parse_seconds"] = time.perf_counter() - start
+
+    chunk_embeddings = None
+    start = time.perf_counter()
+    if chunks and not get_document_index().contains(content_hash):
+        from rag.embedder import get_embedding_function
+        chunk_embeddings = [[float(x) for x in vector] for vector in get_embedding_function()(chunks)]
+    timings["embed_seconds"] = time.perf_counter() - start
+
+    return {
+        "file": file_path,
+        "content_hash": content_hash,
+        "document": document,
+        "chunk_embeddings": chunk_embeddings,
+        "timings": timings
+    }
+
+def extract_prepared(prepared: Dict, max_workers: int, mode: str, use_cache: bool) -> Dict:
+    """Main-process stage: the same steps as extract_fields_from_pdf, on an already parsed and embedded PDF"""
+    from rag.pipeline import (get_cached_extraction, prepare_field_tasks, run_field_tasks,
+                              missing_fallback_tasks, finish_extraction, extraction_failed)
+
+    content_hash = prepared["content_hash"]
+    timings = dict(prepared["timings"])
+
+    start = time.perf_counter()
+    cached = get_cached_extraction(content_hash, mode, use_cache)
+    timings["cache_seconds"] = time.perf_counter() - start
+    if cached is not None:
+        return {"fields": cached, "cached": True, "timings": timings}
+
+    start = time.perf_counter()
+    tasks, fallback_tasks = prepare_field_tasks(prepared["file"], content_hash, mode,
+                                                document=prepared["document"],
+                                                chunk_embeddings=prepared["chunk_embeddings"])
+    timings["retrieve_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = run_field_tasks(tasks, max_workers=max_workers)
+    missing = missing_fallback_tasks(results, fallback_tasks)
+    if missing:
+        results.update(run_field_tasks(missing, max_workers=max_workers))
+    timings["llm_seconds"] = time.perf_counter() - start
+
+    extracted = {"fields": finish_extraction(content_hash, results, mode, use_cache), "cached": False, "timings": timings}
+    # LLM failures come back as "ERROR" answers rather than exceptions; such a record must not count as done
+    if extraction_failed(results):
+        extracted["error"] = "LLM request failed for one or more fields"
+    return extracted
+
+def main(argv: List[str] = None) -> int:
+    from rag.pipeline import FIELD_EXTRACTION_MODE, FIELD_EXTRACTION_WORKERS
+    from rag.query_azure_openai import set_llm_concurrency, LLM_MAX_CONCURRENCY
+
+    parser = argparse.ArgumentParser(description="Extract SOW fields from many PDFs into a JSONL file")
+    parser.add_argument("sources", nargs="+", help="PDF directories (searched recursively) or glob patterns")
+    parser.add_argument("-o", "--output", default="data/bulk_extract.jsonl", help="JSONL output, also used as the resume checkpoint")
+    parser.add_argument("--processes", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="worker processes for parsing and embedding")
+    parser.add_argument("--documents", type=int, default=4, help="documents in the LLM stage at once")
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_MAX_CONCURRENCY or 8, help="max LLM requests in flight across all documents")
+    parser.add_argument("--field-workers", type=int, default=FIELD_EXTRACTION_WORKERS, help="concurrent field prompts per document")
+    parser.add_argument("--mode", choices=["per_field", "grouped"], default=FIELD_EXTRACTION_MODE)
+    parser.add_argument("--no-resume", action="store_true", help="re-extract files that already succeeded in the output")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the extraction result cache")
+    args = parser.parse_args(argv)
+
+    pdfs = find_pdfs(args.sources)
+    done = set() if args.no_resume else load_checkpoint(args.output)
+    pending = [path for path in pdfs if path not in done]
+    print(f"📚 Found {len(pdfs)} PDF(s), {len(pdfs) - len(pending)} already done, {len(pending)} to extract")
+    if not pending:
+        return 0
+
+    set_llm_concurrency(args.llm_concurrency)
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    write_lock = threading.Lock()
+    counts = {"ok": 0, "error": 0}
+    run_start = time.perf_counter()
+
+    def write_record(record: Dict):
+        with write_lock:
+            out.write(json.dumps(record) + "\n")
+            # Flushed per record so a crash never loses finished documents
+            out.flush()
+            os.fsync(out.fileno())
+            counts[record["status"]] += 1
+            print(f"📝 [{counts['ok'] + counts['error']}/{len(pending)}] {record['status']}: {record['file']}")
+
+    def run_llm_stage(prepared: Dict, submitted_at: float):
+        record = {"file": prepared["file"], "content_hash": prepared["content_hash"]}
+        try:
+            record.update(extract_prepared(prepared, args.field_workers, args.mode, not args.no_cache))
+            record["status"] = "error" if "error" in record else "ok"
+        except Exception as e:
+            record.update({"status": "error", "error": str(e), "timings": prepared["timings"]})
+        record["timings"]["total_seconds"] = time.perf_counter() - submitted_at
+        record["timings"] = {stage: round(seconds, 3) for stage, seconds in record["timings"].items()}
+        write_record(record)
+
+    torch_threads = max(1, (os.cpu_count() or 1) // max(1, args.processes))
+    with open(args.output, "a") as out, \
+            ProcessPoolExecutor(max_workers=args.processes, initializer=_init_worker, initargs=(torch_threads,)) as processes, \
+            ThreadPoolExecutor(max_workers=max(1, args.documents), thread_name_prefix="bulk-llm") as llm_stage:
+        submitted_at = {}
+        parse_futures = {}
+        for path in pending:
+            submitted_at[path] = time.perf_counter()
+            parse_futures[processes.submit(parse_and_embed, path)] = path
+
+        llm_futures = []
+        for future in as_completed(parse_futures):
+            path = parse_futures[future]
+            try:
+                prepared = future.result()
+            except Exception as e:
+                write_record({"file": path, "status": "error", "error": f"parse/embed failed: {e}",
+                              "timings": {"total_seconds": round(time.perf_counter() - submitted_at[path], 3)}})
+                continue
+            llm_futures.append(llm_stage.submit(run_llm_stage, prepared, submitted_at[path]))
+
+        for future in llm_futures:
+            future.result()
+
+    print(f"✅ Extracted {counts['ok']} document(s), {counts['error']} failed, in {time.perf_counter() - run_start:.1f}s")
+    return 1 if counts["error"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# rag/candidate_table.py
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+from dotenv import load_dotenv
+# rag.skill_index and rag.fast_ranking (pandas, scipy) are imported inside the functions below: rag.prompts imports
+# this module, and the SOW extraction pipeline should not pay for them
+
+load_dotenv()
+
+# Estimated input tokens allowed per recommendation prompt; the lowest-scoring candidates are dropped to fit
+RECOMMENDATION_PROMPT_TOKEN_BUDGET = int(os.getenv("RECOMMENDATION_PROMPT_TOKEN_BUDGET", 3000))
+# Skills below this proficiency are left out unless the SOW asks for them, and each row keeps at most this many skills
+PROMPT_MIN_SKILL_PROFICIENCY = float(os.getenv("PROMPT_MIN_SKILL_PROFICIENCY", 3))
+PROMPT_MAX_SKILLS_PER_CANDIDATE = int(os.getenv("PROMPT_MAX_SKILLS_PER_CANDIDATE", 12))
+
+# Marks where the candidate table goes while the rest of the prompt is measured
+CANDIDATE_TABLE_PLACEHOLDER = "{{CANDIDATE_TABLE}}"
+
+TABLE_COLUMNS = ["ID", "Name", "Designation", "Level", "Experience (months)", "Availability %",
+                 "Weekly Hours Available", "Department / Base Department", "Skills (name or code:proficiency)",
+                 "Hours Worked on Skills", "Practice Areas (hours)"]
+
+# Word pieces of up to 4 characters and single punctuation marks, roughly how BPE tokenizers split English text
+TOKEN_PIECES = re.compile(r"\w{1,4}|[^\w\s]")
+# "AI-ML(2200.00)" -> "AI-ML(2200h)"
+HOURS_AMOUNT = re.compile(r"\s*\((\d+)(?:\.\d+)?\)")
+
+def estimate_tokens(text: str) -> int:
+    """Local, dependency-free estimate of the tokens text costs the chat model (errs slightly high)"""
+    return len(TOKEN_PIECES.findall(text))
+
+def compact_hours(value) -> str:
+    return HOURS_AMOUNT.sub(r"(\1h)", str(value or '')).strip() or "-"
+
+def number_text(value) -> str:
+    try:
+        return f"{float(value):g}"
+    except (TypeError, ValueError):
+        return str(value or 0)
+
+def candidate_skills(skills: str, requested: set) -> Tuple[List[Tuple[str, float]], int]:
+    """(name, proficiency) pairs worth showing, requested skills first then by proficiency, and how many were cut"""
+    from rag.skill_index import normalize_skill, parse_skills
+    parsed = parse_skills(skills)
+    kept = [
+        (name, proficiency) for name, proficiency in parsed
+        if proficiency >= PROMPT_MIN_SKILL_PROFICIENCY or normalize_skill(name) in requested
+    ]
+    kept.sort(key=lambda skill: (normalize_skill(skill[0]) not in requested, -skill[1]))
+    kept = kept[:PROMPT_MAX_SKILLS_PER_CANDIDATE]
+    return kept, len(parsed) - len(kept)
+
+def encode_candidate_table(title: str, prefix: str, candidates: List[Dict], technologies: List[str]) -> str:
+    """Candidates as one "|"-separated row each; skill names shared by several candidates go in a legend once"""
+    from rag.skill_index import normalize_skill
+    if isinstance(technologies, str):
+        technologies = technologies.split(',')
+    requested = {normalize_skill(technology) for technology in technologies if technology.strip()}
+    rows_skills = [candidate_skills((candidate.get('metadata') or {}).get('skills', ''), requested) for candidate in candidates]
+
+    # A skill shared by several candidates is spelled out once in the legend and referenced by code, when that is
+    # cheaper than repeating its name: (uses - 1) names saved against uses codes plus the "sN=" legend entry.
+    # Codes are numbered in order of first use, so the requested skills of the first candidates come first.
+    uses = Counter(normalize_skill(name) for skills, _ in rows_skills for name, _ in skills)
+    codes: Dict[str, Tuple[str, str]] = {}
+    for skills, _ in rows_skills:
+        for name, _ in skills:
+            key = normalize_skill(name)
+            code = f"s{len(codes) + 1}"
+            if key not in codes and (uses[key] - 1) * estimate_tokens(name) > (uses[key] + 1) * estimate_tokens(code) + 2:
+                codes[key] = (name, code)
+
+    lines = [f"AVAILABLE {title} ({len(candidates)}, one row each, columns separated by |):"]
+    if codes:
+        lines.append("Skill codes: " + ", ".join(f"{code}={name}" for name, code in codes.values()))
+    lines.append(" | ".join(TABLE_COLUMNS))
+
+    for i, (candidate, (skills, cut)) in enumerate(zip(candidates, rows_skills), 1):
+        meta = candidate.get('metadata') or {}
+        skills_text = ", ".join(
+            f"{codes.get(normalize_skill(name), (None, name))[1]}:{proficiency:g}" for name, proficiency in skills
+        ) or "-"
+        if cut:
+            skills_text += f" +{cut} lower"
+        lines.append(" | ".join([
+            f"{prefix}{i}",
+            str(meta.get('resource_name', 'Unknown')),
+            str(meta.get('designation', 'N/A')),
+            str(meta.get('designation_level', 'N/A')),
+            number_text(meta.get('experience_months', 0)),
+            number_text(meta.get('availability', 0)),
+            number_text(meta.get('hours_available_weekly', 0)),
+            f"{meta.get('department', 'N/A')} / {meta.get('base_department', 'N/A')}",
+            skills_text,
+            compact_hours(meta.get('hours_worked')),
+            compact_hours(meta.get('practices_with_hours'))
+        ]))
+    lines.append("Skill proficiency runs from 1 (basic) to 5 (expert); \"+n lower\" counts lower-proficiency skills not listed.")
+    return "\n".join(lines)
+
+def fill_candidate_table(prompt: str, title: str, prefix: str, candidates: List[Dict], technologies: List[str],
+                         min_candidates: int, token_budget: int = RECOMMENDATION_PROMPT_TOKEN_BUDGET) -> str:
+    """Replace CANDIDATE_TABLE_PLACEHOLDER in prompt with the candidate table. While the prompt is over
+    token_budget, the candidate with the lowest composite score (rag/fast_ranking.py) is dropped, but never
+    below min_candidates. Kept candidates stay in retrieval order."""
+    from rag.fast_ranking import composite_scores, score_components
+    kept = list(range(len(candidates)))
+    if candidates:
+        scores = composite_scores(score_components(candidates))
+        # Lowest score first; ties drop the later-retrieved candidate first
+        drop_order = sorted(kept, key=lambda i: (scores[i], -i))
+    else:
+        drop_order = []
+
+    base_tokens = estimate_tokens(prompt.replace(CANDIDATE_TABLE_PLACEHOLDER, ""))
+    while True:
+        table = encode_candidate_table(title, prefix, [candidates[i] for i in kept], technologies)
+        tokens = base_tokens + estimate_tokens(table)
+        if tokens <= token_budget or len(kept) <= max(min_candidates, 1):
+            break
+        kept.remove(drop_order.pop(0))
+
+    if len(kept) < len(candidates):
+        print(f"✂️ {title.title()} prompt trimmed to {len(kept)}/{len(candidates)} candidates "
+              f"(~{tokens} tokens, budget {token_budget})")
+    return prompt.replace(CANDIDATE_TABLE_PLACEHOLDER, table)
@@ -0,0 +1,69 @@
+# rag/doc_index.py
+import os
+import time
+import threading
+from typing import Optional
+from dotenv import load_dotenv
+from utils.sqlite_utils import connect_sqlite
+
+load_dotenv()
+
+CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "./chroma_store")
+# Lives next to the Chroma store so both are wiped (or backed up) together
+DOC_INDEX_PATH = os.getenv("DOC_INDEX_PATH", os.path.join(CHROMA_DB_PATH, "doc_index.sqlite3"))
+
+class DocumentIndex:
+    """Constant-time "is this SOW already in sow_docs?" lookup keyed by the PDF content hash"""
+
+    N_INGEST_LOCKS = 64
+
+    def __init__(self, path: str = DOC_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # Striped locks so two uploads of the same document don't ingest it twice in this process
+        self._ingest_locks = [threading.Lock() for _ in range(self.N_INGEST_LOCKS)]
+
+        self._conn = connect_sqlite(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                content_hash TEXT PRIMARY KEY,
+                doc_id TEXT NOT NULL,
+                n_chunks INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, content_hash: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc_id, n_chunks, created_at FROM documents WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"content_hash": content_hash, "doc_id": row[0], "n_chunks": row[1], "created_at": row[2]}
+
+    def contains(self, content_hash: str) -> bool:
+        return self.get(content_hash) is not None
+
+    def add(self, content_hash: str, doc_id: str, n_chunks: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                (content_hash, doc_id, n_chunks, time.time())
+            )
+            self._conn.commit()
+
+    def ingest_lock(self, content_hash: str) -> threading.Lock:
+        return self._ingest_locks[int(content_hash[:8], 16) % self.N_INGEST_LOCKS]
+
+_document_index = None
+_document_index_lock = threading.Lock()
+
+def get_document_index() -> DocumentIndex:
+    global _document_index
+    if _document_index is None:
+        with _document_index_lock:
+            if _document_index is None:
+                _document_index = DocumentIndex()
+    return _document_index
@@ -1,10 +1,233 @@
+from chromadb.api.types import EmbeddingFunction, Documents, Embeddings
 from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
 from dotenv import load_dotenv
+from functools import lru_cache
 import os
+import re
+import json
+import hashlib
+import threading
+import numpy as np
 
 load_dotenv()
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "Snowflake/snowflake-arctic-embed-xs")
+QUERY_EMBEDDING_CACHE_PATH = os.getenv("QUERY_EMBEDDING_CACHE_PATH", "data/cache/query_embeddings.json")
+
+# "torch" (sentence-transformers), "onnx" (same model on ONNX Runtime) or "onnx_int8" (dynamically quantized)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").strip().lower()
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "data/models/onnx")
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", 0))  # ONNX Runtime intra-op threads, 0 = all cores
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 32))
+
+ONNX_BACKENDS = ("onnx", "onnx_int8")
+
+def onnx_model_dir(model_name: str = EMBEDDING_MODEL) -> str:
+    return os.path.join(EMBEDDING_ONNX_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name))
+
+def export_onnx_model(model_name: str = EMBEDDING_MODEL, output_dir: str = None) -> str:
+    """Export the sentence-transformers model to ONNX (fp32 and int8) together with its tokenizer
+    and pooling settings. Runs once; later loads only need onnxruntime and tokenizers."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    output_dir = output_dir or onnx_model_dir(model_name)
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"📦 Exporting {model_name} to ONNX in {output_dir}...")
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0]
+    pooling = next(module for module in st_model if type(module).__name__ == "Pooling")
+    transformer.tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, "embedder_config.json"), "w") as f:
+        json.dump({
+            "model_name": model_name,
+            "pooling": pooling.get_pooling_mode_str(),
+            "normalize": any(type(module).__name__ == "Normalize" for module in st_model),
+            "max_seq_length": st_model.max_seq_length
+        }, f)
+
+    model = transformer.auto_model.eval()
+    sample = transformer.tokenizer(["warm up"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model, tuple(sample[name] for name in input_names), fp32_path,
+            input_names=input_names, output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes, opset_version=17
+        )
+    quantize_dynamic(fp32_path, os.path.join(output_dir, "model_int8.onnx"), weight_type=QuantType.QInt8)
+    return output_dir
+
+class OnnxEmbeddingFunction(EmbeddingFunction[Documents]):
+    """The sentence-transformers model run on ONNX Runtime with the same tokenizer, pooling and normalisation,
+    so vectors can stand in for the torch backend's; benchmarks/embedding_backends.py measures how closely."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, quantized: bool = False,
+                 threads: int = EMBEDDING_THREADS, batch_size: int = EMBEDDING_BATCH_SIZE):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.quantized = quantized
+        self.threads = threads
+        self.batch_size = max(1, batch_size)
+
+        model_dir = onnx_model_dir(model_name)
+        model_path = os.path.join(model_dir, "model_int8.onnx" if quantized else "model.onnx")
+        if not os.path.exists(model_path):
+            export_onnx_model(model_name, model_dir)
+
+        with open(os.path.join(model_dir, "embedder_config.json")) as f:
+            config = json.load(f)
+        self.pooling = config["pooling"]
+        self.normalize = config["normalize"]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=config["max_seq_length"])
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def _embed_batch(self, texts: list) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64)
+        }
+        hidden = self.session.run(None, {name: inputs[name] for name in self.input_names})[0]
+
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        else:  # mean
+            mask = inputs["attention_mask"][..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        # Batch texts of similar length together so little compute goes to padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        embeddings = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._embed_batch([texts[i] for i in batch])):
+                embeddings[i] = vector
+        return embeddings
+
+    @staticmethod
+    def name() -> str:
+        # Same model and vector space as the torch backend, so Chroma collections created with
+        # either backend can be opened with the other
+        return SentenceTransformerEmbeddingFunction.name()
+
+    def get_config(self):
+        # The sentence_transformer keys (Chroma rebuilds that function from them), plus which ONNX model was used
+        return {"model_name": self.model_name, "device": "cpu", "normalize_embeddings": bool(self.normalize),
+                "kwargs": {}, "quantized": self.quantized}
+
+    @staticmethod
+    def build_from_config(config) -> "OnnxEmbeddingFunction":
+        return OnnxEmbeddingFunction(config.get("model_name", EMBEDDING_MODEL), quantized=bool(config.get("quantized", False)))
+
+    def default_space(self):
+        return "cosine"
+
+    def supported_spaces(self):
+        return ["cosine", "l2", "ip"]
+
+def create_embedding_function(backend: str = EMBEDDING_BACKEND, model_name: str = EMBEDDING_MODEL):
+    """Build an embedding function for the given backend"""
+    if backend in ONNX_BACKENDS:
+        return OnnxEmbeddingFunction(model_name, quantized=backend == "onnx_int8")
+    if backend != "torch":
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}', expected torch, onnx or onnx_int8")
+    return SentenceTransformerEmbeddingFunction(model_name)
+
+def embedding_cache_model_name(backend: str = EMBEDDING_BACKEND, model_name: str = EMBEDDING_MODEL) -> str:
+    """Model identity for cached vectors; the torch backend keeps the plain model name"""
+    return model_name if backend == "torch" else f"{model_name}:{backend}"
+
+_embedding_function = None
+_embedding_function_lock = threading.Lock()
 
 def get_embedding_function():
-    print(f"🧠 Using {EMBEDDING_MODEL} for embeddings...")
-    return SentenceTransformerEmbeddingFunction(EMBEDDING_MODEL)
+    """Load the embedding model once per process and share it between callers.
+    Locked so a request arriving during the background warm-up waits for it instead of loading a second copy."""
+    global _embedding_function
+    if _embedding_function is None:
+        with _embedding_function_lock:
+            if _embedding_function is None:
+                print(f"🧠 Using {EMBEDDING_MODEL} ({EMBEDDING_BACKEND}) for embeddings...")
+                _embedding_function = create_embedding_function()
+    return _embedding_function
+
+class QueryEmbeddingCache:
+    """Embeddings for static query strings, kept in memory and persisted to a small JSON file.
+    Entries are keyed by model name + query text, so switching models never returns stale vectors."""
+
+    def __init__(self, embedding_function, model_name: str = EMBEDDING_MODEL, path: str = QUERY_EMBEDDING_CACHE_PATH):
+        self.embedding_function = embedding_function
+        self.model_name = model_name
+        self.path = path
+        self._lock = threading.Lock()
+        self._embeddings = self._load()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable query embedding cache {self.path}: {e}")
+            return {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._embeddings, f)
+        os.replace(tmp_path, self.path)
+
+    def embed(self, texts: list) -> list:
+        """Embeddings for texts in order; only texts never seen with this model are sent to the model"""
+        keys = [self._key(text) for text in texts]
+        with self._lock:
+            missing = {key: text for key, text in zip(keys, texts) if key not in self._embeddings}
+            if missing:
+                print(f"🧠 Embedding {len(missing)} new query string(s)...")
+                vectors = self.embedding_function(list(missing.values()))
+                for key, vector in zip(missing, vectors):
+                    self._embeddings[key] = [float(x) for x in vector]
+                try:
+                    self._save()
+                except OSError as e:
+                    print(f"⚠️ Could not persist query embedding cache: {e}")
+            return [self._embeddings[key] for key in keys]
+
+@lru_cache(maxsize=1)
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    return QueryEmbeddingCache(get_embedding_function(), embedding_cache_model_name())
+
+def embed_queries(texts: list) -> list:
+    """Embed query strings through the persistent query embedding cache"""
+    return get_query_embedding_cache().embed(texts)
@@ -0,0 +1,77 @@
+# rag/employee_filters.py
+import os
+import re
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Request filter -> (Chroma metadata key, operator, value type)
+EMPLOYEE_FILTERS = {
+    'min_hours_available_weekly': ('hours_available_weekly', '$gte', float),
+    'min_availability': ('availability', '$gte', float),
+    'min_experience_months': ('experience_months', '$gte', int),
+    'min_designation_level': ('designation_level_num', '$gte', int),
+    'max_designation_level': ('designation_level_num', '$lte', int),
+}
+
+# Applied to every search unless the request overrides them; by default fully booked people are never retrieved
+DEFAULT_EMPLOYEE_FILTERS = {
+    'min_hours_available_weekly': float(os.getenv("EMPLOYEE_MIN_HOURS_AVAILABLE_WEEKLY", 1)),
+}
+
+# llm: one Azure OpenAI prompt per role | fast: deterministic composite score, no LLM calls (see rag/fast_ranking.py)
+RECOMMENDATION_MODES = ("llm", "fast")
+RECOMMENDATION_MODE = os.getenv("RECOMMENDATION_MODE", "llm").strip().lower()
+
+# "L5" -> 5; levels without a number are stored as UNKNOWN_DESIGNATION_LEVEL
+DESIGNATION_LEVEL_PATTERN = re.compile(r"(\d+)")
+UNKNOWN_DESIGNATION_LEVEL = -1
+
+def designation_level_number(level: Any) -> int:
+    match = DESIGNATION_LEVEL_PATTERN.search(str(level))
+    return int(match.group(1)) if match else UNKNOWN_DESIGNATION_LEVEL
+
+def parse_filters(filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Request filters merged over the defaults, converted to the stored metadata types.
+    A null value switches a default off. Raises ValueError for unknown names or non-numeric values."""
+    if filters is not None and not isinstance(filters, dict):
+        raise ValueError("filters must be an object")
+
+    merged = dict(DEFAULT_EMPLOYEE_FILTERS)
+    merged.update(filters or {})
+
+    parsed = {}
+    for name, value in merged.items():
+        if name not in EMPLOYEE_FILTERS:
+            raise ValueError(f"Unknown filter '{name}' (expected one of: {', '.join(EMPLOYEE_FILTERS)})")
+        if value is None:
+            continue
+        _, _, kind = EMPLOYEE_FILTERS[name]
+        if 'designation_level' in name:
+            value = designation_level_number(value)
+            if value == UNKNOWN_DESIGNATION_LEVEL:
+                raise ValueError(f"Filter '{name}' needs a level such as 3 or \"L3\"")
+        try:
+            parsed[name] = kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Filter '{name}' must be a number, got {value!r}")
+    return parsed
+
+def build_where(filters: Dict[str, Any]) -> Optional[Dict]:
+    """Chroma where clause for parsed filters (None when there is nothing to filter on)"""
+    clauses = [
+        {EMPLOYEE_FILTERS[name][0]: {EMPLOYEE_FILTERS[name][1]: value}}
+        for name, value in filters.items()
+    ]
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def parse_mode(mode: Optional[str] = None) -> str:
+    """Requested recommendation mode, RECOMMENDATION_MODE when none is given"""
+    if mode is None:
+        mode = RECOMMENDATION_MODE
+    if not isinstance(mode, str) or mode.strip().lower() not in RECOMMENDATION_MODES:
+        raise ValueError(f"Unknown mode {mode!r} (expected one of: {', '.join(RECOMMENDATION_MODES)})")
+    return mode.strip().lower()
@@ -5,15 +5,28 @@ import chromadb
 from chromadb.config import Settings
 import os
 import json
+import hashlib
+import heapq
+import asyncio
+import threading
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import List, Dict, Any
-from rag.query_azure_openai import query_azure_openai
+from rag.query_azure_openai import query_azure_openai, aquery_azure_openai
 from rag.embedder import get_embedding_function  #  Don't break my embedder.py 🤣
+from rag.roster_cache import read_roster_cache, write_roster_cache, roster_cache_path
+from rag.skill_index import SkillIndex
+from rag.employee_filters import (
+    DESIGNATION_LEVEL_PATTERN, UNKNOWN_DESIGNATION_LEVEL, RECOMMENDATION_MODE, parse_filters, build_where
+)
+from rag.fast_ranking import rank_candidates
 from rag.prompts import (
     generate_manager_recommendation_prompt,
     generate_tester_recommendation_prompt,
     generate_developer_recommendation_prompt,
     generate_employee_search_query,
-    generate_employee_text_summary
+    generate_employee_text_summaries
 )
 from utils.validator import extract_json_from_text
 from dotenv import load_dotenv
@@ -30,6 +43,108 @@ N_MANAGERS_QUERY = int(os.getenv("N_MANAGERS_QUERY", 5))
 N_TESTERS_QUERY = int(os.getenv("N_TESTERS_QUERY", 5))
 N_DEVELOPERS_QUERY = int(os.getenv("N_DEVELOPERS_QUERY", 10))
 
+# Candidates retrieved per role; the search fans out over every role listed here
+ROLE_QUERY_LIMITS = {
+    'manager': N_MANAGERS_QUERY,
+    'tester': N_TESTERS_QUERY,
+    'developer': N_DEVELOPERS_QUERY
+}
+
+# Concurrent per-role recommendation prompts and how long each role may take before it is dropped
+ROLE_RECOMMENDATION_WORKERS = int(os.getenv("ROLE_RECOMMENDATION_WORKERS", 3))
+ROLE_RECOMMENDATION_TIMEOUT = float(os.getenv("ROLE_RECOMMENDATION_TIMEOUT", 90))
+
+# Restrict the vector search to the employees with the best exact skill coverage of the SOW technologies
+SKILL_PREFILTER = os.getenv("SKILL_PREFILTER", "true").strip().lower() in ("1", "true", "yes")
+SKILL_PREFILTER_CANDIDATES = int(os.getenv("SKILL_PREFILTER_CANDIDATES", 100))
+
+# Recommendations per role, the same counts the role prompts ask the LLM for
+ROLE_RECOMMENDATION_COUNTS = {
+    'manager': int(os.getenv("N_MANAGERS", 1)),
+    'tester': int(os.getenv("N_TESTERS", 1)),
+    'developer': int(os.getenv("N_DEVELOPERS", 4))
+}
+
+ROLE_PROMPT_GENERATORS = {
+    'manager': generate_manager_recommendation_prompt,
+    'tester': generate_tester_recommendation_prompt,
+    'developer': generate_developer_recommendation_prompt
+}
+
+# Chroma metadata key -> (roster column, value used when the column is missing)
+EMPLOYEE_METADATA_COLUMNS = {
+    'resource_id': ('ResourceId', ''),
+    'resource_name': ('ResourceName', 'Unknown'),
+    'designation': ('ResourceDesignationName', 'Unknown'),
+    'experience_months': ('ResourceExperienceInMonths', 0),
+    'designation_level': ('ResourceDesignationLevel', 'Unknown'),
+    'department': ('ResourceDepartmentName', 'Unknown'),
+    'base_department': ('ResourceBaseDepartment', 'Unknown'),
+    'skills': ('ResourceSubSkillWithProficiency', ''),
+    'hours_worked': ('HoursWorkedOnSkill', '0'),
+    'availability': ('ResourceAvailabilityInPercentage', 0),
+    'hours_available_weekly': ('HoursAvailableOutOf40', 0),
+    'practices_with_hours': ('ResourcePracticesWithHoursWorked', '')
+}
+
+# Stored as numbers rather than strings so Chroma can filter on them (see rag/employee_filters.py).
+# Changing a stored type changes every row hash, so the first start after such a change re-syncs each collection once.
+NUMERIC_METADATA_TYPES = {
+    'experience_months': int,
+    'availability': float,
+    'hours_available_weekly': float
+}
+
+def metadata_column(df: pd.DataFrame, key: str, column: str, default) -> List:
+    """One metadata key for every row: numbers for NUMERIC_METADATA_TYPES, strings otherwise"""
+    if column not in df.columns:
+        return [default] * len(df)
+    kind = NUMERIC_METADATA_TYPES.get(key)
+    if kind is None:
+        return df[column].astype(str).tolist()
+    return pd.to_numeric(df[column], errors='coerce').fillna(0).astype(kind).tolist()
+
+def build_role_vectors(df: pd.DataFrame, employee_type: str):
+    """Documents, metadata dicts and ids for every employee of one type, built column by column.
+    Row for row, the same text as generate_employee_text_summary and the same metadata as the per-row build."""
+    documents = generate_employee_text_summaries(df, employee_type)
+
+    # Zipping plain lists is several times faster than DataFrame.to_dict('records')
+    keys = list(EMPLOYEE_METADATA_COLUMNS) + ['designation_level_num', 'employee_type']
+    columns = [
+        metadata_column(df, key, column, default)
+        for key, (column, default) in EMPLOYEE_METADATA_COLUMNS.items()
+    ]
+    # "L5" -> 5, so designation levels can be compared
+    if 'ResourceDesignationLevel' in df.columns:
+        levels = df['ResourceDesignationLevel'].astype(str).str.extract(DESIGNATION_LEVEL_PATTERN, expand=False)
+        columns.append(pd.to_numeric(levels, errors='coerce').fillna(UNKNOWN_DESIGNATION_LEVEL).astype(int).tolist())
+    else:
+        columns.append([UNKNOWN_DESIGNATION_LEVEL] * len(df))
+    columns.append([employee_type] * len(df))
+    metadatas = [dict(zip(keys, values)) for values in zip(*columns)]
+
+    # Rows without a ResourceId column fall back to their index label
+    id_values = df['ResourceId'] if 'ResourceId' in df.columns else df.index.to_series(index=df.index)
+    ids = (f"{employee_type}_" + id_values.astype(str)).tolist()
+
+    return documents, metadatas, ids
+
+# Every roster column the vectors are built from; the cache load reads only these
+ROSTER_COLUMNS = [column for column, _ in EMPLOYEE_METADATA_COLUMNS.values()]
+
+def sow_technologies(sow_data: Dict[str, Any]) -> List[str]:
+    """The SOW technology field as a list (the UI sends a list, older clients a comma-separated string)"""
+    technology = sow_data.get('technology', [])
+    if isinstance(technology, str):
+        technology = technology.split(',')
+    return [str(item).strip() for item in technology if str(item).strip()]
+
+def employee_row_hash(document: str, metadata: Dict[str, Any]) -> str:
+    """Fingerprint of everything stored for one employee, used to skip re-embedding unchanged rows"""
+    payload = json.dumps([document, {key: value for key, value in metadata.items() if key != 'content_hash'}], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 class EmployeeRecommender:
     def __init__(self, 
                  developer_csv_path: str = DEVELOPER_CSV_PATH,
@@ -42,10 +157,10 @@ class EmployeeRecommender:
         self.tester_csv_path = tester_csv_path
         self.chroma_path = chroma_path
         
-        # Processed file paths
-        self.processed_developer_path = developer_csv_path.replace("DeveloperDetails.csv", "_developer_cache.csv") if developer_csv_path else None
-        self.processed_manager_path = manager_csv_path.replace("ManagerDetails.csv", "_manager_cache.csv") if manager_csv_path else None
-        self.processed_tester_path = tester_csv_path.replace("TesterDetails.csv", "_tester_cache.csv") if tester_csv_path else None
+        # Processed file paths (typed Feather caches next to the source CSVs)
+        self.processed_developer_path = roster_cache_path(developer_csv_path) if developer_csv_path else None
+        self.processed_manager_path = roster_cache_path(manager_csv_path) if manager_csv_path else None
+        self.processed_tester_path = roster_cache_path(tester_csv_path) if tester_csv_path else None
         
         # ChromaDB clients and collections
         self.client = None
@@ -57,10 +172,56 @@ class EmployeeRecommender:
         self.developer_df = None
         self.manager_df = None
         self.tester_df = None
+
+        # Skill -> (employee, proficiency) indexes per employee type, rebuilt with the rosters
+        self.skill_indexes: Dict[str, SkillIndex] = {}
         
         self.embedding_function = get_embedding_function()  # Use our own embedder
 
-    def preprocess_csv(self, csv_path: str, employee_type: str = "employee"):
+        # Guards (re)initialisation so waitress threads can share one instance
+        self._lock = threading.RLock()
+        self._roster_fingerprint = None
+
+    def roster_fingerprint(self):
+        """Cheap change detector for the roster CSVs (path, mtime, size)"""
+        fingerprint = []
+        for path in (self.developer_csv_path, self.manager_csv_path, self.tester_csv_path):
+            if path and os.path.exists(path):
+                stat = os.stat(path)
+                fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+            else:
+                fingerprint.append((path, None, None))
+        return tuple(fingerprint)
+
+    def ensure_ready(self) -> float:
+        """Initialise ChromaDB and employee vectors once, refreshing only when the roster files change.
+        Returns the seconds spent initialising (0.0 when the instance was already warm)."""
+        fingerprint = self.roster_fingerprint()
+        if self.client is not None and fingerprint == self._roster_fingerprint:
+            return 0.0
+
+        with self._lock:
+            # Another thread may have finished initialising while we waited
+            if self.client is not None and fingerprint == self._roster_fingerprint:
+                return 0.0
+
+            start = time.perf_counter()
+            if self.client is None:
+                self.initialize_chroma()
+            else:
+                print("🔄 Roster files changed, refreshing employee data...")
+
+            self.load_and_process_all_csvs()
+            self.create_employee_vectors()
+            self.build_skill_indexes()
+            self._roster_fingerprint = fingerprint
+
+            elapsed = time.perf_counter() - start
+            print(f"⏱️ Employee recommender ready in {elapsed:.2f}s")
+            return elapsed
+
+    @staticmethod
+    def preprocess_csv(csv_path: str, employee_type: str = "employee"):
         """Preprocess CSV with updated schema including new fields"""
         print(f"📂 Loading {employee_type} data from: {csv_path}")
         
@@ -104,23 +265,31 @@ class EmployeeRecommender:
         print(f"✅ {employee_type} data for {len(df)} unique employees processed")
         return df
 
-    def preprocess_developer_csv(self):
-        """Preprocess the developer CSV"""
-        df = self.preprocess_csv(self.developer_csv_path, "developer")
-        df.to_csv(self.processed_developer_path, index=False)
-        return df
+    def get_roster_paths(self, employee_type: str):
+        """(source CSV, processed cache) paths for one employee type"""
+        if employee_type == 'manager':
+            return self.manager_csv_path, self.processed_manager_path
+        elif employee_type == 'tester':
+            return self.tester_csv_path, self.processed_tester_path
+        else:
+            return self.developer_csv_path, self.processed_developer_path
 
-    def preprocess_manager_csv(self):
-        """Preprocess the manager CSV"""
-        df = self.preprocess_csv(self.manager_csv_path, "manager")
-        df.to_csv(self.processed_manager_path, index=False)
-        return df
+    def load_roster(self, employee_type: str) -> pd.DataFrame:
+        """Processed roster for one employee type, from the Feather cache when it matches the source CSV"""
+        csv_path, cache_path = self.get_roster_paths(employee_type)
 
-    def preprocess_tester_csv(self):
-        """Preprocess the tester CSV"""
-        df = self.preprocess_csv(self.tester_csv_path, "tester")
-        df.to_csv(self.processed_tester_path, index=False)
-        return df
+        df = read_roster_cache(cache_path, csv_path, columns=ROSTER_COLUMNS)
+        if df is not None:
+            print(f"📈 Using existing processed {employee_type} roster...")
+            return df
+
+        print(f"🔄 Processing {employee_type} CSV data...")
+        df = self.preprocess_csv(csv_path, employee_type)
+        try:
+            write_roster_cache(df, cache_path, csv_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not write {employee_type} roster cache: {e}")
+        return df[[column for column in ROSTER_COLUMNS if column in df.columns]]
 
     def initialize_chroma(self):
         """Initialize ChromaDB with separate collections for each employee type"""
@@ -154,37 +323,11 @@ class EmployeeRecommender:
     def load_and_process_all_csvs(self):
         """Load and process all three CSV files"""
         print("📊 Loading all employee data from CSVs...")
-        
-        # Load developer data
-        if (os.path.exists(self.processed_developer_path) and 
-            os.path.exists(self.developer_csv_path) and
-            os.path.getmtime(self.processed_developer_path) > os.path.getmtime(self.developer_csv_path)):
-            print("📈 Using existing processed developer CSV...")
-            self.developer_df = pd.read_csv(self.processed_developer_path)
-        else:
-            print("🔄 Processing developer CSV data...")
-            self.developer_df = self.preprocess_developer_csv()
-        
-        # Load manager data
-        if (os.path.exists(self.processed_manager_path) and 
-            os.path.exists(self.manager_csv_path) and
-            os.path.getmtime(self.processed_manager_path) > os.path.getmtime(self.manager_csv_path)):
-            print("📈 Using existing processed manager CSV...")
-            self.manager_df = pd.read_csv(self.processed_manager_path)
-        else:
-            print("🔄 Processing manager CSV data...")
-            self.manager_df = self.preprocess_manager_csv()
-        
-        # Load tester data
-        if (os.path.exists(self.processed_tester_path) and 
-            os.path.exists(self.tester_csv_path) and
-            os.path.getmtime(self.processed_tester_path) > os.path.getmtime(self.tester_csv_path)):
-            print("📈 Using existing processed tester CSV...")
-            self.tester_df = pd.read_csv(self.processed_tester_path)
-        else:
-            print("🔄 Processing tester CSV data...")
-            self.tester_df = self.preprocess_tester_csv()
-        
+
+        self.developer_df = self.load_roster('developer')
+        self.manager_df = self.load_roster('manager')
+        self.tester_df = self.load_roster('tester')
+
         print(f"📈 Loaded {len(self.developer_df)} developers, {len(self.manager_df)} managers, {len(self.tester_df)} testers")
 
     def create_employee_vectors(self):
@@ -192,193 +335,175 @@ class EmployeeRecommender:
         if self.developer_df is None:
             self.load_and_process_all_csvs()
 
-        self._create_developer_vectors()
-        self._create_manager_vectors()
-        self._create_tester_vectors()
-
-    def _create_developer_vectors(self):
-        """Create vectors for developers"""
-        print("🔍 Creating developer vectors...")
-        
-        if self.developer_collection.count() > 0:
-            print("📦 Developer vectors already exist, skipping creation...")
-            return
-
-        documents = []
-        metadatas = []
-        ids = []
-
-        for idx, row in self.developer_df.iterrows():
-            doc_text = generate_employee_text_summary(row, "developer")
-            documents.append(doc_text)
-
-            metadata = {
-                'resource_id': str(row.get('ResourceId', '')),
-                'resource_name': str(row.get('ResourceName', 'Unknown')),
-                'designation': str(row.get('ResourceDesignationName', 'Unknown')),
-                'experience_months': str(row.get('ResourceExperienceInMonths', '0')),
-                'designation_level': str(row.get('ResourceDesignationLevel', 'Unknown')),
-                'department': str(row.get('ResourceDepartmentName', 'Unknown')),
-                'base_department': str(row.get('ResourceBaseDepartment', 'Unknown')),
-                'skills': str(row.get('ResourceSubSkillWithProficiency', '')),
-                'hours_worked': str(row.get('HoursWorkedOnSkill', '0')),
-                'availability': str(row.get('ResourceAvailabilityInPercentage', '0')),
-                'hours_available_weekly': str(row.get('HoursAvailableOutOf40', '0')),  # New field
-                'practices_with_hours': str(row.get('ResourcePracticesWithHoursWorked', '')),  # New field
-                'employee_type': 'developer'
-            }
-            metadatas.append(metadata)
-            ids.append(f"developer_{row.get('ResourceId', idx)}")
-
-        self._add_vectors_to_collection(self.developer_collection, documents, metadatas, ids, "developers")
+        for employee_type in ROLE_QUERY_LIMITS:
+            self._create_role_vectors(employee_type)
 
-    def _create_manager_vectors(self):
-        """Create vectors for managers"""
-        print("🔍 Creating manager vectors...")
-        
-        if self.manager_collection.count() > 0:
-            print("📦 Manager vectors already exist, skipping creation...")
-            return
-
-        documents = []
-        metadatas = []
-        ids = []
-
-        for idx, row in self.manager_df.iterrows():
-            doc_text = generate_employee_text_summary(row, "manager")
-            documents.append(doc_text)
-
-            metadata = {
-                'resource_id': str(row.get('ResourceId', '')),
-                'resource_name': str(row.get('ResourceName', 'Unknown')),
-                'designation': str(row.get('ResourceDesignationName', 'Unknown')),
-                'experience_months': str(row.get('ResourceExperienceInMonths', '0')),
-                'designation_level': str(row.get('ResourceDesignationLevel', 'Unknown')),
-                'department': str(row.get('ResourceDepartmentName', 'Unknown')),
-                'base_department': str(row.get('ResourceBaseDepartment', 'Unknown')),
-                'skills': str(row.get('ResourceSubSkillWithProficiency', '')),
-                'hours_worked': str(row.get('HoursWorkedOnSkill', '0')),
-                'availability': str(row.get('ResourceAvailabilityInPercentage', '0')),
-                'hours_available_weekly': str(row.get('HoursAvailableOutOf40', '0')),  # New field
-                'practices_with_hours': str(row.get('ResourcePracticesWithHoursWorked', '')),  # New field
-                'employee_type': 'manager'
-            }
-            metadatas.append(metadata)
-            ids.append(f"manager_{row.get('ResourceId', idx)}")
-
-        self._add_vectors_to_collection(self.manager_collection, documents, metadatas, ids, "managers")
-
-    def _create_tester_vectors(self):
-        """Create vectors for testers"""
-        print("🔍 Creating tester vectors...")
-        
-        if self.tester_collection.count() > 0:
-            print("📦 Tester vectors already exist, skipping creation...")
-            return
-
-        documents = []
-        metadatas = []
-        ids = []
-
-        for idx, row in self.tester_df.iterrows():
-            doc_text = generate_employee_text_summary(row, "tester")
-            documents.append(doc_text)
-
-            metadata = {
-                'resource_id': str(row.get('ResourceId', '')),
-                'resource_name': str(row.get('ResourceName', 'Unknown')),
-                'designation': str(row.get('ResourceDesignationName', 'Unknown')),
-                'experience_months': str(row.get('ResourceExperienceInMonths', '0')),
-                'designation_level': str(row.get('ResourceDesignationLevel', 'Unknown')),
-                'department': str(row.get('ResourceDepartmentName', 'Unknown')),
-                'base_department': str(row.get('ResourceBaseDepartment', 'Unknown')),
-                'skills': str(row.get('ResourceSubSkillWithProficiency', '')),
-                'hours_worked': str(row.get('HoursWorkedOnSkill', '0')),
-                'availability': str(row.get('ResourceAvailabilityInPercentage', '0')),
-                'hours_available_weekly': str(row.get('HoursAvailableOutOf40', '0')),  # New field
-                'practices_with_hours': str(row.get('ResourcePracticesWithHoursWorked', '')),  # New field
-                'employee_type': 'tester'
-            }
-            metadatas.append(metadata)
-            ids.append(f"tester_{row.get('ResourceId', idx)}")
+    def build_skill_indexes(self):
+        """Parse every roster's skill strings into a SkillIndex"""
+        start = time.perf_counter()
+        self.skill_indexes = {
+            employee_type: SkillIndex.from_dataframe(self.get_dataframe(employee_type), employee_type)
+            for employee_type in ROLE_QUERY_LIMITS
+        }
+        print(f"🧩 Built skill indexes in {time.perf_counter() - start:.2f}s "
+              f"({', '.join(f'{len(index.vocabulary)} {t} skills' for t, index in self.skill_indexes.items())})")
+
+    def skill_coverage(self, employee_type: str, sow_data: Dict[str, Any]) -> Dict[str, float]:
+        """Skill coverage of every employee of one type who lists a requested technology, keyed by Chroma id.
+        Computed whether or not SKILL_PREFILTER is on, since fast ranking and prompt trimming score with it."""
+        index = self.skill_indexes.get(employee_type)
+        technologies = sow_technologies(sow_data)
+        if index is None or not technologies:
+            return {}
+        return index.coverage_by_id(technologies)
+
+    @staticmethod
+    def skill_prefilter(coverage: Dict[str, float]) -> List[str]:
+        """Ids of the SKILL_PREFILTER_CANDIDATES best-covered employees, best first (none when prefiltering is off)"""
+        if not SKILL_PREFILTER:
+            return []
+        return heapq.nlargest(SKILL_PREFILTER_CANDIDATES, coverage, key=coverage.get)
+
+    def get_dataframe(self, employee_type: str) -> pd.DataFrame:
+        """Processed roster for one employee type"""
+        if employee_type == 'manager':
+            return self.manager_df
+        elif employee_type == 'tester':
+            return self.tester_df
+        else:
+            return self.developer_df
+
+    def _create_role_vectors(self, employee_type: str):
+        """Create or sync the vectors for one employee type"""
+        print(f"🔍 Syncing {employee_type} vectors...")
+
+        documents, metadatas, ids = build_role_vectors(self.get_dataframe(employee_type), employee_type)
+        self._sync_collection(self.get_collection(employee_type), documents, metadatas, ids, f"{employee_type}s")
+
+    def _sync_collection(self, collection, documents, metadatas, ids, collection_type):
+        """Bring a collection in line with the roster: embed and upsert only new or changed rows,
+        delete employees who are no longer listed. Unchanged rows are never re-embedded."""
+        for document, metadata in zip(documents, metadatas):
+            metadata['content_hash'] = employee_row_hash(document, metadata)
+
+        # Chroma can't return a single metadata key, so this reads every stored row's metadata (no documents or
+        # embeddings): the diff costs O(roster size) however few rows changed, but only changed rows are embedded
+        existing = collection.get(include=["metadatas"])
+        existing_hashes = {
+            existing_id: (metadata or {}).get('content_hash')
+            for existing_id, metadata in zip(existing['ids'], existing['metadatas'])
+        }
 
-        self._add_vectors_to_collection(self.tester_collection, documents, metadatas, ids, "testers")
+        changed = [i for i, (row_id, metadata) in enumerate(zip(ids, metadatas))
+                   if existing_hashes.get(row_id) != metadata['content_hash']]
+        removed = list(existing_hashes.keys() - set(ids))
 
-    def _add_vectors_to_collection(self, collection, documents, metadatas, ids, collection_type):
-        """Helper method to add vectors to a collection in batches"""
-        embeddings = self.embedding_function(documents)
-        
         MAX_BATCH = 5000
-        total = len(documents)
-        for i in range(0, total, MAX_BATCH):
-            end = min(i + MAX_BATCH, total)
-            print(f"➡️ Adding {collection_type} batch {i//MAX_BATCH + 1} to vector db")
-            collection.add(
-                documents=documents[i:end],
-                metadatas=metadatas[i:end],
-                ids=ids[i:end],
-                embeddings=embeddings[i:end]
+        for i in range(0, len(removed), MAX_BATCH):
+            collection.delete(ids=removed[i:i + MAX_BATCH])
+
+        for i in range(0, len(changed), MAX_BATCH):
+            batch = changed[i:i + MAX_BATCH]
+            print(f"➡️ Upserting {collection_type} batch {i//MAX_BATCH + 1} to vector db")
+            batch_documents = [documents[j] for j in batch]
+            collection.upsert(
+                documents=batch_documents,
+                metadatas=[metadatas[j] for j in batch],
+                ids=[ids[j] for j in batch],
+                embeddings=self.embedding_function(batch_documents)
             )
-        
-        print(f"✅ Created vectors for {len(documents)} {collection_type}")
 
-    def search_employees_by_type(self, sow_data: Dict[str, Any], employee_type: str, n_results: int = 5) -> List[Dict]:
-        """Search for employees of a specific type"""
-        print(f"🔎 Searching for {employee_type}s matching SOW requirements...")
-        
-        search_query = generate_employee_search_query(sow_data)
-        print(f"🔸 Search query for {employee_type}s: {search_query}")
+        print(f"✅ Synced {collection_type}: {len(changed)} added/updated, {len(removed)} removed, "
+              f"{len(ids) - len(changed)} unchanged")
 
-        # Select appropriate collection
+    def get_collection(self, employee_type: str):
+        """Select appropriate collection"""
         if employee_type == 'manager':
-            collection = self.manager_collection
+            return self.manager_collection
         elif employee_type == 'tester':
-            collection = self.tester_collection
+            return self.tester_collection
         else:
-            collection = self.developer_collection
-
-        # Get embedding and query
-        embedding = self.embedding_function([search_query])[0]
-        results = collection.query(
-            query_embeddings=[embedding],
-            n_results=n_results
-        )
-
-        candidates = []
-        for i in range(len(results['ids'][0])):
-            candidate = {
+            return self.developer_collection
+
+    def embed_search_query(self, sow_data: Dict[str, Any]):
+        """Embed the SOW search query once; every role is searched with the same vector"""
+        search_query = generate_employee_search_query(sow_data)
+        print(f"🔸 Employee search query: {search_query}")
+        return self.embedding_function([search_query])[0]
+
+    @staticmethod
+    def _result_candidates(results: Dict, employee_type: str, coverage: Dict[str, float]) -> List[Dict]:
+        """Candidate dicts from a single-query Chroma result"""
+        return [
+            {
                 'id': results['ids'][0][i],
-                'similarity_score': 1 - results['distances'][0][i],
+                # The collections use Chroma's default squared L2 distance; on unit-length embeddings
+                # that is 2 - 2 * cosine, so this is the cosine similarity
+                'similarity_score': 1 - results['distances'][0][i] / 2,
+                'skill_coverage': coverage.get(results['ids'][0][i], 0.0),
                 'metadata': results['metadatas'][0][i],
                 'document': results['documents'][0][i],
                 'employee_type': employee_type
             }
-            candidates.append(candidate)
+            for i in range(len(results['ids'][0]))
+        ]
+
+    def search_employees_by_type(self, sow_data: Dict[str, Any], employee_type: str, n_results: int = 5,
+                                 query_embedding=None, where: Dict = None) -> List[Dict]:
+        """Search for employees of a specific type. where (from build_where) is evaluated by Chroma before ranking."""
+        print(f"🔎 Searching for {employee_type}s matching SOW requirements...")
+
+        if query_embedding is None:
+            query_embedding = self.embed_search_query(sow_data)
+
+        collection = self.get_collection(employee_type)
+        # Coverage of everyone who lists a requested skill, so fill-query candidates are scored too
+        coverage = self.skill_coverage(employee_type, sow_data)
+        prefiltered = self.skill_prefilter(coverage)
+        if prefiltered:
+            # Rank only the employees who actually list the requested skills
+            results = collection.query(query_embeddings=[query_embedding], n_results=min(n_results, len(prefiltered)),
+                                       ids=prefiltered, where=where)
+        else:
+            results = collection.query(query_embeddings=[query_embedding], n_results=n_results, where=where)
+
+        candidates = self._result_candidates(results, employee_type, coverage)
+        if prefiltered and len(candidates) < n_results:
+            # Too few skill matches: fill the remaining slots from the plain vector search
+            seen = {candidate['id'] for candidate in candidates}
+            fill = collection.query(query_embeddings=[query_embedding], n_results=n_results, where=where)
+            extra = [candidate for candidate in self._result_candidates(fill, employee_type, coverage) if candidate['id'] not in seen]
+            candidates.extend(extra[:n_results - len(candidates)])
 
         print(f"✅ Retrieved {len(candidates)} candidate {employee_type}s")
         return candidates
 
-    def search_all_employees(self, sow_data: Dict[str, Any]) -> Dict[str, List[Dict]]:
-        """Search for all employee types based on SOW requirements"""
+    def search_all_employees(self, sow_data: Dict[str, Any], filters: Dict[str, Any] = None) -> Dict[str, List[Dict]]:
+        """Search for all employee types based on SOW requirements, keeping only employees that pass filters"""
         print("🔍 Searching for all employee types...")
-        
-        # Use configurable query limits
-        managers = self.search_employees_by_type(sow_data, 'manager', N_MANAGERS_QUERY)
-        testers = self.search_employees_by_type(sow_data, 'tester', N_TESTERS_QUERY)
-        developers = self.search_employees_by_type(sow_data, 'developer', N_DEVELOPERS_QUERY)
-        
-        return {
-            'managers': managers,
-            'testers': testers,
-            'developers': developers
-        }
+
+        where = build_where(parse_filters(filters))
+        if where:
+            print(f"🔸 Employee filters: {where}")
+
+        # Embed once, then query every role's collection concurrently with the shared vector. Like the role
+        # prompts, each request gets its own pool so concurrent requests never wait on each other's searches.
+        query_embedding = self.embed_search_query(sow_data)
+        with ThreadPoolExecutor(max_workers=len(ROLE_QUERY_LIMITS), thread_name_prefix="employee-search") as executor:
+            futures = {
+                employee_type: executor.submit(
+                    self.search_employees_by_type, sow_data, employee_type, n_results, query_embedding, where
+                )
+                for employee_type, n_results in ROLE_QUERY_LIMITS.items()
+            }
+            return {f"{employee_type}s": future.result() for employee_type, future in futures.items()}
 
     def get_manager_recommendations(self, sow_data: Dict[str, Any], manager_candidates: List[Dict]) -> Dict:
         """Get AI recommendations specifically for managers"""
         print("🤖 Getting AI recommendations for managers...")
         
         prompt = generate_manager_recommendation_prompt(sow_data, manager_candidates)
-        response = query_azure_openai(prompt)
+        response = query_azure_openai(prompt, timeout=ROLE_RECOMMENDATION_TIMEOUT)
 
         try:
             result = extract_json_from_text(response)
@@ -393,7 +518,7 @@ class EmployeeRecommender:
         print("🤖 Getting AI recommendations for testers...")
         
         prompt = generate_tester_recommendation_prompt(sow_data, tester_candidates)
-        response = query_azure_openai(prompt)
+        response = query_azure_openai(prompt, timeout=ROLE_RECOMMENDATION_TIMEOUT)
 
         try:
             result = extract_json_from_text(response)
@@ -408,7 +533,7 @@ class EmployeeRecommender:
         print("🤖 Getting AI recommendations for developers...")
         
         prompt = generate_developer_recommendation_prompt(sow_data, developer_candidates)
-        response = query_azure_openai(prompt)
+        response = query_azure_openai(prompt, timeout=ROLE_RECOMMENDATION_TIMEOUT)
 
         try:
             result = extract_json_from_text(response)
@@ -454,30 +579,126 @@ class EmployeeRecommender:
 
     def get_ai_recommendations(self, sow_data: Dict[str, Any], all_candidates: Dict[str, List[Dict]]) -> Dict:
         """Get AI recommendations for all employee types using separate prompts"""
-        print("🤖 Getting AI recommendations for all employee types (separate prompts)...")
-        
-        # Get recommendations for each employee type separately
-        manager_recs = self.get_manager_recommendations(sow_data, all_candidates['managers'])
-        tester_recs = self.get_tester_recommendations(sow_data, all_candidates['testers'])
-        developer_recs = self.get_developer_recommendations(sow_data, all_candidates['developers'])
-        
+        print("🤖 Getting AI recommendations for all employee types (separate prompts, run concurrently)...")
+
+        role_recommenders = {
+            'manager': self.get_manager_recommendations,
+            'tester': self.get_tester_recommendations,
+            'developer': self.get_developer_recommendations
+        }
+        # A pool per request: roles never queue behind another request's LLM calls, so the deadline below
+        # only has to cover this request's own prompts (LLM_MAX_CONCURRENCY still caps the process as a whole)
+        executor = ThreadPoolExecutor(max_workers=max(1, ROLE_RECOMMENDATION_WORKERS), thread_name_prefix="role-recommend")
+        futures = {
+            employee_type: executor.submit(recommend, sow_data, all_candidates[f"{employee_type}s"])
+            for employee_type, recommend in role_recommenders.items()
+        }
+
+        # Roles queued behind a full pool get their own timeout window too
+        waves = math.ceil(len(futures) / max(1, ROLE_RECOMMENDATION_WORKERS))
+        deadline = time.monotonic() + ROLE_RECOMMENDATION_TIMEOUT * waves
+
+        role_recs = {}
+        try:
+            for employee_type, future in futures.items():
+                try:
+                    role_recs[employee_type] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeoutError:
+                    future.cancel()
+                    print(f"⏰ {employee_type.title()} recommendations timed out after {ROLE_RECOMMENDATION_TIMEOUT}s")
+                    role_recs[employee_type] = {f"{employee_type}s": []}
+        finally:
+            # Don't hold the response for a call that already timed out; its thread exits when the call returns
+            executor.shutdown(wait=False, cancel_futures=True)
+
         # Combine all recommendations
-        combined_recommendations = self.combine_recommendations(manager_recs, tester_recs, developer_recs)
+        combined_recommendations = self.combine_recommendations(role_recs['manager'], role_recs['tester'], role_recs['developer'])
         
         print(f"✅ Generated {len(combined_recommendations['recommendations'])} total recommendations")
         return combined_recommendations
     
-    def recommend_employees(self, sow_data: Dict[str, Any]) -> Dict:
+    def get_fast_recommendations(self, sow_data: Dict[str, Any], all_candidates: Dict[str, List[Dict]]) -> Dict:
+        """Rank every role's candidates by composite score instead of asking the LLM"""
+        print("⚡ Ranking candidates by composite score (no LLM)...")
+
+        technologies = sow_technologies(sow_data)
+        role_recs = {
+            employee_type: {f"{employee_type}s": rank_candidates(all_candidates[f"{employee_type}s"], technologies, n)}
+            for employee_type, n in ROLE_RECOMMENDATION_COUNTS.items()
+        }
+        return self.combine_recommendations(role_recs['manager'], role_recs['tester'], role_recs['developer'])
+
+    def recommend_employees(self, sow_data: Dict[str, Any], filters: Dict[str, Any] = None,
+                            mode: str = RECOMMENDATION_MODE) -> Dict:
         """Main method to recommend employees from all types"""
-        print("🎯 Starting comprehensive employee recommendation process...")
-        
-        if self.client is None:
-            self.initialize_chroma()
-            self.create_employee_vectors()
+        print(f"🎯 Starting comprehensive employee recommendation process ({mode} mode)...")
 
-        all_candidates = self.search_all_employees(sow_data)
-        recommendations = self.get_ai_recommendations(sow_data, all_candidates)
+        request_start = time.perf_counter()
+        init_seconds = self.ensure_ready()
 
+        all_candidates = self.search_all_employees(sow_data, filters)
+        if mode == "fast":
+            recommendations = self.get_fast_recommendations(sow_data, all_candidates)
+        else:
+            recommendations = self.get_ai_recommendations(sow_data, all_candidates)
+
+        return self._build_response(sow_data, all_candidates, recommendations, init_seconds, request_start, mode)
+
+    async def aget_role_recommendations(self, employee_type: str, sow_data: Dict[str, Any], candidates: List[Dict]) -> Dict:
+        """Async counterpart of get_manager/tester/developer_recommendations"""
+        print(f"🤖 Getting AI recommendations for {employee_type}s (async)...")
+
+        prompt = ROLE_PROMPT_GENERATORS[employee_type](sow_data, candidates)
+        response = await aquery_azure_openai(prompt, timeout=ROLE_RECOMMENDATION_TIMEOUT)
+
+        try:
+            return extract_json_from_text(response)
+
+        except ValueError as e:
+            print(f"⚠️ {employee_type.title()} JSON extraction failed: {e}")
+            return {f"{employee_type}s": []}
+
+    async def aget_ai_recommendations(self, sow_data: Dict[str, Any], all_candidates: Dict[str, List[Dict]]) -> Dict:
+        """Async counterpart of get_ai_recommendations with the same concurrency cap and per-role timeout"""
+        semaphore = asyncio.Semaphore(max(1, ROLE_RECOMMENDATION_WORKERS))
+
+        async def recommend(employee_type: str) -> Dict:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.aget_role_recommendations(employee_type, sow_data, all_candidates[f"{employee_type}s"]),
+                        ROLE_RECOMMENDATION_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    print(f"⏰ {employee_type.title()} recommendations timed out after {ROLE_RECOMMENDATION_TIMEOUT}s")
+                    return {f"{employee_type}s": []}
+
+        employee_types = list(ROLE_PROMPT_GENERATORS)
+        role_recs = dict(zip(employee_types, await asyncio.gather(*(recommend(t) for t in employee_types))))
+
+        combined_recommendations = self.combine_recommendations(role_recs['manager'], role_recs['tester'], role_recs['developer'])
+
+        print(f"✅ Generated {len(combined_recommendations['recommendations'])} total recommendations")
+        return combined_recommendations
+
+    async def arecommend_employees(self, sow_data: Dict[str, Any], filters: Dict[str, Any] = None,
+                                   mode: str = RECOMMENDATION_MODE) -> Dict:
+        """Async entry point for the ASGI app: init and vector search run in the executor, LLM calls on the event loop"""
+        print(f"🎯 Starting comprehensive employee recommendation process (async, {mode} mode)...")
+
+        request_start = time.perf_counter()
+        init_seconds = await asyncio.to_thread(self.ensure_ready)
+
+        all_candidates = await asyncio.to_thread(self.search_all_employees, sow_data, filters)
+        if mode == "fast":
+            recommendations = self.get_fast_recommendations(sow_data, all_candidates)
+        else:
+            recommendations = await self.aget_ai_recommendations(sow_data, all_candidates)
+
+        return self._build_response(sow_data, all_candidates, recommendations, init_seconds, request_start, mode)
+
+    def _build_response(self, sow_data: Dict[str, Any], all_candidates: Dict[str, List[Dict]], recommendations: Dict,
+                        init_seconds: float, request_start: float, mode: str = RECOMMENDATION_MODE) -> Dict:
         total_candidates = len(all_candidates['managers']) + len(all_candidates['testers']) + len(all_candidates['developers'])
 
         return {
@@ -489,11 +710,36 @@ class EmployeeRecommender:
                 'total': total_candidates
             },
             'recommendations': recommendations,
-            'raw_candidates': all_candidates
+            'mode': mode,
+            'raw_candidates': all_candidates,
+            'timings': {
+                'init_seconds': round(init_seconds, 3),
+                'request_seconds': round(time.perf_counter() - request_start, 3)
+            }
         }
 
+# Process-wide recommender shared by all request threads
+_shared_recommender = None
+_shared_recommender_lock = threading.Lock()
+
+def get_shared_recommender() -> EmployeeRecommender:
+    """Return the long-lived recommender, creating it on first use"""
+    global _shared_recommender
+    if _shared_recommender is None:
+        with _shared_recommender_lock:
+            if _shared_recommender is None:
+                _shared_recommender = EmployeeRecommender()
+    return _shared_recommender
+
 # Utility function
-def get_employee_recommendations(sow_data: Dict[str, Any]) -> Dict:
+def get_employee_recommendations(sow_data: Dict[str, Any], filters: Dict[str, Any] = None,
+                                 mode: str = RECOMMENDATION_MODE) -> Dict:
     """Get recommendations for all employee types"""
-    recommender = EmployeeRecommender()
-    return recommender.recommend_employees(sow_data)
\ No newline at end of file
+    recommender = get_shared_recommender()
+    return recommender.recommend_employees(sow_data, filters, mode)
+
+async def aget_employee_recommendations(sow_data: Dict[str, Any], filters: Dict[str, Any] = None,
+                                        mode: str = RECOMMENDATION_MODE) -> Dict:
+    """Async variant of get_employee_recommendations"""
+    recommender = await asyncio.to_thread(get_shared_recommender)
+    return await recommender.arecommend_employees(sow_data, filters, mode)
\ No newline at end of file
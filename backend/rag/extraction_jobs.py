@@ -0,0 +1,184 @@
+# rag/extraction_jobs.py
+import os
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from utils.sqlite_utils import connect_sqlite
+
+load_dotenv()
+
+# Background extraction job config (from .env)
+EXTRACTION_JOB_WORKERS = int(os.getenv("EXTRACTION_JOB_WORKERS", 2))
+EXTRACTION_JOBS_PATH = os.getenv("EXTRACTION_JOBS_PATH", "data/cache/extraction_jobs.sqlite3")
+# Upper bound for a single long-poll request, so a waiting client can't pin a server thread indefinitely
+EXTRACTION_JOB_MAX_WAIT = float(os.getenv("EXTRACTION_JOB_MAX_WAIT", 30))
+EXTRACTION_JOB_RETENTION_DAYS = float(os.getenv("EXTRACTION_JOB_RETENTION_DAYS", 7))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED_STATUSES = (DONE, FAILED)
+
+class ExtractionJobQueue:
+    """SOW extractions run by a bounded pool of local workers, with job state persisted in sqlite.
+    Jobs that were queued or running when the process stopped are picked up again on start."""
+
+    def __init__(self, path: str = EXTRACTION_JOBS_PATH, max_workers: int = EXTRACTION_JOB_WORKERS,
+                 extract: Callable[..., dict] = None,
+                 retention_seconds: float = EXTRACTION_JOB_RETENTION_DAYS * 24 * 3600):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self._extract = extract
+        self._lock = threading.Lock()
+        # Signalled whenever a job finishes, for long-polling waiters
+        self._finished = threading.Condition(self._lock)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="extraction-job")
+
+        self._conn = connect_sqlite(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS extraction_jobs (
+                job_id TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_extraction_jobs_hash ON extraction_jobs (content_hash, status)")
+        self._conn.commit()
+
+        self.purge_finished()
+        self._resume_pending()
+
+    def _row_to_job(self, row) -> Dict:
+        job = {
+            "job_id": row[0],
+            "content_hash": row[1],
+            "status": row[3],
+            "created_at": row[6],
+            "started_at": row[7],
+            "finished_at": row[8]
+        }
+        if row[3] == DONE:
+            job["result"] = json.loads(row[4])
+        elif row[3] == FAILED:
+            job["error"] = row[5]
+        return job
+
+    def _fetch(self, job_id: str):
+        return self._conn.execute("SELECT * FROM extraction_jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+    def _resume_pending(self):
+        """Requeue whatever an earlier process left unfinished"""
+        with self._lock:
+            pending = self._conn.execute(
+                "SELECT job_id FROM extraction_jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+            self._conn.execute("UPDATE extraction_jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING))
+            self._conn.commit()
+
+        if pending:
+            print(f"🔁 Resuming {len(pending)} unfinished extraction job(s)")
+        for (job_id,) in pending:
+            self._executor.submit(self._run, job_id)
+
+    def submit(self, file_path: str, content_hash: str) -> Tuple[Dict, bool]:
+        """Queue an extraction. A document that is already queued or running returns the existing job
+        instead of starting a duplicate. Returns (job, created)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM extraction_jobs WHERE content_hash = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (content_hash, QUEUED, RUNNING)
+            ).fetchone()
+            if row is not None:
+                return self._row_to_job(row), False
+
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO extraction_jobs (job_id, content_hash, file_path, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, content_hash, file_path, QUEUED, time.time())
+            )
+            self._conn.commit()
+            row = self._fetch(job_id)
+
+        self._executor.submit(self._run, job_id)
+        return self._row_to_job(row), True
+
+    def _run(self, job_id: str):
+        with self._lock:
+            row = self._fetch(job_id)
+            if row is None or row[3] != QUEUED:
+                return
+            self._conn.execute("UPDATE extraction_jobs SET status = ?, started_at = ? WHERE job_id = ?",
+                               (RUNNING, time.time(), job_id))
+            self._conn.commit()
+
+        _, content_hash, file_path = row[:3]
+        print(f"🛠️ Running extraction job {job_id[:8]} for document {content_hash[:12]}")
+
+        status, result, error = DONE, None, None
+        try:
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"Uploaded file is gone: {file_path}")
+            extract = self._extract
+            if extract is None:
+                from rag.pipeline import extract_fields_from_pdf as extract
+            result = json.dumps(extract(file_path, content_hash=content_hash))
+        except Exception as e:
+            print(f"❌ Extraction job {job_id[:8]} failed: {e}")
+            status, error = FAILED, str(e)
+
+        with self._finished:
+            self._conn.execute(
+                "UPDATE extraction_jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ?",
+                (status, result, error, time.time(), job_id)
+            )
+            self._conn.commit()
+            self._finished.notify_all()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._fetch(job_id)
+        return self._row_to_job(row) if row is not None else None
+
+    def wait(self, job_id: str, timeout: float = 0) -> Optional[Dict]:
+        """Return the job once it has finished or after timeout seconds (capped at EXTRACTION_JOB_MAX_WAIT)"""
+        deadline = time.monotonic() + min(max(timeout, 0), EXTRACTION_JOB_MAX_WAIT)
+        with self._finished:
+            while True:
+                row = self._fetch(job_id)
+                remaining = deadline - time.monotonic()
+                if row is None or row[3] in FINISHED_STATUSES or remaining <= 0:
+                    break
+                self._finished.wait(remaining)
+        return self._row_to_job(row) if row is not None else None
+
+    def purge_finished(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM extraction_jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (DONE, FAILED, time.time() - self.retention_seconds)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> ExtractionJobQueue:
+    """Process-wide extraction job queue; creating it resumes jobs left over from a previous run"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = ExtractionJobQueue()
+    return _job_queue
@@ -0,0 +1,110 @@
+# rag/fast_ranking.py
+import os
+from typing import Dict, List
+import numpy as np
+from dotenv import load_dotenv
+from rag.employee_filters import designation_level_number
+from rag.skill_index import normalize_skill, parse_skills, skill_keys
+
+load_dotenv()
+
+# Composite score = weighted sum of components that are each scaled to [0, 1]
+FAST_RANKING_WEIGHTS = {
+    'similarity': float(os.getenv("FAST_WEIGHT_SIMILARITY", 0.35)),
+    'skill_coverage': float(os.getenv("FAST_WEIGHT_SKILL_COVERAGE", 0.35)),
+    'experience': float(os.getenv("FAST_WEIGHT_EXPERIENCE", 0.1)),
+    'designation_level': float(os.getenv("FAST_WEIGHT_DESIGNATION_LEVEL", 0.1)),
+    'weekly_hours': float(os.getenv("FAST_WEIGHT_WEEKLY_HOURS", 0.1)),
+}
+# Values at or above these count as the full component
+EXPERIENCE_CAP_MONTHS = 120
+DESIGNATION_LEVEL_CAP = 5
+WEEKLY_HOURS_CAP = 40
+
+# Same labels the LLM is asked for
+RECOMMENDATION_LEVELS = [(0.7, "Highly recommended"), (0.5, "Recommended"), (0.0, "Consider")]
+LOW_WEEKLY_HOURS = 8
+
+def score_components(candidates: List[Dict]) -> np.ndarray:
+    """candidates x components matrix (columns in FAST_RANKING_WEIGHTS order), each value in [0, 1]"""
+    if not candidates:
+        return np.zeros((0, len(FAST_RANKING_WEIGHTS)), dtype=np.float32)
+
+    metadatas = [candidate.get('metadata') or {} for candidate in candidates]
+    raw = np.array([
+        [
+            candidate.get('similarity_score', 0.0),
+            candidate.get('skill_coverage', 0.0),
+            float(meta.get('experience_months') or 0) / EXPERIENCE_CAP_MONTHS,
+            meta.get('designation_level_num', designation_level_number(meta.get('designation_level', ''))) / DESIGNATION_LEVEL_CAP,
+            float(meta.get('hours_available_weekly') or 0) / WEEKLY_HOURS_CAP
+        ]
+        for candidate, meta in zip(candidates, metadatas)
+    ], dtype=np.float32)
+    return np.clip(raw, 0.0, 1.0)
+
+def composite_scores(components: np.ndarray) -> np.ndarray:
+    """Weighted sum of the component columns; weights are normalised so scores stay in [0, 1]"""
+    weights = np.array(list(FAST_RANKING_WEIGHTS.values()), dtype=np.float32)
+    total = weights.sum()
+    return components @ (weights / total if total else weights)
+
+def matched_skills(skills: str, technologies: List[str]) -> Dict[str, List[str]]:
+    """Requested technologies split into the candidate's matching "Skill(n)" entries and the missing ones"""
+    levels = {}
+    for name, proficiency in parse_skills(skills):
+        for key in skill_keys(name):
+            if proficiency > levels.get(key, (0.0, ''))[0]:
+                levels[key] = (proficiency, f"{name}({proficiency:g})")
+    matched = [levels[normalize_skill(t)][1] for t in technologies if normalize_skill(t) in levels]
+    missing = [t for t in technologies if normalize_skill(t) not in levels]
+    return {'matched': list(dict.fromkeys(matched)), 'missing': missing}
+
+def fast_recommendation(candidate: Dict, score: float, components: np.ndarray, technologies: List[str],
+                        rank: int, out_of: int) -> Dict:
+    """One recommendation with the fields the LLM returns, built from the candidate data alone"""
+    meta = candidate.get('metadata') or {}
+    experience_months = float(meta.get('experience_months') or 0)
+    hours_available = float(meta.get('hours_available_weekly') or 0)
+    skills = matched_skills(meta.get('skills', ''), technologies)
+    # Reasons quote the same component values the score is built from
+    breakdown = {name: round(float(value), 3) for name, value in zip(FAST_RANKING_WEIGHTS, components)}
+
+    reasons = []
+    if skills['matched']:
+        reasons.append(f"Covers {breakdown['skill_coverage']:.0%} of the requested skills: {', '.join(skills['matched'])}")
+    reasons.append(f"{experience_months / 12:g} years of experience, level {meta.get('designation_level', 'N/A')}")
+    reasons.append(f"{hours_available:g} hours/week available ({float(meta.get('availability') or 0):g}% availability)")
+    reasons.append(f"Profile similarity to the SOW: {breakdown['similarity']:.2f}")
+
+    concerns = []
+    if skills['missing']:
+        concerns.append(f"No listed experience with: {', '.join(skills['missing'])}")
+    if hours_available < LOW_WEEKLY_HOURS:
+        concerns.append(f"Only {hours_available:g} hours/week available")
+
+    strongest = max(breakdown, key=lambda name: breakdown[name] * FAST_RANKING_WEIGHTS[name])
+    return {
+        "rank": str(rank),
+        "name": meta.get('resource_name', 'Unknown'),
+        "designation": meta.get('designation', 'Unknown'),
+        "match_score": round(float(score), 3),
+        "reasons": reasons,
+        "concerns": concerns,
+        "why_pick": f"Ranked {rank} of {out_of} retrieved candidates by composite score; strongest factor: {strongest.replace('_', ' ')}.",
+        "allocation_suggestion": int(hours_available),
+        "recommended_skills": skills['missing'],
+        "recommended_experience": 0,
+        "recommendation": next(label for threshold, label in RECOMMENDATION_LEVELS if score >= threshold),
+        "score_breakdown": breakdown
+    }
+
+def rank_candidates(candidates: List[Dict], technologies: List[str], n: int) -> List[Dict]:
+    """Top n candidates by composite score, as recommendation dicts"""
+    components = score_components(candidates)
+    scores = composite_scores(components)
+    order = np.argsort(-scores, kind="stable")[:n]
+    return [
+        fast_recommendation(candidates[i], scores[i], components[i], technologies, rank, len(candidates))
+        for rank, i in enumerate(order, start=1)
+    ]
@@ -0,0 +1,147 @@
+# rag/lexical_index.py
+import os
+import re
+import json
+import math
+import time
+import threading
+from collections import Counter, OrderedDict
+from typing import Hashable, List, Optional, Sequence, TypeVar
+from dotenv import load_dotenv
+from utils.sqlite_utils import connect_sqlite
+
+load_dotenv()
+
+CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "./chroma_store")
+# Lives next to the Chroma store, like the document index, since it describes the same chunks
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", os.path.join(CHROMA_DB_PATH, "lexical_index.sqlite3"))
+# Per-document BM25 indexes kept in memory after first use
+LEXICAL_INDEX_CACHE_SIZE = int(os.getenv("LEXICAL_INDEX_CACHE_SIZE", 64))
+
+# Words, numbers and dates/amounts kept whole ("01/11/2026", "2026-01-15", "1,200.00")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[./,:-][a-z0-9]+)*")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "that", "the", "this", "to", "will", "with"
+}
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class BM25Index:
+    """Okapi BM25 over the chunks of one document"""
+
+    def __init__(self, chunks: List[str], tokens: List[List[str]] = None, k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        tokens = tokens if tokens is not None else [tokenize(chunk) for chunk in chunks]
+        self.term_frequencies = [Counter(chunk_tokens) for chunk_tokens in tokens]
+        self.lengths = [len(chunk_tokens) for chunk_tokens in tokens]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        document_frequency = Counter(term for frequencies in self.term_frequencies for term in frequencies)
+        n = len(chunks)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    def scores(self, query: str) -> List[float]:
+        terms = [term for term in set(tokenize(query)) if term in self.idf]
+        scores = []
+        for frequencies, length in zip(self.term_frequencies, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            score = 0.0
+            for term in terms:
+                tf = frequencies.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    def search(self, query: str, n_results: int) -> List[int]:
+        """Indices of the best-matching chunks; chunks sharing no term with the query are never returned"""
+        scores = self.scores(query)
+        ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: -scores[i])
+        return ranked[:n_results]
+
+# Whatever the rankings hold (pipeline.py fuses chunk indices)
+RankedItem = TypeVar("RankedItem", bound=Hashable)
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[RankedItem]], k: int = 60) -> List[RankedItem]:
+    """Merge ranked lists: each item scores sum(1 / (k + rank)) over the lists it appears in"""
+    fused = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(fused, key=lambda item: -fused[item])
+
+class LexicalIndexStore:
+    """Tokenised chunks of every ingested SOW keyed by content hash, built once at ingest time"""
+
+    def __init__(self, path: str = LEXICAL_INDEX_PATH, cache_size: int = LEXICAL_INDEX_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._indexes = OrderedDict()
+
+        self._conn = connect_sqlite(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS lexical_index (
+                content_hash TEXT PRIMARY KEY,
+                chunks TEXT NOT NULL,
+                tokens TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def _remember(self, content_hash: str, index: BM25Index):
+        self._indexes[content_hash] = index
+        self._indexes.move_to_end(content_hash)
+        while len(self._indexes) > self.cache_size:
+            self._indexes.popitem(last=False)
+
+    def contains(self, content_hash: str) -> bool:
+        with self._lock:
+            if content_hash in self._indexes:
+                return True
+            return self._conn.execute(
+                "SELECT 1 FROM lexical_index WHERE content_hash = ?", (content_hash,)
+            ).fetchone() is not None
+
+    def add(self, content_hash: str, chunks: List[str]) -> BM25Index:
+        tokens = [tokenize(chunk) for chunk in chunks]
+        index = BM25Index(chunks, tokens)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lexical_index VALUES (?, ?, ?, ?)",
+                (content_hash, json.dumps(chunks), json.dumps(tokens), time.time())
+            )
+            self._conn.commit()
+            self._remember(content_hash, index)
+        return index
+
+    def get(self, content_hash: str) -> Optional[BM25Index]:
+        with self._lock:
+            index = self._indexes.get(content_hash)
+            if index is not None:
+                self._indexes.move_to_end(content_hash)
+                return index
+            row = self._conn.execute(
+                "SELECT chunks, tokens FROM lexical_index WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+            if row is None:
+                return None
+            index = BM25Index(json.loads(row[0]), json.loads(row[1]))
+            self._remember(content_hash, index)
+            return index
+
+_lexical_index_store = None
+_lexical_index_store_lock = threading.Lock()
+
+def get_lexical_index_store() -> LexicalIndexStore:
+    global _lexical_index_store
+    if _lexical_index_store is None:
+        with _lexical_index_store_lock:
+            if _lexical_index_store is None:
+                _lexical_index_store = LexicalIndexStore()
+    return _lexical_index_store
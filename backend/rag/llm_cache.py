@@ -0,0 +1,154 @@
+# rag/llm_cache.py
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Optional
+from dotenv import load_dotenv
+from utils.sqlite_utils import connect_sqlite
+
+load_dotenv()
+
+# Disk-backed completion cache config (from .env)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/cache/llm_cache.sqlite3")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", 200))
+LLM_CACHE_TTL_DAYS = float(os.getenv("LLM_CACHE_TTL_DAYS", 30))
+
+class CompletionCache:
+    """SQLite cache of LLM completions keyed by a hash of the prompt and generation settings,
+    with age (TTL) and size (entries / bytes, least recently used first) eviction."""
+
+    def __init__(self,
+                 path: str = LLM_CACHE_PATH,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024),
+                 ttl_seconds: float = LLM_CACHE_TTL_DAYS * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                latency_seconds REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_last_accessed ON completions(last_accessed)")
+        self._conn.commit()
+
+        # Counters since process start
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        self.evict()
+
+    @staticmethod
+    def make_key(prompt: str, deployment: str, temperature: float, top_p: float, max_tokens: int) -> str:
+        payload = json.dumps([deployment, temperature, top_p, max_tokens, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, latency_seconds, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[2] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE completions SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            self.saved_seconds += row[1]
+            return row[0]
+
+    def put(self, key: str, response: str, latency_seconds: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, response, len(response.encode("utf-8")), latency_seconds, now, now)
+            )
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def evict(self):
+        with self._lock:
+            self._evict_locked(time.time())
+            self._conn.commit()
+
+    def _evict_locked(self, now: float):
+        # Age-based eviction
+        self._conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl_seconds,))
+
+        # Size-based eviction, least recently used first
+        count, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM completions"
+        ).fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size_bytes FROM completions ORDER BY last_accessed ASC").fetchall()
+        stale_keys = []
+        for key, size_bytes in rows:
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            count -= 1
+            total_bytes -= size_bytes
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", stale_keys)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM completions"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 2),
+            "entries": entries,
+            "size_bytes": total_bytes
+        }
+
+_completion_cache = None
+_completion_cache_lock = threading.Lock()
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """Process-wide completion cache, or None when disabled via LLM_CACHE_ENABLED"""
+    global _completion_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _completion_cache is None:
+        with _completion_cache_lock:
+            if _completion_cache is None:
+                _completion_cache = CompletionCache()
+    return _completion_cache
+
+def get_cache_stats() -> dict:
+    cache = get_completion_cache()
+    return cache.stats() if cache else {"enabled": False}
@@ -1,206 +1,342 @@
 # rag/pipeline.py
 import os
 import re
+import asyncio
 import json
+import hashlib
+import threading
 from datetime import datetime
-from chromadb import PersistentClient
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
 from dotenv import load_dotenv
-from utils.pdf_utils import extract_text_from_pdf, chunk_text, extract_first_n_pages
-from utils.validator import load_db_values, fuzzy_match, safe_parse_list, clean_llm_response, extract_dates_from_context
+from utils.pdf_utils import ParsedPDF, parse_pdf, file_content_hash
+from utils.validator import load_db_values, fuzzy_match, safe_parse_list, clean_llm_response, extract_dates_from_context, extract_json_from_text
 #from rag.prompts import generate_billing_type_prompt, generate_client_prompt, generate_prompt, generate_date_prompt, generate_status_prompt, generate_tech_prompt, generate_practice_prompt, generate_category_prompt, generate_start_date_prompt, generate_end_date_prompt
-from rag.prompts import generate_billing_type_prompt, generate_client_prompt, generate_prompt, generate_status_prompt, generate_tech_prompt, generate_practice_prompt, generate_category_prompt, generate_start_date_prompt, generate_end_date_prompt
-from rag.query_azure_openai import query_azure_openai
-from rag.embedder import get_embedding_function
+from rag.prompts import generate_billing_type_prompt, generate_client_prompt, generate_prompt, generate_status_prompt, generate_tech_prompt, generate_practice_prompt, generate_category_prompt, generate_start_date_prompt, generate_end_date_prompt, generate_grouped_fields_prompt
+from rag.query_azure_openai import query_azure_openai, aquery_azure_openai, AZURE_OPENAI_DEPLOYMENT, LLM_ERROR
+from rag.embedder import get_embedding_function, embed_queries
+from rag.doc_index import get_document_index
+from rag.lexical_index import get_lexical_index_store, reciprocal_rank_fusion
+from rag.result_cache import get_result_cache
+import rag.prompts
 
 load_dotenv()
 TECHNOLOGY_PAGES = int(os.getenv("TECHNOLOGY_PAGES", 5))
 DATE_CONTEXT_PAGES = int(os.getenv("DATE_CONTEXT_PAGES", 3))
+# Max concurrent LLM calls per SOW (1 = run the fields one after another)
+FIELD_EXTRACTION_WORKERS = int(os.getenv("FIELD_EXTRACTION_WORKERS", 6))
+# "per_field" sends one prompt per field, "grouped" asks for GROUPED_FIELDS in a single JSON prompt
+FIELD_EXTRACTION_MODE = os.getenv("FIELD_EXTRACTION_MODE", "per_field").strip().lower()
+# "hybrid" fuses Chroma and per-document BM25 results with reciprocal rank fusion, "dense" is Chroma only
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").strip().lower()
+# Chunks per field prompt in hybrid mode (dense mode keeps its 5), and candidates taken from each retriever
+RETRIEVAL_CHUNKS = int(os.getenv("RETRIEVAL_CHUNKS", 3))
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", 10))
 
-embedding_function = get_embedding_function()
+# Chroma client and collection handles are kept for the life of the process
+_sow_collection = None
+_sow_collection_lock = threading.Lock()
+
+# Bump when extraction logic changes in a way that should invalidate cached results
+PIPELINE_VERSION = "2"
+
+with open(rag.prompts.__file__, "rb") as _prompts_file:
+    # Any edit to the prompt templates invalidates cached results too
+    PROMPTS_VERSION = hashlib.sha256(_prompts_file.read()).hexdigest()[:12]
 
 FIELDS = ["Project Name", "Practice", "Technology", "Category", "Manager", "Client", "Partner",
           "Billing Type", "Status", "Budgeted Hours", "Start date", "End Date"]
 
 DATE_FIELDS = {"Start date", "End Date"}
 FUZZY_MATCH_FIELDS = {"Practice", "Technology"}
+# Fields answered from the first pages rather than from retrieved chunks
+EARLY_CONTEXT_FIELDS = {"Technology", "Practice", "Project Name", "Category"}
+
+# Simple single-value fields that can share one structured prompt in grouped mode
+GROUPED_FIELDS = ["Category", "Manager", "Partner", "Billing Type", "Status", "Budgeted Hours"]
+
+# Date-related keywords for better chunk retrieval
+DATE_KEYWORDS = {
+    "start_date": ["start date", "project start", "commencement", "begin", "kick-off", "initiation", "launch", "January", "November"],
+    "end_date": ["end date", "completion", "delivery", "final", "conclusion", "project end", "deadline", "due date", "November", "January"]
+}
+
+# Primary client-related keywords (most common and effective)
+CLIENT_PRIMARY_KEYWORDS = [
+    "client", "customer", "organization", "company", "corporation",
+    "enterprise", "contracting party", "service recipient", "sponsor"
+]
+
+# Secondary context keywords for better retrieval
+CLIENT_CONTEXT_KEYWORDS = ["contact information", "stakeholder", "agreement", "contract"]
+
+# A field task is the prompt to send plus a parser turning the raw LLM answer into {result_key: value}
+FieldTask = Tuple[str, Callable[[str], dict]]
+
+# Set in a parsed answer (and so in the merged results) when the LLM request behind it failed
+FAILED_TASK_KEY = "_llm_failed"
+
+def date_query_text(date_type: str) -> str:
+    """Retrieval query for the chunks most likely to contain the given date"""
+    return f"{' '.join(DATE_KEYWORDS[date_type])} deliverables timelines schedule milestone"
+
+def client_query_text() -> str:
+    """Balanced retrieval query for client information (optimized for embedding performance)"""
+    return f"{' '.join(CLIENT_PRIMARY_KEYWORDS)} {' '.join(CLIENT_CONTEXT_KEYWORDS)}"
+
+def field_query_text(field: str, valid_list: list) -> str:
+    """Retrieval query for the generic RAG fields"""
+    return f"{field}. Possible values: {', '.join(valid_list)}" if valid_list else field
+
+def get_sow_collection():
+    """Lazily open the sow_docs collection once per process"""
+    global _sow_collection
+    if _sow_collection is None:
+        with _sow_collection_lock:
+            if _sow_collection is None:
+                from chromadb import PersistentClient
+                client = PersistentClient(path=os.getenv("CHROMA_DB_PATH", "./chroma_store"))
+                _sow_collection = client.get_or_create_collection(
+                    name="sow_docs",
+                    embedding_function=get_embedding_function()
+                )
+    return _sow_collection
 
-def extract_dates_from_chunks(chroma_collection, doc_id: str) -> dict:
-    """Extract start and end dates from document chunks using specialized prompts"""
-    dates = {"start_date": None, "end_date": None}
-    
-    # Define date-related keywords for better chunk retrieval
-    date_keywords = {
-        "start_date": ["start date", "project start", "commencement", "begin", "kick-off", "initiation", "launch", "January", "November"],
-        "end_date": ["end date", "completion", "delivery", "final", "conclusion", "project end", "deadline", "due date", "November", "January"]
-    }
-    
-    for date_type, keywords in date_keywords.items():
-        # Query for chunks most likely to contain date information
-        query_text = f"{' '.join(keywords)} deliverables timelines schedule milestone"
-        
-        query_result = chroma_collection.query(
-            query_texts=[query_text], 
-            n_results=5,
-            where={"doc_id": doc_id}
-        )
-        
-        if query_result["documents"] and query_result["documents"][0]:
-            context_chunks = query_result["documents"][0]
-            context = "\n---\n".join(context_chunks)
-            
-            # Use specialized prompts for each date type
-            if date_type == "start_date":
-                prompt = generate_start_date_prompt(context)
-            else:  # end_date
-                prompt = generate_end_date_prompt(context)
-            
-            raw_response = query_azure_openai(prompt)
-            cleaned_date = clean_llm_response(raw_response)
-            
-            if cleaned_date:
-                dates[date_type] = cleaned_date
-    
-    return dates
-
-def extract_client_from_chunks(chroma_collection, doc_id: str) -> str:
-    """
-    Extract client information from document chunks using targeted queries
-    with multiple synonyms and context-aware retrieval
-    """
-    
-    # Primary client-related keywords (most common and effective)
-    primary_keywords = [
-        "client", "customer", "organization", "company", "corporation", 
-        "enterprise", "contracting party", "service recipient", "sponsor"
-    ]
-    
-    # Secondary context keywords for better retrieval
-    context_keywords = ["contact information", "stakeholder", "agreement", "contract"]
-    
-    # Create a balanced query string (optimized for embedding performance)
-    query_text = f"{' '.join(primary_keywords)} {' '.join(context_keywords)}"
-    
-    # Query for chunks most likely to contain client information
+def build_retrieval_queries(db_values: dict) -> Dict[str, str]:
+    """Every retrieval query the extraction needs, keyed by result key, so they can be run in one batch"""
+    queries = {date_type: date_query_text(date_type) for date_type in DATE_KEYWORDS}
+    queries["client"] = client_query_text()
+
+    for field in FIELDS:
+        if field in DATE_FIELDS or field == "Client" or field in EARLY_CONTEXT_FIELDS:
+            continue
+        match_field = field.lower().replace(" ", "_")
+        queries[match_field] = field_query_text(field, db_values.get(match_field, []))
+
+    return queries
+
+def retrieve_chunks(chroma_collection, doc_id: str, queries: Dict[str, str], n_results: int = None) -> Dict[str, list]:
+    """Fetch the top chunks of one document for every query with a single Chroma call.
+    The query strings are static, so their embeddings come from the persistent query cache.
+    In hybrid mode the dense ranking is fused with the document's BM25 ranking, so chunks with the exact
+    terms (billing types, dates, client names) make the cut even when their embedding doesn't."""
+    if not queries:
+        return {}
+
+    lexical_index = get_lexical_index_store().get(doc_id) if RETRIEVAL_MODE == "hybrid" else None
+    if n_results is None:
+        n_results = RETRIEVAL_CHUNKS if lexical_index is not None else 5
+
+    keys = list(queries)
+    query_embeddings = embed_queries([queries[key] for key in keys])
     query_result = chroma_collection.query(
-        query_texts=[query_text], 
-        n_results=5,  
-        where={"doc_id": doc_id}
+        query_embeddings=query_embeddings,
+        n_results=max(n_results, RETRIEVAL_CANDIDATES) if lexical_index is not None else n_results,
+        where={"doc_id": doc_id} #Prevent Cross talk between documents
     )
-    
-    client_info = ""
-    
-    if query_result["documents"] and query_result["documents"][0]:
-        context_chunks = query_result["documents"][0]
-        context = "\n---\n".join(context_chunks)
-        
-        # Generate focused prompt for client extraction
-        prompt = generate_client_prompt(context)
-        
-        # Query the local LLM
-        raw_response = query_azure_openai(prompt)
-        client_info = clean_llm_response(raw_response)
-    
-    return client_info or ""
-
-
-
-
-
-def extract_fields_from_pdf(file_path: str) -> dict:
-    """Extract all fields from PDF with enhanced error handling and specialized logic"""
-    text = extract_text_from_pdf(file_path)
-    chunks = chunk_text(text)
-    db_values = load_db_values()
 
-    client = PersistentClient(path=os.getenv("CHROMA_DB_PATH", "./chroma_store"))
-    chroma_collection = client.get_or_create_collection(
-        name="sow_docs",
-        embedding_function=embedding_function
-    )
+    documents = query_result["documents"] or []
+    ids = query_result["ids"] or []
+    retrieved = {}
+    for i, key in enumerate(keys):
+        dense_documents = (documents[i] or []) if i < len(documents) else []
+        if lexical_index is None:
+            retrieved[key] = dense_documents[:n_results]
+            continue
+
+        # Chunk ids are f"{doc_id}_{chunk_index}", the same positions the lexical index was built from
+        dense_ranking = [int(chunk_id.rsplit("_", 1)[1]) for chunk_id in ids[i]]
+        lexical_ranking = lexical_index.search(queries[key], RETRIEVAL_CANDIDATES)
+        fused = reciprocal_rank_fusion([dense_ranking, lexical_ranking])[:n_results]
+        retrieved[key] = [lexical_index.chunks[chunk_index] for chunk_index in fused]
+    return retrieved
 
-    doc_id = os.path.basename(file_path)
-    chunked_ids = [f"{doc_id}_{i}" for i in range(len(chunks))]
-    
-    metadatas = [{"doc_id": doc_id, "chunk_index": i} for i in range(len(chunks))]
-    existing_ids = chroma_collection.get(include=["metadatas"])["ids"]
+def warm_query_embeddings():
+    """Embed (or load from disk) every static retrieval query so the first upload only embeds its chunks"""
+    embed_queries(list(build_retrieval_queries(load_db_values()).values()))
 
-    if chunked_ids[0] not in existing_ids:
-        chroma_collection.add(
-            documents=chunks, 
-            ids=chunked_ids,
-            metadatas=metadatas
-        )
+def join_chunks(chunks: list) -> str:
+    return "\n---\n".join(chunks)
 
+def _parse_cleaned(result_key: str, raw_response: str) -> dict:
+    return {result_key: clean_llm_response(raw_response) or ""}
+
+def _parse_technology(valid_list: list, raw_response: str) -> dict:
+    tech_list = safe_parse_list(raw_response)
+    return {"technology": fuzzy_match(tech_list, valid_list) if valid_list else tech_list}
+
+def _parse_practice(valid_list: list, raw_response: str) -> dict:
+    practice_list = safe_parse_list(raw_response) if '[' in raw_response else [clean_llm_response(raw_response)]
+    return {"practice": fuzzy_match(practice_list, valid_list)[0] if valid_list else practice_list[0] if practice_list else ""}
+
+def _parse_grouped(fields: list, raw_response: str) -> dict:
+    """Parse the grouped JSON answer; fields that are missing or empty are left out so they can fall back"""
+    try:
+        answer = extract_json_from_text(raw_response)
+    except ValueError as e:
+        print(f"⚠️ Grouped field JSON extraction failed: {e}")
+        return {}
+    if not isinstance(answer, dict):
+        print(f"⚠️ Grouped field answer is {type(answer).__name__}, not a JSON object")
+        return {}
+
+    # Accept "Billing Type" as well as "billing_type" style keys
+    normalized = {str(key).strip().lower().replace(" ", "_"): value for key, value in answer.items()}
+
+    results = {}
+    for field in fields:
+        match_field = field.lower().replace(" ", "_")
+        value = normalized.get(match_field)
+        if value is None or isinstance(value, (dict, list)):
+            continue
+        cleaned = clean_llm_response(str(value))
+        if cleaned:
+            results[match_field] = cleaned
+    return results
+
+def build_grouped_task(fields: list, early_context: str, retrieved_chunks: list) -> FieldTask:
+    """One JSON prompt for several fields: the early pages plus any retrieved chunk they don't already contain"""
+    extra_chunks = []
+    for chunk in retrieved_chunks:
+        if chunk not in early_context and chunk not in extra_chunks:
+            extra_chunks.append(chunk)
+
+    context = "\n---\n".join([early_context] + extra_chunks) if early_context else "\n---\n".join(extra_chunks)
+    return generate_grouped_fields_prompt(fields, context), partial(_parse_grouped, fields)
+
+def build_date_task(date_type: str, context: str) -> FieldTask:
+    """Use specialized prompts for each date type"""
+    if date_type == "start_date":
+        prompt = generate_start_date_prompt(context)
+    else:  # end_date
+        prompt = generate_end_date_prompt(context)
+    return prompt, partial(_parse_cleaned, date_type)
+
+def build_client_task(context: str) -> FieldTask:
+    """Generate focused prompt for client extraction"""
+    return generate_client_prompt(context), partial(_parse_cleaned, "client")
+
+def parse_answer(parse: Callable[[str], dict], raw_response: str) -> dict:
+    """Parse one field answer, flagging it when the LLM request failed"""
+    parsed = parse(raw_response)
+    if raw_response == LLM_ERROR:
+        parsed = dict(parsed, **{FAILED_TASK_KEY: True})
+    return parsed
+
+def extraction_failed(results: dict) -> bool:
+    """True when any field prompt behind these merged results failed"""
+    return bool(results.get(FAILED_TASK_KEY))
+
+def iter_field_tasks(tasks: Dict[str, FieldTask], max_workers: int = FIELD_EXTRACTION_WORKERS) -> Iterator[dict]:
+    """Send every field prompt to the LLM, concurrently when max_workers > 1, yielding each parsed answer as it lands"""
+    if not tasks:
+        return
+
+    if max_workers <= 1:
+        for prompt, parse in tasks.values():
+            yield parse_answer(parse, query_azure_openai(prompt))
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)), thread_name_prefix="field-extract") as executor:
+        futures = {executor.submit(query_azure_openai, prompt): name for name, (prompt, _) in tasks.items()}
+        for future in as_completed(futures):
+            _, parse = tasks[futures[future]]
+            yield parse_answer(parse, future.result())
+
+def run_field_tasks(tasks: Dict[str, FieldTask], max_workers: int = FIELD_EXTRACTION_WORKERS) -> dict:
+    """Run every field prompt and merge the parsed answers"""
     results = {}
+    for parsed in iter_field_tasks(tasks, max_workers):
+        results.update(parsed)
+    return results
+
+async def aiter_field_tasks(tasks: Dict[str, FieldTask], max_concurrency: int = FIELD_EXTRACTION_WORKERS) -> AsyncIterator[dict]:
+    """Async twin of iter_field_tasks: awaits the field prompts with at most max_concurrency in flight"""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run_task(prompt: str, parse: Callable[[str], dict]) -> dict:
+        async with semaphore:
+            raw_response = await aquery_azure_openai(prompt)
+        return parse_answer(parse, raw_response)
+
+    for next_done in asyncio.as_completed([run_task(prompt, parse) for prompt, parse in tasks.values()]):
+        yield await next_done
+
+async def arun_field_tasks(tasks: Dict[str, FieldTask], max_concurrency: int = FIELD_EXTRACTION_WORKERS) -> dict:
+    """Async twin of run_field_tasks"""
+    results = {}
+    async for parsed in aiter_field_tasks(tasks, max_concurrency):
+        results.update(parsed)
+    return results
+
+def build_field_tasks(chroma_collection, doc_id: str, document: ParsedPDF, db_values: dict,
+                      mode: str = FIELD_EXTRACTION_MODE) -> Tuple[Dict[str, FieldTask], Dict[str, FieldTask]]:
+    """Retrieve context for every field and build its prompt, without calling the LLM yet.
+    Returns (tasks, fallback_tasks); fallback tasks are the per-field prompts for grouped fields and
+    only run for keys the grouped answer is missing."""
+    tasks = {}
+    fallback_tasks = {}
+    grouped_fields = [field for field in GROUPED_FIELDS if field in FIELDS] if mode == "grouped" else []
+    grouped_chunks = []
+
+    # One batched embed + one multi-query Chroma call covers every retrieved field
+    retrieved = retrieve_chunks(chroma_collection, doc_id, build_retrieval_queries(db_values))
 
     # Handle dates first using targeted chunk queries
-    extracted_dates = extract_dates_from_chunks(chroma_collection, doc_id)
-    results["start_date"] = extracted_dates["start_date"] or ""
-    results["end_date"] = extracted_dates["end_date"] or ""
+    for date_type in DATE_KEYWORDS:
+        if retrieved[date_type]:
+            tasks[date_type] = build_date_task(date_type, join_chunks(retrieved[date_type]))
 
     # Handle client extraction with specialized logic
-    results["client"] = extract_client_from_chunks(chroma_collection, doc_id)
+    if retrieved["client"]:
+        tasks["client"] = build_client_task(join_chunks(retrieved["client"]))
+
+    # Get context from first n pages for Technology and Practice (served from the already parsed pages)
+    early_context = document.first_n_pages(TECHNOLOGY_PAGES)
 
-    # Get context from first n pages for Technology and Practice (single call to avoid repeated file reads)
-    early_context = extract_first_n_pages(file_path, TECHNOLOGY_PAGES)
-    
     for field in FIELDS:
         match_field = field.lower().replace(" ", "_")
-        
+
         # Skip dates and client as they're already processed
         if field in DATE_FIELDS or field == "Client":
             continue
-            
+
         valid_list = db_values.get(match_field, [])
 
         # SPECIAL HANDLING FOR TECHNOLOGY
         if field == "Technology":
-            prompt = generate_tech_prompt(early_context)
-            raw_response = query_azure_openai(prompt) # Make sure the LLM's context length is high enough or you'll get an empty list
-            tech_list = safe_parse_list(raw_response)
-            results[match_field] = fuzzy_match(tech_list, valid_list) if valid_list else tech_list
-            #results[match_field] = tech_list
+            # Make sure the LLM's context length is high enough or you'll get an empty list
+            tasks[match_field] = (generate_tech_prompt(early_context), partial(_parse_technology, valid_list))
             continue
 
         # SPECIAL HANDLING FOR PRACTICE (with fuzzy matching)
         if field == "Practice":
-            prompt = generate_practice_prompt(early_context, valid_list)
-            raw_response = query_azure_openai(prompt)
-            practice_list = safe_parse_list(raw_response) if '[' in raw_response else [clean_llm_response(raw_response)]
-            results[match_field] = fuzzy_match(practice_list, valid_list)[0] if valid_list else practice_list[0] if practice_list else ""
-            #results[match_field] = practice_list
+            tasks[match_field] = (generate_practice_prompt(early_context, valid_list), partial(_parse_practice, valid_list))
             continue
 
         # SPECIAL HANDLING FOR PROJECT NAME
         if field == "Project Name":
             # Use first page for project name (reuse early_context if it's from 1+ pages)
-            project_context = extract_first_n_pages(file_path, 2)
-            prompt = generate_prompt(field, project_context)
-            raw_response = query_azure_openai(prompt)
-            results[match_field] = clean_llm_response(raw_response)
+            project_context = document.first_n_pages(2)
+            tasks[match_field] = (generate_prompt(field, project_context), partial(_parse_cleaned, match_field))
             continue
 
+        # Grouped fields keep their single-field prompt as a fallback
+        target = fallback_tasks if field in grouped_fields else tasks
+
         # SPECIAL HANDLING FOR CATEGORY
         if field == "Category":
-            prompt = generate_category_prompt(early_context)
-            raw_response = query_azure_openai(prompt)
-            results[match_field] = clean_llm_response(raw_response)
+            target[match_field] = (generate_category_prompt(early_context), partial(_parse_cleaned, match_field))
             continue
 
         # REGULAR RAG FLOW WITH DOCUMENT-SPECIFIC FILTERING
-        query_text = f"{field}. Possible values: {', '.join(valid_list)}" if valid_list else field
-        
-        query_result = chroma_collection.query(
-            query_texts=[query_text], 
-            n_results=5,
-            where={"doc_id": doc_id} #Prevent Cross talk between documents
-        )
-        
-        context_chunks = query_result["documents"][0]
-        context = "\n---\n".join(context_chunks)
+        chunks = retrieved[match_field]
+        context = join_chunks(chunks)
+        if field in grouped_fields:
+            grouped_chunks.extend(chunks)
 
         # Field-specific prompt handling
-        
         if field == "Status":
             prompt = generate_status_prompt(context)
         elif field == "Billing Type":
@@ -208,15 +344,231 @@ def extract_fields_from_pdf(file_path: str) -> dict:
         else:
             prompt = generate_prompt(field, context)
 
+        target[match_field] = (prompt, partial(_parse_cleaned, match_field))
+
+    if grouped_fields:
+        grouped_context = early_context if "Category" in grouped_fields else ""
+        tasks["grouped"] = build_grouped_task(grouped_fields, grouped_context, grouped_chunks)
+
+    return tasks, fallback_tasks
+
+def ingest_document(chroma_collection, content_hash: str, document: ParsedPDF, chunk_embeddings: list = None) -> str:
+    """Chunk and store a document once per content hash; returns its doc_id.
+    The existence check is an indexed lookup, so it doesn't grow with the number of stored SOWs.
+    chunk_embeddings (one per document.chunks() entry) skips embedding inside Chroma when already computed."""
+    doc_id = content_hash
+    doc_index = get_document_index()
+    lexical_store = get_lexical_index_store()
+
+    def already_ingested() -> bool:
+        entry = doc_index.get(content_hash)
+        if entry is None:
+            return False
+        # Lookup by id is indexed too; guards against a Chroma store that was reset under the index
+        return entry["n_chunks"] == 0 or bool(chroma_collection.get(ids=[f"{doc_id}_0"])["ids"])
+
+    if already_ingested():
+        print(f"📦 Document {doc_id[:12]} already indexed, skipping ingestion...")
+        # Documents stored before hybrid retrieval get their lexical index on the next upload
+        if RETRIEVAL_MODE == "hybrid" and not lexical_store.contains(content_hash):
+            lexical_store.add(content_hash, document.chunks())
+        return doc_id
+
+    with doc_index.ingest_lock(content_hash):
+        # A concurrent upload of the same file may have finished while we waited
+        if already_ingested():
+            return doc_id
+
+        chunks = document.chunks()
+        if chunks:
+            chunk_pages = document.chunk_pages()
+            # upsert keeps ingestion idempotent even if another process races us on the same file
+            chroma_collection.upsert(
+                documents=chunks,
+                ids=[f"{doc_id}_{i}" for i in range(len(chunks))],
+                metadatas=[{"doc_id": doc_id, "chunk_index": i, "page": chunk_pages[i]} for i in range(len(chunks))],
+                embeddings=chunk_embeddings
+            )
+        # Built from the same chunks, so lexical hits map straight onto Chroma ids
+        lexical_store.add(content_hash, chunks)
+        doc_index.add(content_hash, doc_id, len(chunks))
 
-        raw_response = query_azure_openai(prompt)
-        
-        results[match_field] = clean_llm_response(raw_response)
+    return doc_id
 
-    # Convert to properly formatted JSON structure
+def final_fields(parsed: dict, emitted: set) -> Dict[str, object]:
+    """Fields from one parsed answer not streamed yet, keyed by display name.
+    Parsers leave out grouped fields they couldn't fill, so whatever they return is final."""
+    final = {}
+    for field in FIELDS:
+        match_field = field.lower().replace(" ", "_")
+        if match_field in parsed and match_field not in emitted:
+            final[field] = parsed[match_field]
+            emitted.add(match_field)
+    return final
+
+def format_results(results: dict) -> dict:
+    """Convert to properly formatted JSON structure"""
     formatted_results = {}
     for field in FIELDS:
         match_field = field.lower().replace(" ", "_")
         formatted_results[field] = results.get(match_field, "")
-    
-    return formatted_results
\ No newline at end of file
+
+    return formatted_results
+
+
+def pipeline_cache_version(mode: str = FIELD_EXTRACTION_MODE) -> str:
+    """Everything besides the PDF bytes that decides the extraction output"""
+    return f"{PIPELINE_VERSION}:{PROMPTS_VERSION}:{mode}:{RETRIEVAL_MODE}:{AZURE_OPENAI_DEPLOYMENT}"
+
+def get_cached_extraction(content_hash: str, mode: str = FIELD_EXTRACTION_MODE, use_cache: bool = True) -> Optional[dict]:
+    result_cache = get_result_cache() if use_cache else None
+    if not result_cache:
+        return None
+
+    cached = result_cache.get(content_hash, pipeline_cache_version(mode))
+    if cached is not None:
+        print(f"⚡ Returning cached extraction for document {content_hash[:12]}")
+    return cached
+
+def prepare_field_tasks(file_path: str, content_hash: str, mode: str = FIELD_EXTRACTION_MODE,
+                        document: ParsedPDF = None,
+                        chunk_embeddings: list = None) -> Tuple[Dict[str, FieldTask], Dict[str, FieldTask]]:
+    """CPU/local part of the extraction: parse, ingest, retrieve and build every field prompt.
+    Callers that parsed and embedded the PDF elsewhere (bulk_extract.py) pass document and chunk_embeddings."""
+    # Parse once; full text, early pages and chunks all come from the same page texts
+    document = document or parse_pdf(file_path)
+    db_values = load_db_values()
+
+    chroma_collection = get_sow_collection()
+
+    # Identical uploads share one set of chunks, whatever their filename
+    doc_id = ingest_document(chroma_collection, content_hash, document, chunk_embeddings)
+
+    return build_field_tasks(chroma_collection, doc_id, document, db_values, mode)
+
+def missing_fallback_tasks(results: dict, fallback_tasks: Dict[str, FieldTask]) -> Dict[str, FieldTask]:
+    """Per-field fallback for anything the grouped answer didn't cover"""
+    missing = {key: task for key, task in fallback_tasks.items() if key not in results}
+    if missing:
+        print(f"↩️ Grouped answer missing {list(missing)}, falling back to per-field prompts")
+    return missing
+
+def finish_extraction(content_hash: str, results: dict, mode: str = FIELD_EXTRACTION_MODE,
+                      use_cache: bool = True) -> dict:
+    formatted_results = format_results(results)
+    result_cache = get_result_cache() if use_cache else None
+    # Like the LLM cache, never keep an answer built on a failed request
+    if result_cache and extraction_failed(results):
+        print(f"⚠️ Not caching extraction for document {content_hash[:12]}: a field prompt failed")
+    elif result_cache:
+        result_cache.put(content_hash, pipeline_cache_version(mode), formatted_results)
+    return formatted_results
+
+def extract_fields_from_pdf(file_path: str, max_workers: int = FIELD_EXTRACTION_WORKERS,
+                            mode: str = FIELD_EXTRACTION_MODE, content_hash: str = None,
+                            use_cache: bool = True) -> dict:
+    """Extract all fields from PDF with enhanced error handling and specialized logic.
+    Field prompts are independent, so up to max_workers of them are sent to the LLM at once.
+    In "grouped" mode the simple fields share one JSON prompt with a per-field fallback.
+    Results are cached per (content hash, pipeline version); pass content_hash if it is already known."""
+    content_hash = content_hash or file_content_hash(file_path)
+    cached = get_cached_extraction(content_hash, mode, use_cache)
+    if cached is not None:
+        return cached
+
+    tasks, fallback_tasks = prepare_field_tasks(file_path, content_hash, mode)
+    results = run_field_tasks(tasks, max_workers=max_workers)
+
+    missing = missing_fallback_tasks(results, fallback_tasks)
+    if missing:
+        results.update(run_field_tasks(missing, max_workers=max_workers))
+
+    return finish_extraction(content_hash, results, mode, use_cache)
+
+async def aextract_fields_from_pdf(file_path: str, max_concurrency: int = FIELD_EXTRACTION_WORKERS,
+                                   mode: str = FIELD_EXTRACTION_MODE, content_hash: str = None,
+                                   use_cache: bool = True) -> dict:
+    """Async entry point for the ASGI app: PDF parsing, embedding and cache I/O run in the executor,
+    the LLM calls are awaited on the event loop. Returns the same dict as extract_fields_from_pdf."""
+    content_hash = content_hash or await asyncio.to_thread(file_content_hash, file_path)
+    cached = await asyncio.to_thread(get_cached_extraction, content_hash, mode, use_cache)
+    if cached is not None:
+        return cached
+
+    tasks, fallback_tasks = await asyncio.to_thread(prepare_field_tasks, file_path, content_hash, mode)
+    results = await arun_field_tasks(tasks, max_concurrency)
+
+    missing = missing_fallback_tasks(results, fallback_tasks)
+    if missing:
+        results.update(await arun_field_tasks(missing, max_concurrency))
+
+    return await asyncio.to_thread(finish_extraction, content_hash, results, mode, use_cache)
+
+def stream_fields_from_pdf(file_path: str, max_workers: int = FIELD_EXTRACTION_WORKERS,
+                           mode: str = FIELD_EXTRACTION_MODE, content_hash: str = None,
+                           use_cache: bool = True) -> Iterator[Tuple[str, dict]]:
+    """Streaming variant of extract_fields_from_pdf. Yields ("field", {"field", "value"}) as soon as each
+    field is final, then ("complete", results) with the same dict extract_fields_from_pdf returns."""
+    content_hash = content_hash or file_content_hash(file_path)
+    cached = get_cached_extraction(content_hash, mode, use_cache)
+    if cached is not None:
+        for field, value in cached.items():
+            yield "field", {"field": field, "value": value}
+        yield "complete", cached
+        return
+
+    tasks, fallback_tasks = prepare_field_tasks(file_path, content_hash, mode)
+    results = {}
+    emitted = set()
+
+    for parsed in iter_field_tasks(tasks, max_workers=max_workers):
+        results.update(parsed)
+        for field, value in final_fields(parsed, emitted).items():
+            yield "field", {"field": field, "value": value}
+
+    missing = missing_fallback_tasks(results, fallback_tasks)
+    for parsed in iter_field_tasks(missing, max_workers=max_workers):
+        results.update(parsed)
+        for field, value in final_fields(parsed, emitted).items():
+            yield "field", {"field": field, "value": value}
+
+    formatted_results = finish_extraction(content_hash, results, mode, use_cache)
+    # Fields with no context to ask about are final only now, as empty strings
+    for field, value in formatted_results.items():
+        if field.lower().replace(" ", "_") not in emitted:
+            yield "field", {"field": field, "value": value}
+    yield "complete", formatted_results
+
+async def astream_fields_from_pdf(file_path: str, max_concurrency: int = FIELD_EXTRACTION_WORKERS,
+                                  mode: str = FIELD_EXTRACTION_MODE, content_hash: str = None,
+                                  use_cache: bool = True) -> AsyncIterator[Tuple[str, dict]]:
+    """Async twin of stream_fields_from_pdf"""
+    content_hash = content_hash or await asyncio.to_thread(file_content_hash, file_path)
+    cached = await asyncio.to_thread(get_cached_extraction, content_hash, mode, use_cache)
+    if cached is not None:
+        for field, value in cached.items():
+            yield "field", {"field": field, "value": value}
+        yield "complete", cached
+        return
+
+    tasks, fallback_tasks = await asyncio.to_thread(prepare_field_tasks, file_path, content_hash, mode)
+    results = {}
+    emitted = set()
+
+    async for parsed in aiter_field_tasks(tasks, max_concurrency):
+        results.update(parsed)
+        for field, value in final_fields(parsed, emitted).items():
+            yield "field", {"field": field, "value": value}
+
+    missing = missing_fallback_tasks(results, fallback_tasks)
+    async for parsed in aiter_field_tasks(missing, max_concurrency):
+        results.update(parsed)
+        for field, value in final_fields(parsed, emitted).items():
+            yield "field", {"field": field, "value": value}
+
+    formatted_results = await asyncio.to_thread(finish_extraction, content_hash, results, mode, use_cache)
+    # Fields with no context to ask about are final only now, as empty strings
+    for field, value in formatted_results.items():
+        if field.lower().replace(" ", "_") not in emitted:
+            yield "field", {"field": field, "value": value}
+    yield "complete", formatted_results
@@ -2,6 +2,7 @@
 
 import os
 from dotenv import load_dotenv
+from rag.candidate_table import CANDIDATE_TABLE_PLACEHOLDER, fill_candidate_table
 load_dotenv()
 
 def generate_prompt(field, context):
@@ -18,16 +19,35 @@ def generate_prompt(field, context):
     )
 
 
+# Closed value sets shared by the single-field and grouped prompts
+STATUS_VALUES = ["In Progress", "Completed", "On Hold", "Not yet started", "Experimental"]
+BILLING_TYPE_VALUES = ["Time and Material", "Retainer", "Fixed Fee", "Staff Augmentation", "Research Grant"]
+CATEGORY_VALUES = ["Project", "Research", "Pilot", "Support", "Internal Innovation"]
+
+CATEGORY_GUIDELINES = (
+    "Category Guidelines:\n"
+    "- Project: Client-facing delivery work, implementation, development, integrations, or defined deliverables\n"
+    "- Research: Experimental work, feasibility studies, model experimentation, benchmarking, or R&D activities\n"
+    "- Pilot: Proof of concept, MVP, limited-scope trial, or validation phase before full rollout\n"
+    "- Support: Ongoing maintenance, monitoring, bug fixes, enhancements, or operational assistance\n"
+    "- Internal Innovation: Internal tools, accelerators, frameworks, or Horizon AI internal initiatives\n\n"
+)
+
+FIELD_ALLOWED_VALUES = {
+    "Status": STATUS_VALUES,
+    "Billing Type": BILLING_TYPE_VALUES,
+    "Category": CATEGORY_VALUES,
+}
+
+def _value_options(values):
+    return "".join(f"  - {value}\n" for value in values)
+
 def generate_status_prompt(context):
     """Generate strict status extraction prompt"""
     return (
         f"Rules:\n"
         f"- Output ONLY ONE of the following values:\n"
-        f"  - In Progress\n"
-        f"  - Completed\n"
-        f"  - On Hold\n"
-        f"  - Not yet started\n"
-        f"  - Experimental\n"
+        f"{_value_options(STATUS_VALUES)}"
         f"- NO explanations, no reasoning\n"
         f"- If not sure, make your best guess\n\n"
         f"Document excerpt:\n{context}\n\n"
@@ -61,11 +81,7 @@ def generate_billing_type_prompt(context):
     return (
         f"Rules:\n"
         f"- Output ONLY ONE of the following values:\n"
-        f"  - Time and Material\n"
-        f"  - Retainer\n"
-        f"  - Fixed Fee\n"
-        f"  - Staff Augmentation\n"
-        f"  - Research Grant\n"
+        f"{_value_options(BILLING_TYPE_VALUES)}"
         f"- NO explanations, no reasoning\n"
         f"- Be precise and concise\n\n"
         f"Document excerpt:\n{context}\n\n"
@@ -107,22 +123,13 @@ def generate_category_prompt(context):
     return (
         "Rules:\n"
         "- Output ONLY ONE of the following values:\n"
-        "  - Project\n"
-        "  - Research\n"
-        "  - Pilot\n"
-        "  - Support\n"
-        "  - Internal Innovation\n"
+        f"{_value_options(CATEGORY_VALUES)}"
         "- NO explanations\n"
         "- NO reasoning text\n"
         "- NO additional words or punctuation\n"
         "- Choose the MOST appropriate category based on the document context\n"
         "- If unclear, make your best guess\n\n"
-        "Category Guidelines:\n"
-        "- Project: Client-facing delivery work, implementation, development, integrations, or defined deliverables\n"
-        "- Research: Experimental work, feasibility studies, model experimentation, benchmarking, or R&D activities\n"
-        "- Pilot: Proof of concept, MVP, limited-scope trial, or validation phase before full rollout\n"
-        "- Support: Ongoing maintenance, monitoring, bug fixes, enhancements, or operational assistance\n"
-        "- Internal Innovation: Internal tools, accelerators, frameworks, or Horizon AI internal initiatives\n\n"
+        f"{CATEGORY_GUIDELINES}"
         "Document excerpt:\n"
         f"{context}\n\n"
         "Category:"
@@ -158,6 +165,28 @@ def generate_end_date_prompt(context):
         f"End Date:"
     )
 
+def generate_grouped_fields_prompt(fields, context):
+    """Generate a single structured-JSON prompt for several simple fields sharing one context"""
+    field_rules = ""
+    for field in fields:
+        allowed_values = FIELD_ALLOWED_VALUES.get(field)
+        if allowed_values:
+            field_rules += f'  - "{field}": ONE of {", ".join(allowed_values)}\n'
+        else:
+            field_rules += f'  - "{field}": ONLY the {field} value\n'
+
+    return (
+        f"Rules:\n"
+        f"- Output ONLY a JSON object with exactly these keys:\n"
+        f"{field_rules}"
+        f"- NO explanations, reasoning, or calculations\n"
+        f"- If a value is not found, give your best guess\n"
+        f"- Be precise and concise\n\n"
+        f"{CATEGORY_GUIDELINES if 'Category' in fields else ''}"
+        f"Document excerpt:\n{context}\n\n"
+        f"JSON:"
+    )
+
 #rag/prompts.py (updated with enhanced JSON fields)
 
 def generate_manager_recommendation_prompt(sow_data, manager_candidates):
@@ -175,24 +204,10 @@ def generate_manager_recommendation_prompt(sow_data, manager_candidates):
     - Budget: {sow_data.get('budgeted_hours', '')}
     """
 
-    candidates_text = "AVAILABLE MANAGERS:\n"
-    for i, candidate in enumerate(manager_candidates, 1):
-        meta = candidate['metadata']
-        candidates_text += f"""
-        M{i}. {meta['resource_name']}
-        - Designation: {meta.get('designation', 'N/A')}
-        - Skills: {meta.get('skills', 'N/A')}
-        - Experience: {meta.get('experience_months', '0')} months
-        - Level: {meta.get('designation_level', 'N/A')}
-        - Department: {meta.get('department', 'N/A')}
-        - Base Department: {meta.get('base_department', 'N/A')}
-        - Hours Worked on Skills: {meta.get('hours_worked', '0')} hours
-        - Availability: {meta.get('availability', '0')}%
-        - Weekly Hours Available: {meta.get('hours_available_weekly', '0')} hours/week
-        - Practice Areas: {meta.get('practices_with_hours', 'N/A')}
-        """
+    # Filled in by fill_candidate_table once the rest of the prompt has been measured
+    candidates_text = CANDIDATE_TABLE_PLACEHOLDER
 
-    return f"""
+    prompt = f"""
     You are an expert consultant selecting PROJECT MANAGERS for a software development project.
 
     *** CRITICAL REQUIREMENT ***
@@ -210,7 +225,7 @@ def generate_manager_recommendation_prompt(sow_data, manager_candidates):
     5. Experience level and designation
     6. Communication and coordination skills
     7. Practice area experience that matches project requirements  
-    8. Higher proficiency levels (in parentheses) indicate stronger expertise and must be considered when evaluating skills
+    8. Higher proficiency levels (the number after each skill) indicate stronger expertise and must be considered when evaluating skills
 
     ALLOCATION RULES:
     - CRITICAL: Check each candidate's "Weekly Hours Available" field carefully
@@ -275,6 +290,7 @@ def generate_manager_recommendation_prompt(sow_data, manager_candidates):
         ]
     }}
     """.strip()
+    return fill_candidate_table(prompt, "MANAGERS", "M", manager_candidates, sow_data.get('technology', []), n_managers)
 
 def generate_tester_recommendation_prompt(sow_data, tester_candidates):
     """Generate AI prompt specifically for tester recommendations"""
@@ -291,24 +307,10 @@ def generate_tester_recommendation_prompt(sow_data, tester_candidates):
     - Budget: {sow_data.get('budgeted_hours', '')}
     """
 
-    candidates_text = "AVAILABLE TESTERS:\n"
-    for i, candidate in enumerate(tester_candidates, 1):
-        meta = candidate['metadata']
-        candidates_text += f"""
-        T{i}. {meta['resource_name']}
-        - Designation: {meta.get('designation', 'N/A')}
-        - Skills: {meta.get('skills', 'N/A')}
-        - Experience: {meta.get('experience_months', '0')} months
-        - Level: {meta.get('designation_level', 'N/A')}
-        - Department: {meta.get('department', 'N/A')}
-        - Base Department: {meta.get('base_department', 'N/A')}
-        - Hours Worked on Skills: {meta.get('hours_worked', '0')} hours
-        - Availability: {meta.get('availability', '0')}%
-        - Weekly Hours Available: {meta.get('hours_available_weekly', '0')} hours/week
-        - Practice Areas: {meta.get('practices_with_hours', 'N/A')}
-        """
+    # Filled in by fill_candidate_table once the rest of the prompt has been measured
+    candidates_text = CANDIDATE_TABLE_PLACEHOLDER
 
-    return f"""
+    prompt = f"""
     You are an expert consultant selecting QUALITY ASSURANCE TESTERS for a software development project.
 
     *** CRITICAL REQUIREMENT ***
@@ -326,7 +328,7 @@ def generate_tester_recommendation_prompt(sow_data, tester_candidates):
     5. Availability and capacity (both percentage and weekly hours)
     6. Previous project success in similar environments
     7. Practice area experience that matches project requirements
-    8. Higher proficiency levels (in parentheses) indicate stronger expertise and must be considered when evaluating skills
+    8. Higher proficiency levels (the number after each skill) indicate stronger expertise and must be considered when evaluating skills
 
     ALLOCATION RULES:
     - CRITICAL: Check each candidate's "Weekly Hours Available" field carefully
@@ -391,6 +393,7 @@ def generate_tester_recommendation_prompt(sow_data, tester_candidates):
         ]
     }}
     """.strip()
+    return fill_candidate_table(prompt, "TESTERS", "T", tester_candidates, sow_data.get('technology', []), n_testers)
 
 
 def generate_developer_recommendation_prompt(sow_data, developer_candidates):
@@ -408,24 +411,10 @@ def generate_developer_recommendation_prompt(sow_data, developer_candidates):
     - Budget: {sow_data.get('budgeted_hours', '')}
     """
 
-    candidates_text = "AVAILABLE DEVELOPERS:\n"
-    for i, candidate in enumerate(developer_candidates, 1):
-        meta = candidate['metadata']
-        candidates_text += f"""
-        D{i}. {meta['resource_name']}
-        - Designation: {meta.get('designation', 'N/A')}
-        - Skills: {meta.get('skills', 'N/A')}
-        - Experience: {meta.get('experience_months', '0')} months
-        - Level: {meta.get('designation_level', 'N/A')}
-        - Department: {meta.get('department', 'N/A')}
-        - Base Department: {meta.get('base_department', 'N/A')}
-        - Hours Worked on Skills: {meta.get('hours_worked', '0')} hours
-        - Availability: {meta.get('availability', '0')}%
-        - Weekly Hours Available: {meta.get('hours_available_weekly', '0')} hours/week
-        - Practice Areas: {meta.get('practices_with_hours', 'N/A')}
-        """
+    # Filled in by fill_candidate_table once the rest of the prompt has been measured
+    candidates_text = CANDIDATE_TABLE_PLACEHOLDER
 
-    return f"""
+    prompt = f"""
     You are an expert consultant selecting SOFTWARE DEVELOPERS for a development project.
 
     *** CRITICAL REQUIREMENT ***
@@ -443,7 +432,7 @@ def generate_developer_recommendation_prompt(sow_data, developer_candidates):
     5. Previous project success in similar tech stacks
     6. Problem-solving and development capabilities
     7. Practice area experience that matches project requirements
-    8. Higher proficiency levels (in parentheses) indicate stronger expertise and must be considered when evaluating skills
+    8. Higher proficiency levels (the number after each skill) indicate stronger expertise and must be considered when evaluating skills
 
     ALLOCATION RULES:
     - CRITICAL: Check each candidate's "Weekly Hours Available" field carefully
@@ -508,6 +497,7 @@ def generate_developer_recommendation_prompt(sow_data, developer_candidates):
         ]
     }}
     """.strip()
+    return fill_candidate_table(prompt, "DEVELOPERS", "D", developer_candidates, sow_data.get('technology', []), n_developers)
 
 def generate_employee_search_query(sow_data):
     """Generate search query for employee matching"""
@@ -525,6 +515,13 @@ def generate_employee_search_query(sow_data):
     """.strip()
 
 
+EMPLOYEE_ROLE_DESCRIPTIONS = {
+    "manager": "Project Manager / Team Lead",
+    "tester": "Quality Assurance / Software Tester",
+    "developer": "Software Developer"
+}
+DEFAULT_ROLE_DESCRIPTION = "Software Developer"
+
 def generate_employee_text_summary(row, employee_type="employee"):
     """Generate text summary for employee vectorization - UPDATED FOR NEW SCHEMA"""
     name = str(row.get('ResourceName', 'Unknown'))
@@ -540,12 +537,7 @@ def generate_employee_text_summary(row, employee_type="employee"):
     practices_with_hours = str(row.get('ResourcePracticesWithHoursWorked', ''))  # New field
 
     # Customize the role description based on employee type
-    if employee_type == "manager":
-        role_desc = "Project Manager / Team Lead"
-    elif employee_type == "tester":
-        role_desc = "Quality Assurance / Software Tester"
-    else:  # developer
-        role_desc = "Software Developer"
+    role_desc = EMPLOYEE_ROLE_DESCRIPTIONS.get(employee_type, DEFAULT_ROLE_DESCRIPTION)
 
     text = f"""
     {employee_type.title()}: {name}
@@ -561,4 +553,33 @@ def generate_employee_text_summary(row, employee_type="employee"):
     Weekly Hours Available: {hours_available_weekly} hours/week
     Practice Areas with Hours: {practices_with_hours}
     """
-    return text.strip()
\ No newline at end of file
+    return text.strip()
+
+def _summary_column(df, column: str, default: str):
+    """Column as strings, matching str(row.get(column, default)) for every row"""
+    return df[column].astype(str) if column in df.columns else default
+
+def generate_employee_text_summaries(df, employee_type="employee") -> list:
+    """Column-wise generate_employee_text_summary for a whole roster DataFrame; same text, row for row"""
+    role_desc = EMPLOYEE_ROLE_DESCRIPTIONS.get(employee_type, DEFAULT_ROLE_DESCRIPTION)
+
+    def column(name: str, default: str):
+        return _summary_column(df, name, default)
+
+    text = (
+        f"{employee_type.title()}: " + column('ResourceName', 'Unknown')
+        + f"\n    Role: {role_desc}"
+        + "\n    Designation: " + column('ResourceDesignationName', 'Unknown')
+        + "\n    Skills: " + column('ResourceSubSkillWithProficiency', '')
+        + "\n    Experience: " + column('ResourceExperienceInMonths', '0') + " months"
+        + "\n    Level: " + column('ResourceDesignationLevel', 'Unknown')
+        + "\n    Department: " + column('ResourceDepartmentName', 'Unknown')
+        + "\n    Base Department: " + column('ResourceBaseDepartment', 'Unknown')
+        + "\n    Hours Worked on Skills: " + column('HoursWorkedOnSkill', '0') + " hours"
+        + "\n    Availability: " + column('ResourceAvailabilityInPercentage', '0') + "%"
+        + "\n    Weekly Hours Available: " + column('HoursAvailableOutOf40', '0') + " hours/week"
+        + "\n    Practice Areas with Hours: " + column('ResourcePracticesWithHoursWorked', '')
+    )
+    if isinstance(text, str):  # no roster column present at all
+        return [text.strip()] * len(df)
+    return text.str.strip().tolist()
@@ -1,6 +1,11 @@
 import os
+import time
+import asyncio
+import threading
+from contextlib import nullcontext
+from functools import lru_cache
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from rag.llm_cache import CompletionCache, get_completion_cache
 
 load_dotenv()
 
@@ -21,30 +26,109 @@ TEMPERATURE = 0.5
 MAX_TOKENS = 1024
 TOP_P = 0.9
 
-# Azure OpenAI client (singleton-style, cheap to reuse)
-client = AzureOpenAI(
-    api_key=AZURE_OPENAI_API_KEY,
-    azure_endpoint=AZURE_OPENAI_ENDPOINT,
-    api_version=AZURE_OPENAI_API_VERSION,
-)
+# Returned instead of an answer when the request fails
+LLM_ERROR = "ERROR"
+
+# Process-wide cap on in-flight blocking LLM requests (0 = unlimited), e.g. for bulk backfills
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 0))
+_llm_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY) if LLM_MAX_CONCURRENCY > 0 else None
+
+def set_llm_concurrency(limit: int):
+    """Change the cap on concurrent blocking LLM requests; 0 or less removes it"""
+    global _llm_slots
+    _llm_slots = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+# Azure OpenAI clients (singleton-style, cheap to reuse). Created on first use so importing this
+# module doesn't pull in the openai SDK before a request needs it.
+@lru_cache(maxsize=1)
+def get_client():
+    from openai import AzureOpenAI
+    return AzureOpenAI(
+        api_key=AZURE_OPENAI_API_KEY,
+        azure_endpoint=AZURE_OPENAI_ENDPOINT,
+        api_version=AZURE_OPENAI_API_VERSION,
+    )
+
+# Non-blocking twin used by the ASGI app; requests wait on the event loop instead of holding a thread
+@lru_cache(maxsize=1)
+def get_async_client():
+    from openai import AsyncAzureOpenAI
+    return AsyncAzureOpenAI(
+        api_key=AZURE_OPENAI_API_KEY,
+        azure_endpoint=AZURE_OPENAI_ENDPOINT,
+        api_version=AZURE_OPENAI_API_VERSION,
+    )
 
-def query_azure_openai(prompt: str) -> str:
+def _timeout_option(timeout: float = None) -> dict:
+    """timeout as a create() keyword; None leaves the SDK default in place (an explicit None would disable it)"""
+    return {} if timeout is None else {"timeout": timeout}
+
+def query_azure_openai(prompt: str, use_cache: bool = True, timeout: float = None) -> str:
+    """Query the deployment, serving repeated prompts from the completion cache unless use_cache=False.
+    timeout (seconds) overrides the client's default request timeout."""
+
+    cache = get_completion_cache() if use_cache else None
+    if cache:
+        cache_key = CompletionCache.make_key(prompt, AZURE_OPENAI_DEPLOYMENT, TEMPERATURE, TOP_P, MAX_TOKENS)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ LLM cache hit for deployment: {AZURE_OPENAI_DEPLOYMENT}")
+            return cached
 
     print(f"☁️ Querying Azure OpenAI deployment: {AZURE_OPENAI_DEPLOYMENT}")
     print(f"\n\n🔸 Prompt:\n{prompt}\n")
 
+    try:
+        with _llm_slots or nullcontext():
+            start = time.perf_counter()
+            if USE_STREAMING:
+                response = _query_streaming(prompt, timeout)
+            else:
+                response = _query_blocking(prompt, timeout)
+
+    except Exception as e:
+        print(f"❌ LLM Query Failed: {e}")
+        return LLM_ERROR
+
+    # Failed and empty answers are never cached
+    if cache and response:
+        cache.put(cache_key, response, time.perf_counter() - start)
+
+    return response
+
+async def aquery_azure_openai(prompt: str, use_cache: bool = True, timeout: float = None) -> str:
+    """Async version of query_azure_openai with the same caching and error handling"""
+
+    cache = get_completion_cache() if use_cache else None
+    if cache:
+        cache_key = CompletionCache.make_key(prompt, AZURE_OPENAI_DEPLOYMENT, TEMPERATURE, TOP_P, MAX_TOKENS)
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            print(f"⚡ LLM cache hit for deployment: {AZURE_OPENAI_DEPLOYMENT}")
+            return cached
+
+    print(f"☁️ Querying Azure OpenAI deployment (async): {AZURE_OPENAI_DEPLOYMENT}")
+    print(f"\n\n🔸 Prompt:\n{prompt}\n")
+
+    start = time.perf_counter()
     try:
         if USE_STREAMING:
-            return _query_streaming(prompt)
+            response = await _aquery_streaming(prompt, timeout)
         else:
-            return _query_blocking(prompt)
+            response = await _aquery_blocking(prompt, timeout)
 
     except Exception as e:
         print(f"❌ LLM Query Failed: {e}")
-        return "ERROR"
+        return LLM_ERROR
+
+    # Failed and empty answers are never cached
+    if cache and response:
+        await asyncio.to_thread(cache.put, cache_key, response, time.perf_counter() - start)
 
-def _query_blocking(prompt: str) -> str:
-    response = client.chat.completions.create(
+    return response
+
+def _query_blocking(prompt: str, timeout: float = None) -> str:
+    response = get_client().chat.completions.create(
         model=AZURE_OPENAI_DEPLOYMENT,
         messages=[
             {"role": "user", "content": prompt}
@@ -52,12 +136,13 @@ def _query_blocking(prompt: str) -> str:
         temperature=TEMPERATURE,
         max_tokens=MAX_TOKENS,
         top_p=TOP_P,
+        **_timeout_option(timeout),
     )
 
     return response.choices[0].message.content.strip()
 
-def _query_streaming(prompt: str) -> str:
-    stream = client.chat.completions.create(
+def _query_streaming(prompt: str, timeout: float = None) -> str:
+    stream = get_client().chat.completions.create(
         model=AZURE_OPENAI_DEPLOYMENT,
         messages=[
             {"role": "user", "content": prompt}
@@ -66,6 +151,7 @@ def _query_streaming(prompt: str) -> str:
         max_tokens=MAX_TOKENS,
         top_p=TOP_P,
         stream=True,
+        **_timeout_option(timeout),
     )
 
     content = ""
@@ -88,6 +174,50 @@ def _query_streaming(prompt: str) -> str:
 
     return content.strip()
 
+async def _aquery_blocking(prompt: str, timeout: float = None) -> str:
+    response = await get_async_client().chat.completions.create(
+        model=AZURE_OPENAI_DEPLOYMENT,
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        top_p=TOP_P,
+        **_timeout_option(timeout),
+    )
+
+    return response.choices[0].message.content.strip()
+
+async def _aquery_streaming(prompt: str, timeout: float = None) -> str:
+    stream = await get_async_client().chat.completions.create(
+        model=AZURE_OPENAI_DEPLOYMENT,
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        top_p=TOP_P,
+        stream=True,
+        **_timeout_option(timeout),
+    )
+
+    content = ""
+
+    async for chunk in stream:
+        # Azure sometimes sends empty control chunks
+        if not chunk.choices:
+            continue
+
+        delta = getattr(chunk.choices[0], "delta", None)
+        if not delta:
+            continue
+
+        token = getattr(delta, "content", None)
+        if token:
+            content += token
+
+    return content.strip()
+
 
 if __name__ == "__main__":
     print(query_local_llm("List 5 uses of AI in finance."))
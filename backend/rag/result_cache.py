@@ -0,0 +1,86 @@
+# rag/result_cache.py
+import os
+import json
+import time
+import threading
+from typing import Optional
+from dotenv import load_dotenv
+from utils.sqlite_utils import connect_sqlite
+
+load_dotenv()
+
+# Document-level extraction cache config (from .env)
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH", "data/cache/extraction_cache.sqlite3")
+EXTRACTION_CACHE_TTL_DAYS = float(os.getenv("EXTRACTION_CACHE_TTL_DAYS", 30))
+
+class ExtractionResultCache:
+    """formatted_results of finished SOW extractions keyed by (PDF content hash, pipeline version)"""
+
+    def __init__(self, path: str = EXTRACTION_CACHE_PATH, ttl_seconds: float = EXTRACTION_CACHE_TTL_DAYS * 24 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        self._conn = connect_sqlite(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS extraction_results (
+                content_hash TEXT NOT NULL,
+                pipeline_version TEXT NOT NULL,
+                results TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (content_hash, pipeline_version)
+            )
+        """)
+        self._conn.commit()
+        self.purge_expired()
+
+    def get(self, content_hash: str, pipeline_version: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, created_at FROM extraction_results WHERE content_hash = ? AND pipeline_version = ?",
+                (content_hash, pipeline_version)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, content_hash: str, pipeline_version: str, results: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extraction_results VALUES (?, ?, ?, ?)",
+                (content_hash, pipeline_version, json.dumps(results), time.time())
+            )
+            self._conn.commit()
+
+    def invalidate(self, content_hash: Optional[str] = None) -> int:
+        """Drop the cached results for one document (every pipeline version), or everything when no hash is given"""
+        with self._lock:
+            if content_hash:
+                cursor = self._conn.execute("DELETE FROM extraction_results WHERE content_hash = ?", (content_hash,))
+            else:
+                cursor = self._conn.execute("DELETE FROM extraction_results")
+            self._conn.commit()
+            return cursor.rowcount
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM extraction_results WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+def get_result_cache() -> Optional[ExtractionResultCache]:
+    """Process-wide extraction result cache, or None when disabled via EXTRACTION_CACHE_ENABLED"""
+    global _result_cache
+    if not EXTRACTION_CACHE_ENABLED:
+        return None
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ExtractionResultCache()
+    return _result_cache
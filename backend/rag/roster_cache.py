@@ -0,0 +1,67 @@
+# rag/roster_cache.py
+import os
+import json
+from typing import List, Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from utils.pdf_utils import file_content_hash
+
+# Bump whenever preprocess_csv changes what it writes, so old caches are rebuilt
+ROSTER_CACHE_SCHEMA_VERSION = "1"
+
+def roster_cache_path(source_path: str) -> str:
+    """Cache file next to the roster CSV: Data/DeveloperDetails.csv -> Data/DeveloperDetails.cache.feather"""
+    return os.path.splitext(source_path)[0] + ".cache.feather"
+
+def source_fingerprint(source_path: str, with_hash: bool = True) -> dict:
+    """Size and mtime of the roster CSV, plus its SHA-256 so a touched but unchanged file still hits the cache"""
+    stat = os.stat(source_path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        fingerprint["sha256"] = file_content_hash(source_path)
+    return fingerprint
+
+def write_roster_cache(df: pd.DataFrame, cache_path: str, source_path: str):
+    """Store a processed roster as uncompressed Feather (Arrow IPC), which can be memory-mapped on load.
+    Schema version and source fingerprint live in the Arrow schema metadata."""
+    if os.path.abspath(cache_path) == os.path.abspath(source_path):
+        raise ValueError(f"Refusing to write the roster cache over its source file {source_path}")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"roster_cache_schema"] = ROSTER_CACHE_SCHEMA_VERSION.encode()
+    metadata[b"source_fingerprint"] = json.dumps(source_fingerprint(source_path)).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    tmp_path = f"{cache_path}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, cache_path)
+
+def read_roster_cache(cache_path: str, source_path: str, columns: List[str] = None) -> Optional[pd.DataFrame]:
+    """Load the cached roster if it was built from the current source file with the current schema version.
+    Only the requested columns are read from the memory-mapped file. Returns None when the cache is stale."""
+    if not os.path.exists(cache_path) or not os.path.exists(source_path):
+        return None
+
+    try:
+        with pa.memory_map(cache_path) as source:
+            schema = pa.ipc.open_file(source).schema
+    except (OSError, pa.ArrowInvalid) as e:
+        print(f"⚠️ Ignoring unreadable roster cache {cache_path}: {e}")
+        return None
+
+    metadata = schema.metadata or {}
+    if metadata.get(b"roster_cache_schema", b"").decode() != ROSTER_CACHE_SCHEMA_VERSION:
+        return None
+
+    cached = json.loads(metadata.get(b"source_fingerprint", b"{}"))
+    current = source_fingerprint(source_path, with_hash=False)
+    if (cached.get("size"), cached.get("mtime_ns")) != (current["size"], current["mtime_ns"]):
+        # Same bytes under a new mtime (copied or touched file) still count as a hit
+        if cached.get("size") != current["size"] or cached.get("sha256") != file_content_hash(source_path):
+            return None
+
+    if columns is not None:
+        columns = [column for column in columns if column in schema.names]
+    return feather.read_table(cache_path, columns=columns, memory_map=True).to_pandas()
@@ -0,0 +1,111 @@
+# rag/skill_index.py
+import re
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+MAX_PROFICIENCY = 5
+# Skills listed without a "(n)" suffix count as the lowest proficiency
+DEFAULT_PROFICIENCY = 1
+
+# Commas outside parentheses separate skills: "Python(5), Automation (Selenium)(3), Jira"
+SKILL_SEPARATOR = re.compile(r",(?![^()]*\))")
+# Name plus a trailing "(n)"; the name itself may contain parentheses
+SKILL_WITH_PROFICIENCY = re.compile(r"^(.*?)\s*\(\s*(\d+(?:\.\d+)?)\s*\)$")
+# "Automation (Selenium)" is also findable as "automation" and "selenium"
+QUALIFIED_SKILL = re.compile(r"^(.*?)\s*\(([^()]+)\)$")
+
+def normalize_skill(name: str) -> str:
+    return " ".join(name.lower().split())
+
+def parse_skills(skills: str) -> List[Tuple[str, float]]:
+    """[(skill name, proficiency)] from a ResourceSubSkillWithProficiency string"""
+    parsed = []
+    for item in SKILL_SEPARATOR.split(skills or ""):
+        item = item.strip()
+        if not item:
+            continue
+        match = SKILL_WITH_PROFICIENCY.match(item)
+        if match:
+            parsed.append((match.group(1).strip(), float(match.group(2))))
+        else:
+            parsed.append((item, float(DEFAULT_PROFICIENCY)))
+    return parsed
+
+def skill_keys(name: str) -> List[str]:
+    """Normalised names a skill can be looked up by"""
+    key = normalize_skill(name)
+    keys = [key]
+    match = QUALIFIED_SKILL.match(key)
+    if match:
+        keys.extend(part for part in (match.group(1).strip(), match.group(2).strip()) if part)
+    return keys
+
+class SkillIndex:
+    """Inverted skill -> (employee, proficiency) index for one employee type, held as a sparse
+    employees x skills matrix of proficiency / MAX_PROFICIENCY, one column per skill."""
+
+    def __init__(self, ids: List[str], skill_strings: List[str]):
+        self.ids = list(ids)
+        self.vocabulary: Dict[str, int] = {}
+        rows, columns, values = [], [], []
+        # Rosters repeat the same "Skill(n)" items endlessly, so each distinct item is parsed once
+        parsed_items: Dict[str, List[Tuple[str, float]]] = {}
+        for row, skills in enumerate(skill_strings):
+            proficiencies = {}
+            for item in SKILL_SEPARATOR.split(skills or ""):
+                entries = parsed_items.get(item)
+                if entries is None:
+                    entries = [(key, proficiency) for name, proficiency in parse_skills(item) for key in skill_keys(name)]
+                    parsed_items[item] = entries
+                for key, proficiency in entries:
+                    # The same key reached twice (e.g. "Selenium" and "Automation (Selenium)") keeps the higher level
+                    proficiencies[key] = max(proficiencies.get(key, 0.0), proficiency)
+            for key, proficiency in proficiencies.items():
+                rows.append(row)
+                columns.append(self.vocabulary.setdefault(key, len(self.vocabulary)))
+                values.append(min(proficiency, MAX_PROFICIENCY) / MAX_PROFICIENCY)
+
+        self.matrix = sparse.csr_matrix(
+            (np.asarray(values, dtype=np.float32), (rows, columns)),
+            shape=(len(self.ids), len(self.vocabulary))
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, employee_type: str) -> "SkillIndex":
+        """Index a processed roster; ids match the Chroma ids from build_role_vectors"""
+        id_values = df['ResourceId'] if 'ResourceId' in df.columns else df.index.to_series(index=df.index)
+        skills = df['ResourceSubSkillWithProficiency'] if 'ResourceSubSkillWithProficiency' in df.columns else [''] * len(df)
+        return cls((f"{employee_type}_" + id_values.astype(str)).tolist(), [str(value) for value in skills])
+
+    def query_vector(self, technologies: List[str]) -> Optional[np.ndarray]:
+        """Weights over the vocabulary for the requested skills (each counts 1 / number requested).
+        None when none of them is known to this roster."""
+        requested = {normalize_skill(technology) for technology in technologies if technology and technology.strip()}
+        weights = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for key in requested:
+            column = self.vocabulary.get(key)
+            if column is not None:
+                weights[column] = 1.0 / len(requested)
+        return weights if weights.any() else None
+
+    def coverage_scores(self, technologies: List[str]) -> np.ndarray:
+        """Proficiency-weighted share of the requested skills each employee covers, in [0, 1]"""
+        weights = self.query_vector(technologies)
+        if weights is None:
+            return np.zeros(len(self.ids), dtype=np.float32)
+        return np.asarray(self.matrix @ weights).ravel()
+
+    def top_candidates(self, technologies: List[str], n: int) -> List[Tuple[str, float]]:
+        """Up to n (id, coverage) pairs with non-zero coverage, best first"""
+        scores = self.coverage_scores(technologies)
+        matching = np.flatnonzero(scores > 0)
+        if len(matching) > n:
+            matching = matching[np.argpartition(-scores[matching], n - 1)[:n]]
+        matching = matching[np.argsort(-scores[matching], kind="stable")]
+        return [(self.ids[i], float(scores[i])) for i in matching]
+
+    def coverage_by_id(self, technologies: List[str]) -> Dict[str, float]:
+        scores = self.coverage_scores(technologies)
+        return {self.ids[i]: float(scores[i]) for i in np.flatnonzero(scores > 0)}
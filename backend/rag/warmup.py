@@ -0,0 +1,45 @@
+# rag/warmup.py
+import time
+import threading
+from typing import Dict
+
+# Nothing heavy is imported here: the servers import this at startup and load the models in the background
+
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+_warmup_state = {"status": "cold", "seconds": None, "error": None}
+
+def warm_up():
+    """Import the heavy modules and load the embedding model, employee vectors and static query embeddings,
+    so the first request doesn't pay for them"""
+    from rag.pipeline import warm_query_embeddings, get_sow_collection
+    from rag.employee_recommender import get_shared_recommender
+
+    get_shared_recommender().ensure_ready()
+    warm_query_embeddings()
+    get_sow_collection()
+
+def _run_warmup():
+    start = time.perf_counter()
+    try:
+        warm_up()
+        _warmup_state.update(status="ready", seconds=round(time.perf_counter() - start, 2))
+        print(f"🔥 Warm-up finished in {_warmup_state['seconds']:.2f}s")
+    except Exception as e:
+        # Requests still work, they just load whatever is missing on first use
+        _warmup_state.update(status="failed", error=str(e))
+        print(f"⚠️ Warm-up failed: {e}")
+
+def start_background_warmup() -> threading.Thread:
+    """Start warming on a daemon thread (once per process) while the server starts accepting requests"""
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_state["status"] = "warming"
+            _warmup_thread = threading.Thread(target=_run_warmup, name="warmup", daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
+
+def warmup_status() -> Dict:
+    """cold | warming | ready | failed, with the warm-up duration or error"""
+    return dict(_warmup_state)
@@ -0,0 +1,57 @@
+# test_candidate_table.py
+from rag.candidate_table import CANDIDATE_TABLE_PLACEHOLDER, encode_candidate_table, estimate_tokens, fill_candidate_table
+import rag.employee_recommender as employee_recommender
+from test_employee_search import search_recommender, unit
+
+SKILLS = "Python(5), Communication Skills(4), Docker(1), Jira(2), Kubernetes(3)"
+
+def candidate(name, similarity, coverage=0.5, skills=SKILLS):
+    return {'similarity_score': similarity, 'skill_coverage': coverage,
+            'metadata': {'resource_name': name, 'designation': 'Engineer', 'designation_level': 'L3', 'skills': skills,
+                         'experience_months': 60, 'availability': 50.0, 'hours_available_weekly': 16.0,
+                         'hours_worked': 'AI-ML(2200.00)', 'practices_with_hours': 'AI & Robotics (2200.00)'}}
+
+def test_estimate_tokens_grows_with_text():
+    assert estimate_tokens("") == 0
+    assert 0 < estimate_tokens("Python developer") < estimate_tokens("Python developer, five years of PyTorch")
+
+def test_table_shares_repeated_skills_and_drops_low_proficiency():
+    table = encode_candidate_table("DEVELOPERS", "D", [candidate(f"Dev {i}", 0.5) for i in range(4)], ["Docker"])
+    lines = table.splitlines()
+
+    assert lines[1].count("Communication Skills") == 1 and "Communication Skills" not in "\n".join(lines[3:])
+    row = lines[3]
+    assert row.startswith("D1 | Dev 0 | Engineer | L3 | 60 | 50 | 16 |")
+    # Requested Docker is kept despite proficiency 1, Jira(2) is cut
+    assert "Docker:1" in row and "Jira" not in row and "+1 lower" in row
+    assert row.endswith("| AI-ML(2200h) | AI & Robotics(2200h)")
+
+def test_budget_drops_lowest_scoring_candidates_first():
+    candidates = [candidate("Best", 0.9, 1.0), candidate("Worst", 0.1, 0.0), candidate("Middle", 0.5, 0.5)]
+    prompt = f"Pick one.\n{CANDIDATE_TABLE_PLACEHOLDER}\nAnswer in JSON."
+
+    full = fill_candidate_table(prompt, "DEVELOPERS", "D", candidates, [], 1, token_budget=10_000)
+    assert all(name in full for name in ("Best", "Worst", "Middle"))
+
+    budget = estimate_tokens(full) - 1
+    trimmed = fill_candidate_table(prompt, "DEVELOPERS", "D", candidates, [], 1, token_budget=budget)
+    assert "Worst" not in trimmed and "D2 | Middle" in trimmed and estimate_tokens(trimmed) <= budget
+
+    # Never fewer than the number of people the prompt asks for
+    minimal = fill_candidate_table(prompt, "DEVELOPERS", "D", candidates, [], 2, token_budget=1)
+    assert "Best" in minimal and "Middle" in minimal and "Worst" not in minimal
+
+def test_trimming_keeps_skill_matches_without_prefilter(monkeypatch):
+    # developer_3 is the closest vector but lists no requested skill, so it is the one trimmed
+    monkeypatch.setattr(employee_recommender, "SKILL_PREFILTER", False)
+    candidates = search_recommender().search_employees_by_type(
+        {"technology": ["Python"]}, "developer", n_results=3, query_embedding=unit([1, 0])
+    )
+    assert candidates[0]["id"] == "developer_3"
+
+    skill_matched = [candidate for candidate in candidates if candidate["id"] != "developer_3"]
+    budget = estimate_tokens(encode_candidate_table("DEVELOPERS", "D", skill_matched, ["Python"]))
+    prompt = fill_candidate_table(CANDIDATE_TABLE_PLACEHOLDER, "DEVELOPERS", "D", candidates, ["Python"],
+                                  min_candidates=1, token_budget=budget)
+    assert "developer_1" in prompt and "developer_2" in prompt
+    assert "developer_3" not in prompt
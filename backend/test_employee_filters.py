@@ -0,0 +1,24 @@
+# test_employee_filters.py
+import pytest
+from rag.employee_filters import DEFAULT_EMPLOYEE_FILTERS, build_where, parse_filters
+
+def test_defaults_apply_and_can_be_switched_off():
+    assert parse_filters() == DEFAULT_EMPLOYEE_FILTERS
+    assert parse_filters({"min_hours_available_weekly": None}) == {}
+
+def test_request_filters_become_typed_where_clause():
+    filters = parse_filters({"min_hours_available_weekly": "8", "min_experience_months": 24.0,
+                             "min_designation_level": "L3", "max_designation_level": 5})
+    assert build_where(filters) == {"$and": [
+        {"hours_available_weekly": {"$gte": 8.0}},
+        {"experience_months": {"$gte": 24}},
+        {"designation_level_num": {"$gte": 3}},
+        {"designation_level_num": {"$lte": 5}},
+    ]}
+    assert build_where({"min_availability": 50.0}) == {"availability": {"$gte": 50.0}}
+    assert build_where({}) is None
+
+@pytest.mark.parametrize("filters", [{"max_hours": 4}, {"min_experience_months": "a lot"}, {"min_designation_level": "senior"}, [1]])
+def test_invalid_filters_are_rejected(filters):
+    with pytest.raises(ValueError):
+        parse_filters(filters)
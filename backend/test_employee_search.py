@@ -0,0 +1,83 @@
+# test_employee_search.py
+import threading
+import chromadb
+import numpy as np
+from pytest import approx
+import rag.employee_recommender as employee_recommender
+from rag.employee_recommender import EmployeeRecommender
+from rag.fast_ranking import rank_candidates
+from rag.skill_index import SkillIndex
+
+SKILLS = {"developer_1": "Python(5)", "developer_2": "Python(3), SQL(4)", "developer_3": "Java(5)"}
+
+def unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+def search_recommender():
+    """EmployeeRecommender with an in-memory developer collection and skill index, no roster or Azure needed"""
+    client = chromadb.EphemeralClient()
+    # Ephemeral clients share one in-memory store per process
+    if "developers_search_test" in [collection.name for collection in client.list_collections()]:
+        client.delete_collection("developers_search_test")
+    collection = client.create_collection("developers_search_test")
+    collection.add(
+        ids=list(SKILLS),
+        embeddings=[unit([1, 0.1]), unit([1, 0.5]), unit([1, 0])],
+        documents=[f"Skills: {skills}" for skills in SKILLS.values()],
+        metadatas=[{"resource_name": employee_id, "skills": skills} for employee_id, skills in SKILLS.items()]
+    )
+    recommender = EmployeeRecommender.__new__(EmployeeRecommender)
+    recommender.developer_collection = collection
+    recommender.skill_indexes = {"developer": SkillIndex(list(SKILLS), list(SKILLS.values()))}
+    return recommender
+
+def test_fill_query_candidates_keep_their_skill_coverage(monkeypatch):
+    # Only developer_1 makes the prefilter; developer_2 comes back from the fill query but still lists Python
+    monkeypatch.setattr(employee_recommender, "SKILL_PREFILTER", True)
+    monkeypatch.setattr(employee_recommender, "SKILL_PREFILTER_CANDIDATES", 1)
+    candidates = search_recommender().search_employees_by_type(
+        {"technology": ["Python"]}, "developer", n_results=3, query_embedding=unit([1, 0])
+    )
+
+    coverage = {candidate["id"]: candidate["skill_coverage"] for candidate in candidates}
+    assert candidates[0]["id"] == "developer_1"
+    assert coverage == {"developer_1": approx(1.0), "developer_2": approx(0.6), "developer_3": 0.0}
+
+def test_coverage_and_cosine_similarity_without_prefilter(monkeypatch):
+    monkeypatch.setattr(employee_recommender, "SKILL_PREFILTER", False)
+    candidates = search_recommender().search_employees_by_type(
+        {"technology": ["Python"]}, "developer", n_results=3, query_embedding=unit([1, 0])
+    )
+
+    by_id = {candidate["id"]: candidate for candidate in candidates}
+    assert {employee_id: candidate["skill_coverage"] for employee_id, candidate in by_id.items()} == {
+        "developer_1": approx(1.0), "developer_2": approx(0.6), "developer_3": 0.0
+    }
+    # Squared L2 distances on unit vectors come back as cosine similarities
+    assert by_id["developer_3"]["similarity_score"] == approx(1.0, abs=1e-5)
+    assert by_id["developer_2"]["similarity_score"] == approx(1 / np.sqrt(1.25), abs=1e-5)
+
+    reasons = {rec["name"]: rec["reasons"][0] for rec in rank_candidates(candidates, ["Python"], 3)}
+    assert reasons["developer_2"] == "Covers 60% of the requested skills: Python(3)"
+
+def test_concurrent_requests_search_side_by_side():
+    """Every role search of two overlapping requests is in flight at once; a shared pool would queue them"""
+    roles = len(employee_recommender.ROLE_QUERY_LIMITS)
+    all_in_flight = threading.Barrier(2 * roles, timeout=5)
+    recommender = EmployeeRecommender.__new__(EmployeeRecommender)
+    recommender.embed_search_query = lambda sow_data: unit([1, 0])
+
+    def search(*args):
+        all_in_flight.wait()
+        return []
+
+    recommender.search_employees_by_type = search
+
+    results = []
+    requests = [threading.Thread(target=lambda: results.append(recommender.search_all_employees({}))) for _ in range(2)]
+    for request in requests:
+        request.start()
+    for request in requests:
+        request.join()
+    assert len(results) == 2 and all(len(result) == roles for result in results)
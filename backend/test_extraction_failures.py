@@ -0,0 +1,29 @@
+# test_extraction_failures.py
+from functools import partial
+import rag.pipeline as pipeline
+from rag.query_azure_openai import LLM_ERROR
+
+class RecordingCache:
+    def __init__(self):
+        self.puts = []
+
+    def put(self, content_hash, version, results):
+        self.puts.append(content_hash)
+
+def run_extraction(monkeypatch, answers):
+    """Run one client + one status prompt against canned LLM answers and finish the extraction"""
+    cache = RecordingCache()
+    monkeypatch.setattr(pipeline, "query_azure_openai", lambda prompt: answers[prompt])
+    monkeypatch.setattr(pipeline, "get_result_cache", lambda: cache)
+    tasks = {name: (name, partial(pipeline._parse_cleaned, name)) for name in answers}
+    results = pipeline.run_field_tasks(tasks, max_workers=2)
+    return pipeline.finish_extraction("abc123", results), cache
+
+def test_successful_extraction_is_cached(monkeypatch):
+    fields, cache = run_extraction(monkeypatch, {"client": "Tesla Inc.", "status": "Active"})
+    assert fields["Client"] == "Tesla Inc" and cache.puts == ["abc123"]
+
+def test_failed_field_prompt_is_never_cached(monkeypatch):
+    fields, cache = run_extraction(monkeypatch, {"client": "Tesla Inc.", "status": LLM_ERROR})
+    assert cache.puts == []
+    assert pipeline.FAILED_TASK_KEY not in fields
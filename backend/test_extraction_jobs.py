@@ -0,0 +1,53 @@
+# test_extraction_jobs.py
+import threading
+from rag.extraction_jobs import ExtractionJobQueue
+
+def test_job_runs_in_background_and_dedupes_by_hash(tmp_path):
+    """A submitted job finishes on the worker pool; re-submitting the same document while it runs reuses the job"""
+    release = threading.Event()
+
+    def extract(file_path, content_hash=None):
+        release.wait(5)
+        return {"Project Name": "Optimus"}
+
+    pdf = tmp_path / "sow.pdf"
+    pdf.write_bytes(b"%PDF")
+    queue = ExtractionJobQueue(path=str(tmp_path / "jobs.sqlite3"), max_workers=1, extract=extract)
+
+    job, created = queue.submit(str(pdf), "abc")
+    duplicate, duplicate_created = queue.submit(str(pdf), "abc")
+    assert created and not duplicate_created
+    assert duplicate["job_id"] == job["job_id"]
+    assert queue.wait(job["job_id"], timeout=0)["status"] in ("queued", "running")
+
+    release.set()
+    finished = queue.wait(job["job_id"], timeout=5)
+    assert finished["status"] == "done"
+    assert finished["result"] == {"Project Name": "Optimus"}
+    queue.shutdown()
+
+def test_unfinished_jobs_resume_after_restart(tmp_path):
+    pdf = tmp_path / "sow.pdf"
+    pdf.write_bytes(b"%PDF")
+    path = str(tmp_path / "jobs.sqlite3")
+
+    # First process dies before its worker gets to the job
+    stalled = ExtractionJobQueue(path=path, max_workers=1, extract=lambda *a, **k: {})
+    stalled._executor.shutdown(wait=True)
+    stalled._executor.submit = lambda *a, **k: None
+    job, _ = stalled.submit(str(pdf), "abc")
+
+    resumed = ExtractionJobQueue(path=path, max_workers=1, extract=lambda file_path, content_hash=None: {"Client": "Tesla"})
+    finished = resumed.wait(job["job_id"], timeout=5)
+    assert finished["status"] == "done"
+    assert finished["result"] == {"Client": "Tesla"}
+    resumed.shutdown()
+
+def test_missing_upload_fails_the_job(tmp_path):
+    queue = ExtractionJobQueue(path=str(tmp_path / "jobs.sqlite3"), max_workers=1, extract=lambda *a, **k: {})
+    job, _ = queue.submit(str(tmp_path / "gone.pdf"), "abc")
+    finished = queue.wait(job["job_id"], timeout=5)
+    assert finished["status"] == "failed"
+    assert "gone.pdf" in finished["error"]
+    assert queue.get("unknown") is None
+    queue.shutdown()
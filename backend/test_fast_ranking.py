@@ -0,0 +1,41 @@
+# test_fast_ranking.py
+import pytest
+from rag.employee_filters import parse_mode
+from rag.fast_ranking import composite_scores, rank_candidates, score_components
+
+def candidate(name, similarity, coverage, experience_months, level, hours, skills="Python(5), Docker(2)"):
+    return {
+        'similarity_score': similarity,
+        'skill_coverage': coverage,
+        'metadata': {'resource_name': name, 'designation': 'Engineer', 'skills': skills, 'experience_months': experience_months,
+                     'designation_level': f"L{level}", 'designation_level_num': level, 'availability': 50.0,
+                     'hours_available_weekly': hours}
+    }
+
+def test_composite_score_is_weighted_and_bounded():
+    components = score_components([candidate("Ada", 0.9, 1.0, 240, 7, 60), candidate("Bob", 0.0, 0.0, 0, -1, 0)])
+    assert components.tolist()[0] == [pytest.approx(0.9), 1.0, 1.0, 1.0, 1.0]
+    assert components.tolist()[1] == [0.0] * 5
+    scores = composite_scores(components)
+    assert 0.9 < scores[0] <= 1.0 and scores[1] == 0.0
+
+def test_rank_candidates_fills_recommendation_fields():
+    candidates = [
+        candidate("Low", 0.6, 0.1, 24, 1, 4, skills="Java(2)"),
+        candidate("High", 0.55, 0.9, 120, 4, 20),
+        candidate("Mid", 0.6, 0.5, 60, 3, 10),
+    ]
+    ranked = rank_candidates(candidates, ["Python", "Docker", "Kubernetes"], 2)
+
+    assert [rec["name"] for rec in ranked] == ["High", "Mid"]
+    best = ranked[0]
+    assert best["rank"] == "1" and best["allocation_suggestion"] == 20
+    assert best["reasons"][0].startswith("Covers 90% of the requested skills: Python(5), Docker(2)")
+    assert best["recommended_skills"] == ["Kubernetes"]
+    assert best["match_score"] >= ranked[1]["match_score"]
+    assert set(best["score_breakdown"]) == {"similarity", "skill_coverage", "experience", "designation_level", "weekly_hours"}
+
+def test_parse_mode():
+    assert parse_mode("FAST") == "fast"
+    with pytest.raises(ValueError):
+        parse_mode("slow")
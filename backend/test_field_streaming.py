@@ -0,0 +1,79 @@
+# test_field_streaming.py
+import asyncio
+from functools import partial
+import rag.pipeline as pipeline
+from utils.response_utils import sse_event
+
+GROUPED = ["Category", "Billing Type"]
+ANSWERS = {"client": "Tesla Inc.", "grouped": '{"Category": "Fixed Bid"}', "billing_type": "T&M"}
+
+class RecordingCache:
+    def __init__(self):
+        self.puts = []
+
+    def put(self, content_hash, version, results):
+        self.puts.append(results)
+
+def stub_extraction(monkeypatch, cached=None):
+    """Client prompt, grouped prompt missing "billing_type", and the per-field fallbacks, against canned answers"""
+    asked = []
+    cache = RecordingCache()
+
+    def query(prompt):
+        asked.append(prompt)
+        return ANSWERS[prompt]
+
+    async def aquery(prompt):
+        return query(prompt)
+
+    tasks = {
+        "client": ("client", partial(pipeline._parse_cleaned, "client")),
+        "grouped": ("grouped", partial(pipeline._parse_grouped, GROUPED)),
+    }
+    fallback_tasks = {name: (name, partial(pipeline._parse_cleaned, name)) for name in ["category", "billing_type"]}
+    monkeypatch.setattr(pipeline, "query_azure_openai", query)
+    monkeypatch.setattr(pipeline, "aquery_azure_openai", aquery)
+    monkeypatch.setattr(pipeline, "get_result_cache", lambda: cache)
+    monkeypatch.setattr(pipeline, "get_cached_extraction", lambda *args: cached)
+    monkeypatch.setattr(pipeline, "prepare_field_tasks", lambda *args: (tasks, fallback_tasks))
+    return asked, cache
+
+def expected_events():
+    answered = [("Client", "Tesla Inc"), ("Category", "Fixed Bid"), ("Billing Type", "T&M")]
+    # Fields nobody was asked about come last, as empty strings, in FIELDS order
+    unanswered = [(field, "") for field in pipeline.FIELDS if field not in dict(answered)]
+    return [("field", {"field": field, "value": value}) for field, value in answered + unanswered]
+
+def test_stream_emits_fields_as_they_land_then_complete(monkeypatch):
+    asked, cache = stub_extraction(monkeypatch)
+    events = list(pipeline.stream_fields_from_pdf("sow.pdf", max_workers=1, mode="grouped", content_hash="abc123"))
+
+    assert events[:-1] == expected_events()
+    assert events[-1][0] == "complete"
+    assert events[-1][1] == {data["field"]: data["value"] for _, data in events[:-1]}
+    # Only the field the grouped answer missed falls back
+    assert asked == ["client", "grouped", "billing_type"]
+    assert cache.puts == [events[-1][1]]
+    assert sse_event(*events[0]) == 'event: field\ndata: {"field": "Client", "value": "Tesla Inc"}\n\n'
+
+def test_async_stream_matches_sync_stream(monkeypatch):
+    stub_extraction(monkeypatch)
+
+    async def collect():
+        stream = pipeline.astream_fields_from_pdf("sow.pdf", max_concurrency=1, mode="grouped", content_hash="abc123")
+        return [event async for event in stream]
+
+    events = asyncio.run(collect())
+    expected = expected_events()
+    # Concurrent prompts may land in any order; the fallback and the empty fields still follow them
+    answered = sorted(events[:2], key=str)
+    assert answered == sorted(expected[:2], key=str) and events[2:-1] == expected[2:]
+    assert events[-1][0] == "complete"
+
+def test_cached_extraction_is_replayed_without_llm_calls(monkeypatch):
+    cached = {field: f"cached {field}" for field in pipeline.FIELDS}
+    asked, cache = stub_extraction(monkeypatch, cached=cached)
+    events = list(pipeline.stream_fields_from_pdf("sow.pdf", content_hash="abc123"))
+
+    assert events == [("field", {"field": field, "value": value}) for field, value in cached.items()] + [("complete", cached)]
+    assert asked == [] and cache.puts == []
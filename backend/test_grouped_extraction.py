@@ -0,0 +1,37 @@
+# test_grouped_extraction.py
+from functools import partial
+import rag.pipeline as pipeline
+
+FIELDS = ["Category", "Billing Type", "Status"]
+
+def test_grouped_answer_keys_are_normalised():
+    parsed = pipeline._parse_grouped(FIELDS, 'Sure: {"Category": "Fixed Bid", " billing type ": "T&M", "STATUS": "Active."}')
+    assert parsed == {"category": "Fixed Bid", "billing_type": "T&M", "status": "Active"}
+
+def test_grouped_answer_leaves_out_unusable_values():
+    parsed = pipeline._parse_grouped(FIELDS, '{"category": "", "billing_type": ["T&M"], "status": null}')
+    assert parsed == {}
+
+def test_grouped_answer_that_is_not_an_object_falls_back():
+    for raw_response in ['[1, 2]', '"Active"', '42', 'no JSON here']:
+        assert pipeline._parse_grouped(FIELDS, raw_response) == {}
+
+def test_missing_grouped_fields_use_per_field_prompts(monkeypatch, tmp_path):
+    """Only the fields the grouped answer left out are asked for again, one prompt each"""
+    answers = {"grouped": '{"Category": "Fixed Bid"}', "billing_type": "T&M", "status": "Active"}
+    asked = []
+
+    def query(prompt):
+        asked.append(prompt)
+        return answers[prompt]
+
+    tasks = {"grouped": ("grouped", partial(pipeline._parse_grouped, FIELDS))}
+    fallback_tasks = {name: (name, partial(pipeline._parse_cleaned, name)) for name in ["category", "billing_type", "status"]}
+    monkeypatch.setattr(pipeline, "query_azure_openai", query)
+    monkeypatch.setattr(pipeline, "get_cached_extraction", lambda *args: None)
+    monkeypatch.setattr(pipeline, "prepare_field_tasks", lambda *args: (tasks, fallback_tasks))
+
+    fields = pipeline.extract_fields_from_pdf(str(tmp_path / "sow.pdf"), max_workers=1, mode="grouped",
+                                              content_hash="abc123", use_cache=False)
+    assert sorted(asked) == ["billing_type", "grouped", "status"]
+    assert (fields["Category"], fields["Billing Type"], fields["Status"]) == ("Fixed Bid", "T&M", "Active")
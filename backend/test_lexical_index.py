@@ -0,0 +1,35 @@
+# test_lexical_index.py
+from rag.lexical_index import BM25Index, LexicalIndexStore, reciprocal_rank_fusion, tokenize
+
+CHUNKS = [
+    "The project team will deliver the humanoid robot firmware in three phases.",
+    "Billing Type: Time and Material. Invoices are raised monthly against approved timesheets.",
+    "Project start date is 01/11/2026 and the end date is 2027-03-31.",
+    "Tesla Inc. is the client for this statement of work.",
+]
+
+def test_tokenize_keeps_dates_and_drops_stopwords():
+    assert tokenize("Start on 01/11/2026 and end by 2027-03-31") == ["start", "01/11/2026", "end", "2027-03-31"]
+
+def test_bm25_ranks_exact_terms_first():
+    index = BM25Index(CHUNKS)
+    assert index.search("Billing Type. Possible values: Fixed Bid, Time and Material", 2)[0] == 1
+    assert index.search("01/11/2026", 5) == [2]
+    assert index.search("completely unrelated words", 5) == []
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[3, 1, 2], [1, 0]])
+    assert fused[0] == 1
+    assert set(fused) == {0, 1, 2, 3}
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / "lexical.sqlite3")
+    store = LexicalIndexStore(path=path, cache_size=1)
+    store.add("abc", CHUNKS)
+    store.add("def", CHUNKS[:1])
+    assert store.contains("abc") and not store.contains("missing")
+
+    # Evicted from memory, reloaded from sqlite; a fresh store (new process) reads the same data
+    assert store.get("abc").search("client", 1) == [3]
+    assert LexicalIndexStore(path=path).get("abc").chunks == CHUNKS
+    assert store.get("missing") is None
@@ -0,0 +1,50 @@
+# test_llm_cache.py
+import time
+from rag.llm_cache import CompletionCache
+
+def test_completion_cache_hits_and_evicts(tmp_path):
+    """Repeated prompts are served from disk and the least recently used entries are evicted"""
+    cache = CompletionCache(path=str(tmp_path / "llm_cache.sqlite3"), max_entries=2, max_bytes=10**6, ttl_seconds=3600)
+
+    keys = [CompletionCache.make_key(f"prompt {i}", "gpt-4o-mini", 0.5, 0.9, 1024) for i in range(3)]
+    for key in keys:
+        cache.put(key, "answer", latency_seconds=2.0)
+        time.sleep(0.01)
+
+    assert cache.get(keys[0]) is None  # evicted (over max_entries)
+    assert cache.get(keys[2]) == "answer"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["saved_seconds"] == 2.0
+    assert stats["entries"] == 2
+
+def test_completion_cache_key_depends_on_settings():
+    base = CompletionCache.make_key("prompt", "gpt-4o-mini", 0.5, 0.9, 1024)
+    assert base != CompletionCache.make_key("prompt", "gpt-4o-mini", 0.0, 0.9, 1024)
+    assert base != CompletionCache.make_key("prompt", "gpt-4o", 0.5, 0.9, 1024)
+
+def test_completion_cache_expires_old_entries(tmp_path):
+    cache = CompletionCache(path=str(tmp_path / "llm_cache.sqlite3"), ttl_seconds=0)
+    key = CompletionCache.make_key("prompt", "gpt-4o-mini", 0.5, 0.9, 1024)
+    cache.put(key, "answer", latency_seconds=1.0)
+    assert cache.get(key) is None
+
+def test_query_only_overrides_the_sdk_timeout_when_asked(monkeypatch):
+    """An explicit timeout=None would switch off the SDK's default timeout, so it is never sent"""
+    from types import SimpleNamespace
+    import rag.query_azure_openai as llm
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="answer"))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(llm, "get_client", lambda: client)
+    monkeypatch.setattr(llm, "USE_STREAMING", False)
+
+    assert llm.query_azure_openai("prompt", use_cache=False) == "answer"
+    assert llm.query_azure_openai("prompt", use_cache=False, timeout=5) == "answer"
+    assert "timeout" not in calls[0]
+    assert calls[1]["timeout"] == 5
@@ -0,0 +1,21 @@
+# test_roster_cache.py
+import pandas as pd
+import pytest
+from rag.roster_cache import read_roster_cache, roster_cache_path, write_roster_cache
+
+def test_cache_path_never_equals_source():
+    assert roster_cache_path("Data/DeveloperDetails.csv") == "Data/DeveloperDetails.cache.feather"
+    assert roster_cache_path("/srv/rosters/devs_2026.csv") == "/srv/rosters/devs_2026.cache.feather"
+    assert roster_cache_path("rosters/devs") == "rosters/devs.cache.feather"
+
+def test_round_trip_and_refuses_to_overwrite_source(tmp_path):
+    source = tmp_path / "devs.csv"
+    source.write_text("ResourceId,ResourceName\n1,Ada\n")
+    df = pd.read_csv(source)
+
+    write_roster_cache(df, roster_cache_path(str(source)), str(source))
+    assert read_roster_cache(roster_cache_path(str(source)), str(source)).equals(df)
+
+    with pytest.raises(ValueError):
+        write_roster_cache(df, str(source), str(source))
+    assert source.read_text() == "ResourceId,ResourceName\n1,Ada\n"
@@ -0,0 +1,44 @@
+# test_roster_sync.py
+import chromadb
+from rag.employee_recommender import EmployeeRecommender
+
+class CountingEmbeddingFunction:
+    """Embeds every text as a fixed vector and records which texts it was asked for"""
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+def roster(rows):
+    documents = [f"Name: {name}; Skills: {skills}" for name, skills in rows]
+    metadatas = [{"resource_name": name, "skills": skills} for name, skills in rows]
+    ids = [f"developer_{name}" for name, _ in rows]
+    return documents, metadatas, ids
+
+def test_sync_embeds_only_changed_rows_and_deletes_removed_ones():
+    client = chromadb.EphemeralClient()
+    # Ephemeral clients share one in-memory store per process
+    if "developers_sync_test" in [collection.name for collection in client.list_collections()]:
+        client.delete_collection("developers_sync_test")
+    collection = client.create_collection("developers_sync_test")
+    recommender = EmployeeRecommender.__new__(EmployeeRecommender)
+    recommender.embedding_function = CountingEmbeddingFunction()
+
+    recommender._sync_collection(collection, *roster([("ada", "Python(5)"), ("bob", "Java(4)"), ("cy", "Go(3)")]), "developers")
+    assert len(recommender.embedding_function.embedded) == 3
+
+    # ada unchanged, bob's skills changed, cy left, dee joined
+    recommender.embedding_function.embedded.clear()
+    documents, metadatas, ids = roster([("ada", "Python(5)"), ("bob", "Java(5)"), ("dee", "Rust(2)")])
+    recommender._sync_collection(collection, documents, metadatas, ids, "developers")
+    assert recommender.embedding_function.embedded == [documents[1], documents[2]]
+    stored = collection.get(include=["metadatas"])
+    assert sorted(stored["ids"]) == sorted(ids)
+    assert {row_id: meta["skills"] for row_id, meta in zip(stored["ids"], stored["metadatas"])}["developer_bob"] == "Java(5)"
+
+    # Nothing changed: nothing is embedded
+    recommender.embedding_function.embedded.clear()
+    recommender._sync_collection(collection, *roster([("ada", "Python(5)"), ("bob", "Java(5)"), ("dee", "Rust(2)")]), "developers")
+    assert recommender.embedding_function.embedded == []
@@ -0,0 +1,25 @@
+# test_roster_vectors.py
+import pandas as pd
+from benchmarks.roster_vectors import synthetic_roster, iterrows_role_vectors
+from rag.employee_recommender import EmployeeRecommender, build_role_vectors
+
+def test_build_role_vectors_matches_per_row_build(tmp_path):
+    """Column-wise documents, metadata and ids are identical to the per-row build, for every role"""
+    csv_path = tmp_path / "DeveloperDetails.csv"
+    synthetic_roster(200).to_csv(csv_path, index=False)
+    df = EmployeeRecommender.preprocess_csv(str(csv_path), "developer")
+
+    for employee_type in ("developer", "manager", "tester"):
+        assert build_role_vectors(df, employee_type) == iterrows_role_vectors(df, employee_type)
+
+def test_build_role_vectors_handles_missing_columns():
+    df = pd.DataFrame({"ResourceName": ["Ada", "Linus"], "HoursWorkedOnSkill": [12.5, None]}, index=[3, 7])
+    assert build_role_vectors(df, "tester") == iterrows_role_vectors(df, "tester")
+
+def test_build_role_vectors_stores_filterable_numbers():
+    df = pd.DataFrame({"ResourceId": [1, 2], "ResourceName": ["Ada", "Linus"], "ResourceExperienceInMonths": [120.0, None],
+                       "ResourceDesignationLevel": ["L5", "Unknown"], "HoursAvailableOutOf40": [16.0, 0.0]})
+    _, metadatas, _ = build_role_vectors(df, "developer")
+    assert metadatas[0]["experience_months"] == 120 and isinstance(metadatas[0]["experience_months"], int)
+    assert metadatas[0]["hours_available_weekly"] == 16.0 and metadatas[0]["availability"] == 0
+    assert [metadata["designation_level_num"] for metadata in metadatas] == [5, -1]
@@ -0,0 +1,30 @@
+# test_skill_index.py
+import pandas as pd
+from pytest import approx
+from rag.skill_index import SkillIndex, parse_skills
+
+def test_parse_skills_handles_nested_parentheses_and_missing_levels():
+    assert parse_skills("Python(5), Automation (Selenium)(3), Jira, Data Augmentation(4)") == [
+        ("Python", 5.0), ("Automation (Selenium)", 3.0), ("Jira", 1.0), ("Data Augmentation", 4.0)
+    ]
+    assert parse_skills("") == []
+
+def test_coverage_is_proficiency_weighted():
+    index = SkillIndex(
+        ["developer_1", "developer_2", "developer_3"],
+        ["Python(5), PyTorch(4), CUDA(3)", "Python(2), Automation (Selenium)(3)", "Java(5)"]
+    )
+    scores = index.coverage_by_id(["python", "PyTorch"])
+    assert scores["developer_1"] == approx((5 / 5 + 4 / 5) / 2)
+    assert scores["developer_2"] == approx((2 / 5) / 2)
+    assert "developer_3" not in scores
+
+    # The qualifier of "Automation (Selenium)" is indexed on its own too
+    assert index.top_candidates(["Selenium"], 5) == [("developer_2", approx(3 / 5))]
+    assert [employee_id for employee_id, _ in index.top_candidates(["Python", "CUDA"], 1)] == ["developer_1"]
+    assert index.top_candidates(["COBOL"], 5) == []
+
+def test_from_dataframe_uses_chroma_ids():
+    df = pd.DataFrame({"ResourceId": [101, 102], "ResourceSubSkillWithProficiency": ["Python(5)", "Selenium(4)"]})
+    index = SkillIndex.from_dataframe(df, "tester")
+    assert index.top_candidates(["selenium"], 5) == [("tester_102", approx(0.8))]
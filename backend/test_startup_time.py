@@ -0,0 +1,44 @@
+# test_startup_time.py
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# Loaded lazily by the request handlers and the background warm-up, never at import
+HEAVY_MODULES = ["chromadb", "pandas", "torch", "sentence_transformers", "onnxruntime", "openai", "PyPDF2"]
+# Cold import plus the first /health answer; raise it on slow CI machines rather than dropping the check
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", 2.0))
+
+def run_cold(code: str, cwd) -> dict:
+    """Run code in a fresh interpreter and return the JSON it prints last"""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    env.setdefault("API_KEY", "test-key")
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_flask_app_answers_health_within_budget(tmp_path):
+    report = run_cold(f"""
+import json, sys, time
+start = time.perf_counter()
+import app
+response = app.app.test_client().get("/health")
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "status": response.status_code, "body": response.get_json(),
+                  "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+""", tmp_path)
+
+    assert report["status"] == 200
+    assert report["body"]["warmup"]["status"] == "cold"
+    assert report["heavy"] == []
+    assert report["elapsed"] < STARTUP_BUDGET_SECONDS, f"cold start took {report['elapsed']:.2f}s"
+
+def test_asgi_app_import_skips_heavy_modules(tmp_path):
+    report = run_cold(f"""
+import json, sys
+import asgi_app
+print(json.dumps({{"heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+""", tmp_path)
+
+    assert report["heavy"] == []
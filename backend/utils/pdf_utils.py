@@ -1,9 +1,84 @@
 # utils/pdf_utils.py
-from PyPDF2 import PdfReader
+import hashlib
+from typing import List
+
+class ParsedPDF:
+    """Text of every page extracted exactly once, with the offset of each page inside the full text.
+    Full text, first-N-page context and chunks are all served from this object."""
+
+    def __init__(self, page_texts: List[str]):
+        # Pages without text are skipped, matching the old "\n".join(...) behaviour
+        self.page_texts = page_texts
+        self.text = ""
+        self.page_offsets = []  # page_offsets[i] = start of page i in self.text (None for empty pages)
+
+        parts = []
+        offset = 0
+        for page_text in page_texts:
+            if not page_text:
+                self.page_offsets.append(None)
+                continue
+            if parts:
+                offset += 1  # the "\n" separator
+            self.page_offsets.append(offset)
+            parts.append(page_text)
+            offset += len(page_text)
+        self.text = "\n".join(parts)
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "ParsedPDF":
+        # Imported here so the upload helpers below don't load PyPDF2 at server start
+        from PyPDF2 import PdfReader
+        reader = PdfReader(file_path)
+        return cls([page.extract_text() or "" for page in reader.pages])
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_texts)
+
+    def first_n_pages(self, n_pages: int) -> str:
+        """Text of the first n pages (a prefix of the full text, so no re-joining needed)"""
+        end_offsets = [offset + len(text) for offset, text in zip(self.page_offsets[:n_pages], self.page_texts)
+                       if offset is not None]
+        return self.text[:end_offsets[-1]] if end_offsets else ""
+
+    def page_of_offset(self, offset: int) -> int:
+        """Index of the page that contains the given character offset of the full text"""
+        page = 0
+        for i, start in enumerate(self.page_offsets):
+            if start is not None and start <= offset:
+                page = i
+        return page
+
+    def chunks(self, chunk_size: int = 600, overlap: int = 60) -> List[str]:
+        return chunk_text(self.text, chunk_size, overlap)
+
+    def chunk_pages(self, chunk_size: int = 600, overlap: int = 60) -> List[int]:
+        """Page index where each chunk from chunks() starts"""
+        return [self.page_of_offset(start) for start in range(0, len(self.text), chunk_size - overlap)]
+
+def file_content_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of the file bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def save_stream_with_hash(stream, file_path: str, block_size: int = 1 << 20) -> str:
+    """Write an upload stream to disk and return the SHA-256 of its bytes, computed in the same pass"""
+    digest = hashlib.sha256()
+    with open(file_path, "wb") as out:
+        for block in iter(lambda: stream.read(block_size), b""):
+            digest.update(block)
+            out.write(block)
+    return digest.hexdigest()
+
+def parse_pdf(file_path: str) -> ParsedPDF:
+    return ParsedPDF.from_file(file_path)
 
 def extract_text_from_pdf(file_path: str) -> str:
-    reader = PdfReader(file_path)
-    return "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
+    return parse_pdf(file_path).text
 
 def chunk_text(text: str, chunk_size: int = 600, overlap: int = 60):
     chunks = []
@@ -16,6 +91,4 @@ def chunk_text(text: str, chunk_size: int = 600, overlap: int = 60):
     return chunks
 
 def extract_first_n_pages(file_path: str, n_pages: int) -> str:
-    reader = PdfReader(file_path)
-    pages = reader.pages[:n_pages]
-    return "\n".join([page.extract_text() for page in pages if page.extract_text()])
\ No newline at end of file
+    return parse_pdf(file_path).first_n_pages(n_pages)
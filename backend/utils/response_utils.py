@@ -0,0 +1,89 @@
+# utils/response_utils.py
+import json
+from typing import Dict, Any
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop nginx-style proxies from buffering the stream
+    "X-Accel-Buffering": "no"
+}
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def clean_recommendations_response(full_recommendations: Dict, sow_data: Dict[str, Any], n_recommendations: int) -> Dict:
+    """Shape the full recommender output into the trimmed payload the UI consumes"""
+    clean_response = {
+        "recommendations": [],
+        "summary": {
+            "initial_shortlisted_candidates": full_recommendations.get("candidates_found", 0),
+            "timings": full_recommendations.get("timings", {}),
+            "mode": full_recommendations.get("mode", "llm"),
+            "status": "success"
+        },
+        # Add SOW data to the response
+        "sow_data": sow_data
+    }
+
+    # Extract clean recommendations from the AI response
+    ai_recommendations = full_recommendations.get("recommendations", {})
+
+    if isinstance(ai_recommendations, dict) and "recommendations" in ai_recommendations:
+        # If AI returned proper JSON structure
+        for rec in ai_recommendations["recommendations"][:n_recommendations]:
+            clean_rec = {
+                "rank": rec.get("rank", 0),
+                "name": rec.get("name", "Unknown"),
+                "designation": rec.get("designation", "Unknown"),
+                "match_score": round(rec.get("match_score", 0), 2),
+                "recommendation_level": rec.get("recommendation", "Consider"),
+                "key_strengths": rec.get("reasons", [])[:3],  # Top 3 reasons only
+                "concerns": rec.get("concerns", [])[:2],      # Top 2 concerns only
+                "why_pick": rec.get("why_pick", "No justification provided."),
+                "allocation_suggestion": rec.get("allocation_suggestion", 0),
+                "recommended_skills": rec.get("recommended_skills", []),  # Now using consistent field name
+                "recommended_experience": rec.get("recommended_experience", 0)  # Added new field
+            }
+            # Fast mode explains its match_score
+            if "score_breakdown" in rec:
+                clean_rec["score_breakdown"] = rec["score_breakdown"]
+            clean_response["recommendations"].append(clean_rec)
+    else:
+        # Fallback: extract from raw candidates if AI parsing failed
+        raw_candidates = full_recommendations.get("raw_candidates", [])[:5]
+        for i, candidate in enumerate(raw_candidates, 1):
+            meta = candidate.get("metadata", {})
+            clean_rec = {
+                "rank": i,
+                "name": meta.get("resource_name", "Unknown"),
+                "designation": meta.get("designation", "Unknown"),
+                "match_score": round(candidate.get("similarity_score", 0), 2),
+                "recommendation_level": "Consider",
+                "key_strengths": [
+                    f"Skills: {meta.get('skills', 'Not specified')}",
+                    f"Experience: {meta.get('experience_months', '0')} months",
+                    f"Capacity: {meta.get('capacity', '0')} hours"
+                ],
+                "concerns": ["Check availability"],
+                "why_pick": "Fallback recommendation based on vector similarity.",
+                "allocation_suggestion": int(meta.get('hours_available_weekly', 0)),
+                "recommended_skills": [],
+                "recommended_experience": 0  # Added fallback for new field
+            }
+            clean_response["recommendations"].append(clean_rec)
+
+    return clean_response
+
+def recommendations_error_response(error: Exception) -> Dict:
+    """Error payload for the clean recommendations endpoint"""
+    return {
+        "error": str(error),
+        "status": "failed",
+        "recommendations": [],
+        "summary": {
+            "total_candidates_analyzed": 0,
+            "status": "error"
+        },
+        "sow_data": {}  # Include empty SOW data even in error case
+    }
@@ -0,0 +1,15 @@
+# utils/sqlite_utils.py
+import os
+import sqlite3
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    """Open a SQLite database that can be shared across threads (callers serialise access with their own lock)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    # WAL lets readers in other processes proceed while we write
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn